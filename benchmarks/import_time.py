@@ -0,0 +1,154 @@
+"""Import-time budget of the entry points, which keeps the cold start of the cli fast.
+
+Each entry point is imported by a fresh interpreter with `-X importtime`. The reported import time
+is compared to the budget of the entry point and the imported modules are checked against the
+modules that the entry point must not load eagerly (e.g. the ui or rich). Exits with a nonzero
+exit code if a budget is exceeded or a deferred module is imported.
+
+Run with: python -m benchmarks.import_time
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+# modules that are only imported by the modes/ functions that need them
+DEFERRED_MODULES = [
+    "tkinter",
+    "PIL",
+    "pystray",
+    "requests",
+    "rich",
+    "pyautogui",
+    "asyncio",
+]
+
+
+class EntryPoint(NamedTuple):
+    module: str
+    # max import time in ms
+    budget_ms: float
+    # top level packages that must not be imported
+    deferred: List[str]
+
+
+ENTRY_POINTS: Dict[str, EntryPoint] = {
+    "cli": EntryPoint(
+        "controller_companion.launch", 100, DEFERRED_MODULES + ["pygame"]
+    ),
+    "observer": EntryPoint(
+        "controller_companion.controller_observer", 150, DEFERRED_MODULES + ["pygame"]
+    ),
+}
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    """Parses the output of `-X importtime`.
+
+    Args:
+        output (str): stderr of the interpreter.
+
+    Returns:
+        Dict[str, int]: Cumulative import time in us by module name.
+    """
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # import time: <self us> | <cumulative us> | <indentation><module>
+        _, cumulative, name = line[len("import time:") :].split("|", 2)
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(module: str) -> Tuple[float, Set[str]]:
+    """Imports a module in a new interpreter.
+
+    Returns:
+        Tuple[float, Set[str]]: The import time of the module in ms and the names of all imported modules.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"Failed to import {module}:\n{result.stderr}")
+    times = parse_importtime(result.stderr)
+    return times[module] / 1000, set(times.keys())
+
+
+def check(entry_point: EntryPoint, runs: int, scale: float) -> Dict[str, object]:
+    # the first import compiles the byte code, which is not part of a regular cold start
+    measure(entry_point.module)
+    durations = []
+    for _ in range(runs):
+        duration, modules = measure(entry_point.module)
+        durations.append(duration)
+
+    deferred = sorted(
+        m for m in modules if m.split(".")[0] in set(entry_point.deferred)
+    )
+    budget_ms = entry_point.budget_ms * scale
+    median = statistics.median(durations)
+    return {
+        "module": entry_point.module,
+        "median_ms": median,
+        "min_ms": min(durations),
+        "budget_ms": budget_ms,
+        "deferred_imports": deferred,
+        "ok": median <= budget_ms and not deferred,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the import times of the entry points against their budgets."
+    )
+    parser.add_argument(
+        "--entry-points",
+        nargs="+",
+        choices=list(ENTRY_POINTS.keys()),
+        default=list(ENTRY_POINTS.keys()),
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        help="Multiplies the budgets (e.g. for slow machines).",
+        type=float,
+        default=1.0,
+    )
+    parser.add_argument(
+        "--json", help="Write the results to this file.", type=str, default=None
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'entry point':<12} {'median [ms]':>11} {'min [ms]':>9} {'budget [ms]':>11}  result"
+    )
+    results = []
+    for name in args.entry_points:
+        result = check(ENTRY_POINTS[name], runs=args.runs, scale=args.scale)
+        results.append(result)
+        print(
+            f"{name:<12} {result['median_ms']:>11.1f} {result['min_ms']:>9.1f} "
+            f"{result['budget_ms']:>11.1f}  {'ok' if result['ok'] else 'FAILED'}"
+        )
+        if result["deferred_imports"]:
+            print(f"  eagerly imported: {', '.join(result['deferred_imports'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
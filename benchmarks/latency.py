@@ -0,0 +1,124 @@
+"""Measures the press-to-execute latency of the ControllerObserver.
+
+Synthetic button events are posted to the pygame event queue (using the SDL dummy
+video driver, so this runs headless) and the time until the mapped action is executed
+is recorded.
+
+Run with: python -m benchmarks.latency
+"""
+
+import argparse
+import os
+import queue
+import statistics
+import time
+from typing import List
+
+# run headless
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "yes"
+import pygame
+
+from controller_companion.app.controller_layouts import ControllerType
+from controller_companion.controller import Controller
+from controller_companion.controller_observer import ControllerObserver
+from controller_companion.logs import logger
+from controller_companion.mapping import ActionType, Mapping
+
+INSTANCE_ID = 0
+
+
+class TimedMapping(Mapping):
+    """Mapping that records the time of its execution instead of running an action."""
+
+    def __init__(self, executions: queue.Queue, **kwargs):
+        super().__init__(**kwargs)
+        self.executions = executions
+
+    def execute(self, timeout=None, supervisor=None):
+        self.executions.put(time.perf_counter())
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    idx = min(len(values) - 1, round(p / 100 * (len(values) - 1)))
+    return values[idx]
+
+
+def wait_until_running(timeout_s: float = 5):
+    # events can be posted as soon as the observer thread initialized pygame
+    end = time.perf_counter() + timeout_s
+    while not pygame.display.get_init():
+        if time.perf_counter() > end:
+            raise Exception("The observer did not start in time.")
+        time.sleep(0.01)
+
+
+def run(presses: int = 200, wait_timeout_ms: int = 1000, idle_s: float = 1.0):
+    executions = queue.Queue()
+    mapping = TimedMapping(
+        executions,
+        action_type=ActionType.CONSOLE_COMMAND,
+        target="",
+        active_controller_buttons=["A"],
+        name="benchmark",
+        controller_type=ControllerType.XBOX,
+    )
+
+    # don't measure the time it takes to print the log messages to the console
+    logger.disabled = True
+
+    observer = ControllerObserver()
+    # register a virtual controller, as the dummy joystick driver does not provide any
+    observer.controllers[INSTANCE_ID] = Controller(
+        "Benchmark Controller",
+        guid="benchmark",
+        power_level="unknown",
+        initialized=True,
+        controller_type=ControllerType.XBOX,
+    )
+    observer.start_detached(defined_actions=[mapping], wait_timeout_ms=wait_timeout_ms)
+    wait_until_running()
+
+    latencies = []
+    for _ in range(presses):
+        for event_type in [pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP]:
+            start = time.perf_counter()
+            pygame.event.post(
+                pygame.event.Event(event_type, instance_id=INSTANCE_ID, button=0)
+            )
+            if event_type == pygame.JOYBUTTONDOWN:
+                latencies.append((executions.get(timeout=5) - start) * 1000)
+        # give the observer some time to process the button release
+        time.sleep(0.001)
+
+    # measure the cpu usage of the process while the observer is idle
+    cpu_start = time.process_time()
+    time.sleep(idle_s)
+    idle_cpu = (time.process_time() - cpu_start) / idle_s * 100
+
+    observer.stop()
+
+    print(f"press-to-execute latency over {presses} presses:")
+    print(f"  p50: {percentile(latencies, 50):.3f} ms")
+    print(f"  p99: {percentile(latencies, 99):.3f} ms")
+    print(f"  max: {max(latencies):.3f} ms")
+    print(f"  mean: {statistics.mean(latencies):.3f} ms")
+    print(f"idle cpu usage: {idle_cpu:.2f} %")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the press-to-execute latency of the ControllerObserver."
+    )
+    parser.add_argument("--presses", type=int, default=200)
+    parser.add_argument("--wait-timeout-ms", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=1.0)
+    args = parser.parse_args()
+
+    run(presses=args.presses, wait_timeout_ms=args.wait_timeout_ms, idle_s=args.idle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Latency and throughput benchmark of the ControllerObserver across mapping and controller counts.
+
+The observer is driven by a replayable synthetic event stream, which is posted to the pygame
+event queue (using the SDL dummy drivers, so this runs headless). For each combination of
+mapping count and controller count the following is measured:
+- press-to-dispatch latency (p50/p99): time from posting a button press until the observer hands
+  the triggered mapping to the executor.
+- events/sec: how fast the observer drains a burst of events from the stream.
+- cpu per event: cpu time of the observer thread per event of the burst.
+
+Run with: python -m benchmarks.suite
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import queue
+import random
+import time
+from typing import Dict, List, Optional
+
+# run headless
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "yes"
+import pygame
+
+from benchmarks.latency import percentile, wait_until_running
+from controller_companion.app.controller_layouts import ControllerType, get_layout
+from controller_companion.controller import Controller
+from controller_companion.controller_observer import ControllerObserver
+from controller_companion.logs import logger
+from controller_companion.mapping import ActionType, Mapping
+
+# the probe mapping is triggered by this button alone, the generated mappings and the
+# synthetic event stream never use it.
+PROBE_BUTTON = "Share"
+
+
+class RecordingExecutor:
+    """Replaces the ActionExecutor of the observer and records the dispatched mappings."""
+
+    def __init__(self, probe: Mapping):
+        self.probe = probe
+        self.probe_dispatches: queue.Queue = queue.Queue()
+        self.dispatched = 0
+
+    def submit(self, mapping: Mapping) -> bool:
+        if mapping is self.probe:
+            self.probe_dispatches.put(time.perf_counter())
+        self.dispatched += 1
+        return True
+
+    def shutdown(self, wait: bool = False):
+        pass
+
+
+def create_mappings(count: int) -> List[Mapping]:
+    """Creates mappings with distinct input combinations (of 2 or more inputs)."""
+    layout = get_layout(ControllerType.XBOX)
+    buttons = [b for b in layout.get_button_layout().keys() if b != PROBE_BUTTON]
+    d_pad = [None] + list(layout.get_d_pad_layout().keys())
+
+    combos = (
+        list(combo) + ([d] if d else [])
+        for size in range(2, len(buttons) + 1)
+        for combo in itertools.combinations(buttons, size)
+        for d in d_pad
+    )
+    return [
+        Mapping(
+            ActionType.CONSOLE_COMMAND,
+            target="",
+            active_controller_buttons=combo,
+            name=f"mapping {i}",
+        )
+        for i, combo in zip(range(count), combos)
+    ]
+
+
+def create_event_stream(
+    controllers: int, events: int, seed: int = 0
+) -> List[pygame.event.Event]:
+    """Creates a replayable stream of button presses and releases on all controllers.
+
+    The same arguments always create the same stream. Each controller presses 1-3 random buttons
+    and releases them again. The stream only ends after a release, so no button is left held
+    (which would keep the probe combination from matching), it might be a few events longer than
+    `events`.
+    """
+    rng = random.Random(seed)
+    layout = get_layout(ControllerType.XBOX)
+    buttons = [
+        number
+        for name, number in layout.get_button_layout().items()
+        if name != PROBE_BUTTON
+    ]
+
+    stream = []
+    while len(stream) < events:
+        instance_id = rng.randrange(controllers)
+        pressed = rng.sample(buttons, rng.randint(1, 3))
+        for event_type, order in [
+            (pygame.JOYBUTTONDOWN, pressed),
+            (pygame.JOYBUTTONUP, reversed(pressed)),
+        ]:
+            for button in order:
+                stream.append(
+                    pygame.event.Event(
+                        event_type, instance_id=instance_id, button=button
+                    )
+                )
+    return stream
+
+
+def thread_cpu_time(thread_id: Optional[int]) -> float:
+    """Cpu time of a thread (Linux), falls back to the cpu time of the whole process."""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+    except (AttributeError, OSError, TypeError):
+        return time.process_time()
+
+
+def press_probe(instance_id: int, executor: RecordingExecutor) -> float:
+    """Presses and releases the probe button and returns the press-to-dispatch latency in ms."""
+    button = get_layout(ControllerType.XBOX).get_button_layout()[PROBE_BUTTON]
+    start = time.perf_counter()
+    pygame.event.post(
+        pygame.event.Event(pygame.JOYBUTTONDOWN, instance_id=instance_id, button=button)
+    )
+    latency = (executor.probe_dispatches.get(timeout=5) - start) * 1000
+    pygame.event.post(
+        pygame.event.Event(pygame.JOYBUTTONUP, instance_id=instance_id, button=button)
+    )
+    return latency
+
+
+def run(
+    mappings: int,
+    controllers: int,
+    presses: int = 100,
+    events: int = 10000,
+    seed: int = 0,
+    detect_transient_combos: bool = True,
+) -> Dict[str, float]:
+    probe = Mapping(
+        ActionType.CONSOLE_COMMAND,
+        target="",
+        active_controller_buttons=[PROBE_BUTTON],
+        name="probe",
+    )
+    defined_actions = create_mappings(mappings - 1) + [probe]
+    stream = create_event_stream(controllers, events, seed=seed)
+
+    observer = ControllerObserver()
+    executor = RecordingExecutor(probe)
+    observer.executor = executor
+    # register virtual controllers, as the dummy joystick driver does not provide any
+    for instance_id in range(controllers):
+        observer.controllers[instance_id] = Controller(
+            f"Benchmark Controller {instance_id}",
+            guid=f"benchmark-{instance_id}",
+            power_level="unknown",
+            initialized=True,
+            controller_type=ControllerType.XBOX,
+        )
+    # don't print the table of the defined mappings
+    with contextlib.redirect_stdout(io.StringIO()):
+        observer.start_detached(
+            defined_actions=defined_actions,
+            detect_transient_combos=detect_transient_combos,
+        )
+        wait_until_running(timeout_s=30)
+
+    # ---------------------------------- latency --------------------------------- #
+    latencies = []
+    for i in range(presses):
+        latencies.append(press_probe(i % controllers, executor))
+        # give the observer some time to process the button release
+        time.sleep(0.001)
+
+    # --------------------------------- throughput -------------------------------- #
+    # the burst is posted at once and followed by a probe press, which is dispatched once the
+    # observer processed all events before it.
+    cpu_start = thread_cpu_time(observer.thread.ident)
+    start = time.perf_counter()
+    for event in stream:
+        pygame.event.post(event)
+    press_probe(0, executor)
+    duration = time.perf_counter() - start
+    cpu = thread_cpu_time(observer.thread.ident) - cpu_start
+
+    observer.stop()
+
+    return {
+        "mappings": len(defined_actions),
+        "controllers": controllers,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "events_per_s": (len(stream) + 1) / duration,
+        "cpu_us_per_event": cpu / (len(stream) + 1) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the latency and throughput of the ControllerObserver."
+    )
+    parser.add_argument(
+        "--mappings", type=int, nargs="+", default=[10, 100, 1000, 10000]
+    )
+    parser.add_argument("--controllers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--presses", type=int, default=100)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-transient-combos",
+        help="Only evaluate the final controller states of each event batch.",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--json", help="Write the results to this file.", type=str, default=None
+    )
+    args = parser.parse_args()
+
+    # don't measure the time it takes to print the log messages to the console
+    logger.disabled = True
+
+    print(
+        f"{'mappings':>8} {'controllers':>11} {'p50 [ms]':>9} {'p99 [ms]':>9} "
+        f"{'events/s':>10} {'cpu/event [us]':>14}"
+    )
+    results = []
+    for mappings, controllers in itertools.product(args.mappings, args.controllers):
+        result = run(
+            mappings=mappings,
+            controllers=controllers,
+            presses=args.presses,
+            events=args.events,
+            seed=args.seed,
+            detect_transient_combos=not args.no_transient_combos,
+        )
+        results.append(result)
+        print(
+            f"{result['mappings']:>8} {result['controllers']:>11} {result['p50_ms']:>9.3f} "
+            f"{result['p99_ms']:>9.3f} {result['events_per_s']:>10.0f} "
+            f"{result['cpu_us_per_event']:>14.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
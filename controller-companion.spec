@@ -1,11 +1,24 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
 
+sys.path.insert(0, SPECPATH)
+from controller_companion.app.resource_bundle import build_bundle
+
+# the images pre-rendered at the sizes used by the app (built by pyinstaller.install)
+resource_bundle = os.path.join(SPECPATH, 'build', 'resources.bundle')
+if not os.path.isfile(resource_bundle):
+    build_bundle(resource_bundle)
+datas = [
+    ('controller_companion/app/res', 'controller_companion/app/res'),
+    (resource_bundle, 'controller_companion/app/res'),
+]
 
 a_cli = Analysis(
     ['controller_companion/launch.py'],
     pathex=[],
     binaries=[],
-    datas=[('controller_companion/app/res', 'controller_companion/app/res')],
+    datas=datas,
     hiddenimports=['PIL._tkinter_finder'],
     hookspath=[],
     hooksconfig={},
@@ -20,7 +33,7 @@ a_app = Analysis(
     ['controller_companion/app/app.py'],
     pathex=[],
     binaries=[],
-    datas=[('controller_companion/app/res', 'controller_companion/app/res')],
+    datas=datas,
     hiddenimports=['PIL._tkinter_finder'],
     hookspath=[],
     hooksconfig={},
@@ -1,8 +1,15 @@
-from importlib.metadata import version
 from pathlib import Path
 
 APP_NAME = "Controller Companion"
-VERSION = f'v{version("controller-companion")}'
 PACKAGE_DIR = Path(__file__).parent.absolute()
 CONFIG_PATH = Path.home() / "Documents" / "Controller Companion" / "settings.json"
 PID_PATH = Path.home() / "Documents" / "Controller Companion" / ".pid"
+
+
+def __getattr__(name: str):
+    # the version is looked up on first access, as importlib.metadata is slow to import
+    if name == "VERSION":
+        from importlib.metadata import version
+
+        return f'v{version("controller-companion")}'
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
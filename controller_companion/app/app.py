@@ -5,34 +5,36 @@ import signal
 import subprocess
 from pathlib import Path
 import sys
+import threading
 import tkinter as tk
 from tkinter import Menu, messagebox
 from tkinter import ttk
-from typing import List
+from typing import List, Optional, Tuple
 import webbrowser
 import requests
 import pystray
-from PIL import Image, ImageTk
 import controller_companion
 from controller_companion.app.autostart import (
     autostart_supported,
     get_autostart_enabled,
     set_auto_start,
 )
-from controller_companion.app.controller_layouts import ControllerType, get_layout
+from controller_companion.app.icon_cache import ShortcutImageCache
+from controller_companion.app.mapping_search import MappingSearchIndex
+from controller_companion.app.resource_bundle import load_image
+from controller_companion.app.settings_store import SettingsStore
 from controller_companion.app.utils import (
     OperatingSystem,
-    combine_images_horizontally,
     get_os,
     set_window_icon,
 )
-from controller_companion.app.widgets.controller_listbox import (
-    PopupMenuListbox,
-    PopupMenuTreeview,
-)
+from controller_companion.app.widgets.controller_listbox import PopupMenuListbox
+from controller_companion.app.widgets.mapping_treeview import MappingTreeview
+from controller_companion.app.widgets.placeholder_entry import PlaceholderEntry
+from controller_companion.config_watcher import ConfigWatcher
 from controller_companion.controller import Controller
 from controller_companion.logs import logger
-from controller_companion.mapping import Mapping
+from controller_companion.mapping import Mapping, mappings_from_dicts
 from controller_companion.app import resources
 from controller_companion.app.popup_about import AboutScreen
 from controller_companion.app.popup_create_action import CreateActionPopup
@@ -47,11 +49,19 @@ class ControllerCompanion(tk.Tk):
         set_window_icon(self)
         self.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
         self.settings_file = controller_companion.CONFIG_PATH
+        # writes the settings on a background thread
+        self.settings_store = SettingsStore(self.settings_file)
 
         # load settings
         self.settings = self.load_settings()
 
         self.controllers: List[Controller] = []
+        # latest controllers reported by the observer that are not shown yet
+        self.__pending_controllers: Optional[List[Controller]] = None
+        self.__pending_controllers_lock = threading.Lock()
+        # latest reloaded config (settings, mappings) that is not applied yet
+        self.__pending_config: Optional[Tuple[dict, List[Mapping]]] = None
+        self.__pending_config_lock = threading.Lock()
 
         # --------------------------------- add menu --------------------------------- #
         menu = Menu(self)
@@ -114,18 +124,37 @@ class ControllerCompanion(tk.Tk):
 
         # ---------------------------------------------------------------------------- #
         self.rowheight = 30
+        # composed shortcut images of the mapping rows
+        self.shortcut_images = ShortcutImageCache()
         tk.Label(self, text="Defined Mappings").pack(fill=tk.X)
         s = ttk.Style()
         s.configure("Treeview", rowheight=self.rowheight)
-        self.treeview = PopupMenuTreeview(
-            self,
+        # filter the mappings by name, target or shortcut
+        self.mapping_index = MappingSearchIndex()
+        self.__search_job = None
+        self.entry_search = PlaceholderEntry(
+            self, placeholder="Search by name, target or shortcut (e.g. A+B)"
+        )
+        self.entry_search.pack(fill=tk.X)
+        self.entry_search.bind("<KeyRelease>", self.__on_search_changed)
+        frame_mappings = tk.Frame(self)
+        frame_mappings.pack(expand=True, fill=tk.BOTH)
+        self.treeview = MappingTreeview(
+            frame_mappings,
+            shortcut_images=self.shortcut_images,
+            rowheight=self.rowheight,
             columns=("name", "target"),
             height=7,
             menu_actions={
                 "delete mapping(s)": lambda: self.delete_action(),
             },
         )
-        self.treeview.pack(expand=True, fill=tk.BOTH)
+        scrollbar = ttk.Scrollbar(
+            frame_mappings, orient=tk.VERTICAL, command=self.treeview.yview
+        )
+        self.treeview.scrollbar = scrollbar
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.treeview.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
         self.treeview.heading("#0", text="Shortcut")
         self.treeview.heading("name", text="Name")
         self.treeview.heading("target", text="Target")
@@ -148,9 +177,15 @@ class ControllerCompanion(tk.Tk):
         self.observer.start_detached(
             defined_actions=self.defined_actions,
             debug=self.settings.get("debug", False),
-            controller_callback=self.update_controller_ui,
+            controller_callback=self.__on_controllers_changed,
             disabled_controllers=self.settings["disabled_controllers"],
         )
+        # reload the mappings when the config file is edited outside of the app
+        self.config_watcher = ConfigWatcher(
+            self.settings_file, callback=self.__on_config_changed
+        )
+        self.config_watcher.start()
+        self.after(250, self.__poll_config)
         # ---------------------------------------------------------------------------- #
 
         if launch_minimized:
@@ -160,41 +195,23 @@ class ControllerCompanion(tk.Tk):
             self.after(100, self.minimize_to_tray, [True])
 
     def update_mappings_ui(self):
-        self.treeview.delete(*self.treeview.get_children())
-        icon_size = (self.rowheight - 5, self.rowheight - 5)
-        self.mapping_treeview_icons = []
-        layout_icons = {
-            controller: get_layout(controller).get_button_icons(icon_size=icon_size)
-            for controller in ControllerType
-        }
-        max_width_shortcut = 0
-        for mapping in self.defined_actions:
-            plus_icon = Image.open(resources.PLUS_ICON).resize(
-                (self.rowheight // 3, self.rowheight // 3)
-            )
-            icons = []
-            for btn in mapping.active_controller_buttons:
-                icons.append(layout_icons[mapping.controller_type][btn])
-                icons.append(plus_icon)
-            icons.pop()
-            shortcut_icon = ImageTk.PhotoImage(
-                combine_images_horizontally(images=icons, height=self.rowheight)
-            )
-            max_width_shortcut = max(max_width_shortcut, shortcut_icon.width())
-            self.treeview.insert(
-                "",
-                tk.END,
-                text="",
-                values=(
-                    mapping.name,
-                    mapping.target,
-                ),
-                image=shortcut_icon,
-            )
-            self.mapping_treeview_icons.append(shortcut_icon)
-        # make sure the width of the first column is large enough to fit the shortcut image
-        # an offset is added to account for the treeview's indicator at the very left
-        self.treeview.column("#0", minwidth=max_width_shortcut + 30)
+        """Rebuilds the search index and the rows of the mapping treeview."""
+        self.mapping_index = MappingSearchIndex(self.defined_actions)
+        self.__apply_search()
+
+    def __get_search_query(self) -> str:
+        query = self.entry_search.get()
+        return "" if query == self.entry_search.placeholder else query
+
+    def __on_search_changed(self, _=None):
+        # only filter once the user paused typing
+        if self.__search_job is not None:
+            self.after_cancel(self.__search_job)
+        self.__search_job = self.after(150, self.__apply_search)
+
+    def __apply_search(self):
+        self.__search_job = None
+        self.treeview.set_mappings(self.mapping_index.search(self.__get_search_query()))
 
     def minimize_to_tray(self, is_launch: bool = False):
         if self.var_settings_minimize_on_close.get() == 0 and not is_launch:
@@ -205,9 +222,9 @@ class ControllerCompanion(tk.Tk):
         self.withdraw()
         if get_os() == OperatingSystem.LINUX:
             # on linux this will look very distorted on resolutions >16x16
-            image = Image.open(resources.APP_ICON_PNG_TRAY_16)
+            image = load_image(resources.APP_ICON_PNG_TRAY_16)
         else:
-            image = Image.open(resources.APP_ICON_PNG_TRAY_32)
+            image = load_image(resources.APP_ICON_PNG_TRAY_32)
         menu = (
             pystray.MenuItem("Show", self.show_window, default=True),
             pystray.MenuItem("Quit", self.quit_window_from_icon),
@@ -226,7 +243,13 @@ class ControllerCompanion(tk.Tk):
         self.quit_window()
 
     def quit_window(self, _=None):
-        self.observer.stop()
+        # also called if loading the settings failed, before the rest of the app was created
+        if hasattr(self, "config_watcher"):
+            self.config_watcher.stop()
+        if hasattr(self, "observer"):
+            self.observer.stop()
+        if hasattr(self, "settings_store"):
+            self.settings_store.close()
         self.destroy()
 
     def show_window(self, icon):
@@ -238,19 +261,42 @@ class ControllerCompanion(tk.Tk):
         result = p.result
         if result is not None:
             self.defined_actions.append(result)
-            self.update_mappings_ui()
+            self.observer.set_mappings(self.defined_actions)
+            self.mapping_index.add(result)
+            if self.mapping_index.matches(result, self.__get_search_query()):
+                self.treeview.append(result)
             self.save_settings()
 
     def delete_action(self, _=None):
-        selection = self.treeview.selection()
-        for item in selection:
-            delete_idx = self.treeview.index(item)
-            self.defined_actions.pop(delete_idx)
-        self.update_mappings_ui()
+        selection = self.treeview.selected_mappings()
+        # the shown rows might be filtered, so the mappings are removed by identity
+        removed = set(id(m) for m in selection)
+        self.defined_actions[:] = [
+            m for m in self.defined_actions if id(m) not in removed
+        ]
+        self.mapping_index.remove(selection)
+        # only the deleted rows are removed from the treeview
+        self.treeview.remove(selection)
+        self.observer.set_mappings(self.defined_actions)
 
         if len(selection) > 0:
             self.save_settings()
 
+    def __on_controllers_changed(self, controllers: List[Controller]):
+        # called by the dispatcher thread of the observer: only hand the latest controllers to the
+        # ui thread, a burst of changes results in a single update of the listbox.
+        with self.__pending_controllers_lock:
+            scheduled = self.__pending_controllers is not None
+            self.__pending_controllers = controllers
+        if not scheduled:
+            self.after(0, self.__apply_controllers)
+
+    def __apply_controllers(self):
+        with self.__pending_controllers_lock:
+            controllers, self.__pending_controllers = self.__pending_controllers, None
+        if controllers is not None:
+            self.update_controller_ui(controllers)
+
     def update_controller_ui(self, controllers: List[Controller]):
         self.controllers = controllers
 
@@ -278,8 +324,8 @@ class ControllerCompanion(tk.Tk):
             (set(disabled_controllers) | selected_enabled_guids)
             - selected_disabled_guids
         )
-        disabled_controllers.clear()
-        disabled_controllers.extend(new_disabled)
+        self.settings["disabled_controllers"] = new_disabled
+        self.observer.set_disabled_controllers(new_disabled)
 
         self.update_controller_ui(self.controllers)
         self.save_settings()
@@ -290,28 +336,80 @@ class ControllerCompanion(tk.Tk):
             "debug": False,
             "disabled_controllers": [],
         }
+        self.defined_actions = []
 
-        if self.settings_file.is_file():
-            try:
-                settings.update(json.loads(self.settings_file.read_text()))
-                self.defined_actions = [
-                    Mapping.from_dict(d) for d in settings["actions"]
-                ]
-            except Exception as e:
-                messagebox.showerror(
+        def parse(data: dict) -> Tuple[dict, List[Mapping]]:
+            loaded = dict(settings)
+            loaded.update(data)
+            return loaded, mappings_from_dicts(loaded["actions"])
+
+        try:
+            result = self.settings_store.load(parse=parse)
+        except Exception as e:
+            messagebox.showerror(
+                "Config File Error",
+                f"Failed to load the config file.\nError message: {str(e)}",
+            )
+            self.open_config()
+            self.quit_window()
+            return settings
+
+        if result is not None:
+            settings, self.defined_actions = result
+            if self.settings_store.loaded_from != self.settings_file:
+                messagebox.showwarning(
                     "Config File Error",
-                    f"Failed to load the config file.\nError message: {str(e)}",
+                    f"Failed to load the config file, the backup {self.settings_store.loaded_from.name} was loaded instead.",
                 )
-                self.open_config()
-                self.quit_window()
-        else:
-            self.defined_actions = []
 
         return settings
 
+    def __on_config_changed(self, path: Path):
+        # called by the watcher thread: parse the config here and only hand the result to the ui thread
+        try:
+            settings = json.loads(path.read_text())
+            mappings = mappings_from_dicts(settings.get("actions", []))
+        except Exception as e:
+            logger.error(
+                "Failed to reload the config file, keeping the previous mappings: %s", e
+            )
+            return
+        # no tk calls on this thread: quit_window joins it from the ui thread, which would
+        # deadlock while a tk call waits for the main loop. the ui thread polls the result instead.
+        with self.__pending_config_lock:
+            self.__pending_config = (settings, mappings)
+
+    def __poll_config(self):
+        with self.__pending_config_lock:
+            config, self.__pending_config = self.__pending_config, None
+        if config is not None:
+            self.__apply_config(*config)
+        self.after(250, self.__poll_config)
+
+    def __apply_config(self, settings: dict, mappings: List[Mapping]):
+        if self.settings_store.has_unsaved_changes():
+            # the changes made in the app are newer and will overwrite the file anyway
+            return
+        disabled_controllers = settings.get("disabled_controllers", [])
+        if [m.to_dict() for m in mappings] == [
+            m.to_dict() for m in self.defined_actions
+        ] and disabled_controllers == self.settings["disabled_controllers"]:
+            # nothing changed (e.g. the config was just saved by the app itself)
+            return
+
+        self.defined_actions = mappings
+        self.settings["disabled_controllers"] = disabled_controllers
+        self.observer.registry.publish(
+            mappings=mappings, disabled_controllers=disabled_controllers
+        )
+        self.update_mappings_ui()
+        self.update_controller_ui(self.controllers)
+        logger.info(f"Reloaded {len(mappings)} mappings from {self.settings_file}")
+
     def open_config(self):
         if not self.settings_file.is_file():
             self.save_settings()
+            self.settings_store.flush()
 
         if sys.platform == "win32":
             os.startfile(self.settings_file)
@@ -327,10 +425,8 @@ class ControllerCompanion(tk.Tk):
                 "actions": [item.to_dict() for item in self.defined_actions],
             }
         )
-        self.settings_file.parent.mkdir(exist_ok=True, parents=True)
-        self.settings_file.write_text(json.dumps(self.settings, indent=4))
-
-        logger.debug(f"Saved settings to: {self.settings_file}")
+        # written on the background thread, a burst of changes results in a single write
+        self.settings_store.save(self.settings)
 
     def toggle_autostart(self):
         set_auto_start(enable=self.var_settings_auto_start.get())
@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
-from PIL import Image, ImageTk
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Mapping, Optional, Tuple
 
 from controller_companion.app import resources
+from controller_companion.app.resource_bundle import load_image
+from controller_companion.app.utils import create_text_icon
+from controller_companion.controller_state import ControllerState, pack_d_pad_state
+
+if TYPE_CHECKING:
+    from PIL import ImageTk
 
 
 class ControllerType(Enum):
@@ -18,26 +25,94 @@ class ControllerType(Enum):
 
 
 class ControllerLayout(ABC):
+    """Button layout of a controller type.
+
+    Subclasses define the layout using the class level tables below. The lookup tables used while
+    observing the controllers are computed once when the layout is created, use `get_layout` to
+    access the shared instance of each layout.
+    """
+
+    # button name -> button number
+    BUTTON_LAYOUT: Dict[str, int] = {}
+    # d-pad input name -> d-pad state (x, y)
+    D_PAD_LAYOUT: Dict[str, Tuple[int, int]] = {}
+    # axis input name -> (axis number, direction). the input is active while the axis is moved
+    # far enough into the direction (-1 or 1). the axis numbers follow the XInput order (left
+    # stick x/y, right stick x/y, left/right trigger), the input backends translate the axes of
+    # their drivers into it.
+    AXIS_LAYOUT: Dict[str, Tuple[int, int]] = {}
+    # axes of analog triggers, which rest at -1 instead of 0
+    TRIGGER_AXES: Tuple[int, ...] = ()
+    # input name -> name of the equivalent Xbox input. inputs without alias keep their name.
+    BUTTON_ALIASES_TO_XBOX: Dict[str, str] = {}
+
+    # max number of cached controller states per layout
+    MAX_CACHED_STATES = 4096
+
+    def __init__(self):
+        self.__button_layout = MappingProxyType(dict(self.BUTTON_LAYOUT))
+        self.__d_pad_layout = MappingProxyType(dict(self.D_PAD_LAYOUT))
+        self.__axis_layout = MappingProxyType(dict(self.AXIS_LAYOUT))
+        self.__aliases_to_xbox = MappingProxyType(dict(self.BUTTON_ALIASES_TO_XBOX))
+
+        # button names indexed by the button number
+        button_names_inv = {v: k for k, v in self.BUTTON_LAYOUT.items()}
+        self.__button_names = tuple(
+            button_names_inv.get(b, f"Button {b}")
+            for b in range(max(self.BUTTON_LAYOUT.values(), default=-1) + 1)
+        )
+        # d-pad input names by the packed d-pad state
+        self.__d_pad_names = {
+            pack_d_pad_state(state): name for name, state in self.D_PAD_LAYOUT.items()
+        }
+        # axis input names indexed by their bit in the axes bitmask of the controller state
+        self.__axis_names = tuple(self.AXIS_LAYOUT.keys())
+        # axis number -> ((bit, direction), ...) of the inputs of the axis
+        axis_inputs: Dict[int, List[Tuple[int, int]]] = {}
+        for bit, (axis, direction) in enumerate(self.AXIS_LAYOUT.values()):
+            axis_inputs.setdefault(axis, []).append((bit, direction))
+        self.__axis_inputs = {k: tuple(v) for k, v in axis_inputs.items()}
+        # (buttons bitmask, packed d-pad state, axes bitmask) -> (input names, Xbox input names)
+        self.__state_cache: Dict[
+            Tuple[int, int, int], Tuple[Tuple[str, ...], FrozenSet[str]]
+        ] = {}
+
     @abstractmethod
     def get_icon_dir(self) -> str:
         pass
 
     @abstractmethod
-    def get_button_layout(self) -> Dict[str, int]:
+    def get_layout_image_path(self) -> Path:
+        """Image of the controller that shows the names of its inputs."""
         pass
 
-    @abstractmethod
-    def get_d_pad_layout(self) -> Dict[str, Tuple[int, int]]:
-        pass
+    def get_button_layout(self) -> Mapping[str, int]:
+        return self.__button_layout
 
-    @abstractmethod
-    def button_aliases_to_xbox(self) -> Dict[str, str]:
-        pass
+    def get_d_pad_layout(self) -> Mapping[str, Tuple[int, int]]:
+        return self.__d_pad_layout
+
+    def get_axis_layout(self) -> Mapping[str, Tuple[int, int]]:
+        return self.__axis_layout
+
+    def get_axis_bit(self, name: str) -> int:
+        """Get the bit of an axis input in the axes bitmask of the controller state."""
+        return self.__axis_names.index(name)
+
+    def get_axis_inputs(self, axis: int) -> Tuple[Tuple[int, int], ...]:
+        """Get the (bit, direction) of all inputs of an axis (empty if the axis is not used)."""
+        return self.__axis_inputs.get(axis, ())
+
+    def is_trigger_axis(self, axis: int) -> bool:
+        return axis in self.TRIGGER_AXES
+
+    def button_aliases_to_xbox(self) -> Mapping[str, str]:
+        return self.__aliases_to_xbox
 
     def convert_button_names_to_xbox(
         self, buttons: List[str], sort: bool = True
     ) -> List[str]:
-        aliases = self.button_aliases_to_xbox()
+        aliases = self.__aliases_to_xbox
         out = [aliases.get(button, button) for button in buttons]
 
         if sort:
@@ -45,42 +120,78 @@ class ControllerLayout(ABC):
 
         return out
 
+    def get_button_name(self, button: int) -> str:
+        if 0 <= button < len(self.__button_names):
+            return self.__button_names[button]
+        return f"Button {button}"
+
     def button_numbers_to_names(
-        self, buttons: List[int], d_pad=Tuple[int, int]
+        self, buttons: List[int], d_pad: Tuple[int, int] = (0, 0), axes: int = 0
     ) -> List[str]:
-        names = []
-        button_mapper_inv = {v: k for k, v in self.get_button_layout().items()}
-        d_pad_mapper_inv = {v: k for k, v in self.get_d_pad_layout().items()}
+        names = [self.get_button_name(b) for b in buttons]
 
-        for b in buttons:
-            names.append(button_mapper_inv.get(b, f"Button {b}"))
+        d_pad_name = self.__d_pad_names.get(pack_d_pad_state(d_pad), None)
+        if d_pad_name is not None:
+            names.append(d_pad_name)
 
-        if d_pad_mapper_inv.get(d_pad, None) is not None:
-            names.append(d_pad_mapper_inv[d_pad])
+        for bit, name in enumerate(self.__axis_names):
+            if axes >> bit & 1:
+                names.append(name)
 
         return names
 
+    def get_inputs(
+        self, state: ControllerState
+    ) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+        """Get the names of the active inputs of a controller state.
+
+        The result is cached per state, so repeated lookups of the same input combination
+        don't need to build the names again.
+
+        Args:
+            state (ControllerState): State of a controller using this layout.
+
+        Returns:
+            Tuple[Tuple[str, ...], FrozenSet[str]]: The sorted input names and the Xbox input names.
+        """
+        key = (state.buttons, state.d_pad, state.axes)
+        inputs = self.__state_cache.get(key, None)
+        if inputs is None:
+            names = self.button_numbers_to_names(
+                buttons=state.active_buttons, d_pad=state.d_pad_state, axes=state.axes
+            )
+            names.sort()
+            inputs = (
+                tuple(names),
+                frozenset(self.convert_button_names_to_xbox(names, sort=False)),
+            )
+            if len(self.__state_cache) >= self.MAX_CACHED_STATES:
+                self.__state_cache.clear()
+            self.__state_cache[key] = inputs
+        return inputs
+
     def get_valid_input_names(self):
-        return list(self.get_button_layout().keys()) + list(
-            self.get_d_pad_layout().keys()
+        return (
+            list(self.get_button_layout().keys())
+            + list(self.get_d_pad_layout().keys())
+            + list(self.get_axis_layout().keys())
         )
 
     def get_button_icons(
         self,
         icon_size: Optional[Tuple[int, int]] = None,
-    ) -> Dict[str, ImageTk.PhotoImage]:
+    ) -> Dict[str, "ImageTk.PhotoImage"]:
         icons = {}
         dir = self.get_icon_dir()
-        for button in list(self.get_button_layout().keys()) + list(
-            self.get_d_pad_layout().keys()
-        ):
+        for button in self.get_valid_input_names():
             path = dir / f"{button.replace(' ','_')}.png"
             if path.is_file():
-                image = Image.open(path)
-                if icon_size:
-                    image = image.resize(icon_size)
+                image = load_image(path, size=icon_size)
             else:
-                image = None
+                # e.g. the axis inputs don't have an icon, so their name is shown instead
+                image = create_text_icon(
+                    button, height=icon_size[1] if icon_size else 32
+                )
 
             icons[button] = image
 
@@ -91,39 +202,52 @@ class XboxControllerLayout(ControllerLayout):
     def __repr__(self):
         return "XboxControllerLayout"
 
+    BUTTON_LAYOUT = {
+        "A": 0,
+        "B": 1,
+        "X": 2,
+        "Y": 3,
+        "LB": 4,
+        "RB": 5,
+        "Back": 6,
+        "Start": 7,
+        "L-Stick": 8,
+        "R-Stick": 9,
+        "X-Box": 10,
+        "Share": 11,
+    }
+
+    D_PAD_LAYOUT = {
+        "Left": (-1, 0),
+        "Right": (1, 0),
+        "Up": (0, 1),
+        "Down": (0, -1),
+        # "Left-Down": (-1, -1),
+        # "Left-Up": (-1, 1),
+        # "Right-Up": (1, 1),g
+        # "Right-Down": (1, -1),
+    }
+
+    AXIS_LAYOUT = {
+        "LS-Left": (0, -1),
+        "LS-Right": (0, 1),
+        "LS-Up": (1, -1),
+        "LS-Down": (1, 1),
+        "RS-Left": (2, -1),
+        "RS-Right": (2, 1),
+        "RS-Up": (3, -1),
+        "RS-Down": (3, 1),
+        "LT": (4, 1),
+        "RT": (5, 1),
+    }
+
+    TRIGGER_AXES = (4, 5)
+
     def get_icon_dir(self) -> str:
         return resources.XBOX_BUTTONS_DIR
 
-    def get_button_layout(self) -> Dict[str, int]:
-        return {
-            "A": 0,
-            "B": 1,
-            "X": 2,
-            "Y": 3,
-            "LB": 4,
-            "RB": 5,
-            "Back": 6,
-            "Start": 7,
-            "L-Stick": 8,
-            "R-Stick": 9,
-            "X-Box": 10,
-            "Share": 11,
-        }
-
-    def get_d_pad_layout(self) -> Dict[str, Tuple[int, int]]:
-        return {
-            "Left": (-1, 0),
-            "Right": (1, 0),
-            "Up": (0, 1),
-            "Down": (0, -1),
-            # "Left-Down": (-1, -1),
-            # "Left-Up": (-1, 1),
-            # "Right-Up": (1, 1),g
-            # "Right-Down": (1, -1),
-        }
-
-    def button_aliases_to_xbox(self) -> Dict[str, str]:
-        return {v: v for v in self.get_button_layout().keys()}
+    def get_layout_image_path(self) -> Path:
+        return resources.XBOX_CONTROLLER_LAYOUT
 
 
 class PlayStationControllerLayout(ControllerLayout):
@@ -131,54 +255,74 @@ class PlayStationControllerLayout(ControllerLayout):
     def __repr__(self):
         return "PlayStationControllerLayout"
 
+    BUTTON_LAYOUT = {
+        "Cross": 0,
+        "Circle": 1,
+        "Square": 2,
+        "Triangle": 3,
+        "Share": 4,
+        "PS": 5,
+        "Options": 6,
+        "L-Stick": 7,
+        "R-Stick": 8,
+        "L1": 9,
+        "R1": 10,
+        "Up": 11,
+        "Down": 12,
+        "Left": 13,
+        "Right": 14,
+        "Touch Pad": 15,
+    }
+
+    # on the PS4 controller, all buttons on the D-Pad are treated as normal buttons by pygame.
+    D_PAD_LAYOUT = {}
+
+    AXIS_LAYOUT = {
+        "LS-Left": (0, -1),
+        "LS-Right": (0, 1),
+        "LS-Up": (1, -1),
+        "LS-Down": (1, 1),
+        "RS-Left": (2, -1),
+        "RS-Right": (2, 1),
+        "RS-Up": (3, -1),
+        "RS-Down": (3, 1),
+        "L2": (4, 1),
+        "R2": (5, 1),
+    }
+
+    TRIGGER_AXES = (4, 5)
+
+    BUTTON_ALIASES_TO_XBOX = {
+        "Cross": "A",
+        "Circle": "B",
+        "Square": "X",
+        "Triangle": "Y",
+        "Share": "Back",
+        "PS": "X-Box",
+        "Options": "Start",
+        "L1": "LB",
+        "R1": "RB",
+        "L2": "LT",
+        "R2": "RT",
+    }
+
     def get_icon_dir(self) -> str:
         return resources.PLAYSTATION_BUTTONS_DIR
 
-    def get_button_layout(self) -> Dict[str, int]:
-        return {
-            "Cross": 0,
-            "Circle": 1,
-            "Square": 2,
-            "Triangle": 3,
-            "Share": 4,
-            "PS": 5,
-            "Options": 6,
-            "L-Stick": 7,
-            "R-Stick": 8,
-            "L1": 9,
-            "R1": 10,
-            "Up": 11,
-            "Down": 12,
-            "Left": 13,
-            "Right": 14,
-            "Touch Pad": 15,
-        }
+    def get_layout_image_path(self) -> Path:
+        return resources.PLAYSTATION_CONTROLLER_LAYOUT
 
-    def get_d_pad_layout(self) -> Dict[str, Tuple[int, int]]:
-        # on the PS4 controller, all buttons on the D-Pad are treated as normal buttons by pygame.
-        return {}
-
-    def button_aliases_to_xbox(self) -> Dict[str, str]:
-        return {
-            "Cross": "A",
-            "Circle": "B",
-            "Square": "X",
-            "Triangle": "Y",
-            "Share": "Back",
-            "PS": "X-Box",
-            "Options": "Start",
-            "L1": "LB",
-            "R1": "RB",
-        }
+
+# shared layout instances, so the lookup tables of each layout are only computed once
+_LAYOUTS: Dict[ControllerType, ControllerLayout] = {
+    ControllerType.XBOX: XboxControllerLayout(),
+    ControllerType.PLAYSTATION: PlayStationControllerLayout(),
+}
 
 
 def get_layout(controller_type: ControllerType) -> ControllerLayout:
-    layout = None
-    if controller_type == ControllerType.XBOX:
-        layout = XboxControllerLayout()
-    elif controller_type == ControllerType.PLAYSTATION:
-        layout = PlayStationControllerLayout()
-    else:
+    layout = _LAYOUTS.get(controller_type, None)
+    if layout is None:
         raise Exception(f"Layout for {controller_type} not yet implemented!")
 
     return layout
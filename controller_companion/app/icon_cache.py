@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from PIL import Image, ImageTk
+
+from controller_companion.app import resources
+from controller_companion.app.controller_layouts import ControllerType, get_layout
+from controller_companion.app.resource_bundle import load_image
+from controller_companion.app.utils import combine_images_horizontally
+
+ShortcutKey = Tuple[ControllerType, Tuple[str, ...], int]
+
+
+class IconAtlas:
+    """Holds the decoded and resized input icons and layout images of the controller layouts.
+
+    The images of a layout are loaded from disk once per size (on first use), afterwards they are
+    only looked up. Use `get_icon_atlas` to access the instance shared by the whole app.
+    """
+
+    def __init__(self):
+        self.__icons: Dict[Tuple[ControllerType, int], Dict[str, Image.Image]] = {}
+        self.__plus_icons: Dict[int, Image.Image] = {}
+        self.__layout_images: Dict[Tuple[ControllerType, int], Image.Image] = {}
+
+    def get_icons(
+        self, controller_type: ControllerType, size: int
+    ) -> Dict[str, Image.Image]:
+        """The icons of all inputs of a layout (by input name) with a height of `size`."""
+        key = (controller_type, size)
+        icons = self.__icons.get(key, None)
+        if icons is None:
+            icons = get_layout(controller_type).get_button_icons(icon_size=(size, size))
+            self.__icons[key] = icons
+        return icons
+
+    def get_plus_icon(self, size: int) -> Image.Image:
+        """The icon that is shown in between the inputs of a shortcut."""
+        icon = self.__plus_icons.get(size, None)
+        if icon is None:
+            icon = load_image(resources.PLUS_ICON, size=(size, size))
+            self.__plus_icons[size] = icon
+        return icon
+
+    def get_layout_image(
+        self, controller_type: ControllerType, width: int
+    ) -> Image.Image:
+        """The image of a controller layout (showing its input names), scaled to `width`."""
+        key = (controller_type, width)
+        image = self.__layout_images.get(key, None)
+        if image is None:
+            image = load_image(
+                get_layout(controller_type).get_layout_image_path(), width=width
+            )
+            if image.mode != "RGBA":
+                image = image.convert(mode="RGBA")
+            self.__layout_images[key] = image
+        return image
+
+
+class PhotoImageCache:
+    """Holds the Tk images of the input icons and layout images (e.g. for the create action popup).
+
+    The images are created once and reused by all popups. Must only be used by the Tk thread, use
+    `get_photo_images` to access the instance shared by the whole app.
+    """
+
+    def __init__(self, atlas: IconAtlas = None):
+        """
+        Args:
+            atlas (IconAtlas, optional): Source of the images. Defaults to the shared IconAtlas.
+        """
+        self.atlas = atlas if atlas is not None else get_icon_atlas()
+        self.__icons: Dict[
+            Tuple[ControllerType, int], Dict[str, ImageTk.PhotoImage]
+        ] = {}
+        self.__layout_images: Dict[Tuple[ControllerType, int], ImageTk.PhotoImage] = {}
+
+    def get_icons(
+        self, controller_type: ControllerType, size: int
+    ) -> Dict[str, ImageTk.PhotoImage]:
+        """The icons of all inputs of a layout (by input name) with a height of `size`."""
+        key = (controller_type, size)
+        icons = self.__icons.get(key, None)
+        if icons is None:
+            icons = {
+                name: ImageTk.PhotoImage(icon)
+                for name, icon in self.atlas.get_icons(controller_type, size).items()
+            }
+            self.__icons[key] = icons
+        return icons
+
+    def get_layout_image(
+        self, controller_type: ControllerType, width: int
+    ) -> ImageTk.PhotoImage:
+        """The image of a controller layout, scaled to `width`."""
+        key = (controller_type, width)
+        image = self.__layout_images.get(key, None)
+        if image is None:
+            image = ImageTk.PhotoImage(
+                self.atlas.get_layout_image(controller_type, width)
+            )
+            self.__layout_images[key] = image
+        return image
+
+
+class ShortcutImageCache:
+    """LRU cache of the composed shortcut images shown in the rows of the mapping treeview.
+
+    The images are keyed by (controller type, inputs, row height), so mappings with the same
+    shortcut share one image. Evicted images stay valid as long as a row keeps a reference to them.
+    Must only be used by the Tk thread.
+    """
+
+    def __init__(self, atlas: IconAtlas = None, max_size: int = 256):
+        """
+        Args:
+            atlas (IconAtlas, optional): Source of the input icons. Defaults to the shared IconAtlas.
+            max_size (int, optional): Max number of cached images. Defaults to 256.
+        """
+        self.atlas = atlas if atlas is not None else get_icon_atlas()
+        self.max_size = max_size
+        # (controller type, inputs, height) -> image, ordered from least to most recently used
+        self.__images: "OrderedDict[ShortcutKey, ImageTk.PhotoImage]" = OrderedDict()
+
+    def get(
+        self,
+        controller_type: ControllerType,
+        inputs: Sequence[str],
+        height: int,
+    ) -> ImageTk.PhotoImage:
+        """The image of a shortcut (its input icons separated by plus icons).
+
+        Args:
+            controller_type (ControllerType): Layout of the inputs.
+            inputs (Sequence[str]): Names of the inputs in the order they are shown.
+            height (int): Row height.
+
+        Returns:
+            ImageTk.PhotoImage: The composed image.
+        """
+        key = (controller_type, tuple(inputs), height)
+        image = self.__images.get(key, None)
+        if image is not None:
+            self.__images.move_to_end(key)
+            return image
+
+        icons = self.atlas.get_icons(controller_type, height - 5)
+        plus_icon = self.atlas.get_plus_icon(height // 3)
+        images = []
+        for name in inputs:
+            images.append(icons[name])
+            images.append(plus_icon)
+        images.pop()
+        image = ImageTk.PhotoImage(
+            combine_images_horizontally(images=images, height=height)
+        )
+
+        self.__images[key] = image
+        if len(self.__images) > self.max_size:
+            self.__images.popitem(last=False)
+        return image
+
+    def clear(self):
+        self.__images.clear()
+
+
+_atlas: Optional[IconAtlas] = None
+_photo_images: Optional[PhotoImageCache] = None
+
+
+def get_icon_atlas() -> IconAtlas:
+    """The IconAtlas shared by the whole app (created on first use)."""
+    global _atlas
+    if _atlas is None:
+        _atlas = IconAtlas()
+    return _atlas
+
+
+def get_photo_images() -> PhotoImageCache:
+    """The PhotoImageCache shared by the whole app (created on first use by the Tk thread)."""
+    global _photo_images
+    if _photo_images is None:
+        _photo_images = PhotoImageCache()
+    return _photo_images
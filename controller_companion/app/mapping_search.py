@@ -0,0 +1,80 @@
+from typing import Iterable, List
+
+from controller_companion.mapping import Mapping
+
+
+def _search_text(mapping: Mapping) -> str:
+    return "\n".join(
+        [mapping.name, mapping.target, mapping.get_shortcut_string()]
+    ).lower()
+
+
+class MappingSearchIndex:
+    """Searches the mappings by their name, target and shortcut (e.g. "A+B").
+
+    A query matches a mapping if all of its (whitespace separated) words are contained in the
+    name, target or shortcut of the mapping (case insensitive). The searchable text of each mapping
+    is built once. Searches are incremental: if a query extends the previous query (e.g. while
+    typing), only the previous matches are searched.
+    """
+
+    def __init__(self, mappings: Iterable[Mapping] = ()):
+        self.__mappings: List[Mapping] = []
+        self.__texts: List[str] = []
+        # positions of the mappings that matched the last query
+        self.__last_query = ""
+        self.__last_matches: List[int] = []
+        for mapping in mappings:
+            self.add(mapping)
+
+    def __len__(self):
+        return len(self.__mappings)
+
+    def add(self, mapping: Mapping):
+        self.__mappings.append(mapping)
+        self.__texts.append(_search_text(mapping))
+        self.__last_query = ""
+
+    def remove(self, mappings: Iterable[Mapping]):
+        """Removes the given mapping objects (compared by identity)."""
+        removed = set(id(m) for m in mappings)
+        kept = [
+            (mapping, text)
+            for mapping, text in zip(self.__mappings, self.__texts)
+            if id(mapping) not in removed
+        ]
+        self.__mappings = [mapping for mapping, _ in kept]
+        self.__texts = [text for _, text in kept]
+        self.__last_query = ""
+
+    def matches(self, mapping: Mapping, query: str) -> bool:
+        """Checks if a single mapping matches a query (without using the index)."""
+        text = _search_text(mapping)
+        return all(word in text for word in query.lower().split())
+
+    def search(self, query: str) -> List[Mapping]:
+        """Finds the mappings that match a query.
+
+        Args:
+            query (str): The search query, an empty query matches all mappings.
+
+        Returns:
+            List[Mapping]: The matching mappings (in the order they were added).
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            self.__last_query = ""
+            return list(self.__mappings)
+
+        if self.__last_query and query.startswith(self.__last_query):
+            # the query was extended, so it can only match a subset of the last matches
+            candidates = self.__last_matches
+        else:
+            candidates = range(len(self.__mappings))
+        words = query.split()
+        texts = self.__texts
+        matches = [i for i in candidates if all(word in texts[i] for word in words)]
+
+        self.__last_query = query
+        self.__last_matches = matches
+        return [self.__mappings[i] for i in matches]
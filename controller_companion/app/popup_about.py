@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import ttk
 import webbrowser
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 import controller_companion
 from controller_companion.app import resources
+from controller_companion.app.resource_bundle import load_image
 from controller_companion.app.utils import set_window_icon
 
 
@@ -21,11 +22,7 @@ class AboutScreen(tk.Toplevel):
         frame2.pack(fill=tk.Y, side=tk.LEFT)
 
         # Display it within a label.
-        image = ImageTk.PhotoImage(
-            Image.open(resources.APP_ICON_PNG).resize(
-                (50, 50),
-            )
-        )
+        image = ImageTk.PhotoImage(load_image(resources.APP_ICON_PNG, size=(50, 50)))
         label = ttk.Label(frame1, image=image, width=50)
         label.pack(side=tk.LEFT)
 
@@ -7,19 +7,19 @@ from tkinter import (
     StringVar,
     ttk,
 )
-from typing import Tuple
-from PIL import Image, ImageTk
+from typing import Dict, Tuple
 from tkinter import messagebox
-from controller_companion.app import resources
 from controller_companion.app.controller_layouts import (
     ControllerType,
     get_layout,
 )
+from controller_companion.app.icon_cache import get_photo_images
 from controller_companion.app.utils import set_window_icon
 from controller_companion.logs import logger
 
 from controller_companion.mapping import Mapping, ActionType
 from controller_companion.app.widgets.placeholder_entry import PlaceholderEntry
+from controller_companion.app.widgets.widget_pool import WidgetPool
 
 
 class CreateActionPopup(tk.Toplevel):
@@ -40,6 +40,7 @@ class CreateActionPopup(tk.Toplevel):
         self.layout = get_layout(self.controller_type)
         self.button_mapper = self.layout.get_button_layout()
         self.d_pad_mapper = self.layout.get_d_pad_layout()
+        self.axis_mapper = self.layout.get_axis_layout()
 
         frame_inputs = ttk.LabelFrame(
             master=self, height=50, text="Controller Shortcut"
@@ -51,6 +52,20 @@ class CreateActionPopup(tk.Toplevel):
 
         self.frame_buttons = tk.Frame(master=frame_inputs, padx=5)
         self.frame_buttons.pack(fill=tk.Y, side=tk.LEFT, expand=True)
+        tk.Label(self.frame_buttons, text="Buttons:", anchor="w").grid(
+            row=0, column=0, sticky="W"
+        )
+        # the images are shared by all popups and the input widgets are reused when the layout
+        # is switched, so opening the popup and switching layouts does not load any images
+        self.photo_images = get_photo_images()
+        self.pool_checkbuttons: WidgetPool[Checkbutton] = WidgetPool(
+            lambda: Checkbutton(self.frame_buttons, anchor="w")
+        )
+        self.pool_radiobuttons: WidgetPool[Radiobutton] = WidgetPool(
+            lambda: Radiobutton(self.frame_buttons, anchor="w")
+        )
+        # variables of the checkbuttons by input name (reused across layouts)
+        self.__button_vars: Dict[str, IntVar] = {}
 
         frame_action = ttk.LabelFrame(
             master=self, height=50, text="Action", padding=(0, 5, 5, 5)
@@ -158,13 +173,18 @@ class CreateActionPopup(tk.Toplevel):
             messagebox.showerror("Error", error)
             return
 
-        self.result = Mapping(
-            action_type=ActionType(self.var_action_type.get()),
-            target=target,
-            active_controller_buttons=active_controller_buttons,
-            name=name,
-            controller_type=self.controller_type,
-        )
+        try:
+            self.result = Mapping(
+                action_type=ActionType(self.var_action_type.get()),
+                target=target,
+                active_controller_buttons=active_controller_buttons,
+                name=name,
+                controller_type=self.controller_type,
+            )
+        except ValueError as e:
+            # e.g. a keyboard shortcut with an unknown key
+            messagebox.showerror("Error", str(e))
+            return
 
         self.destroy()
 
@@ -243,41 +263,29 @@ class CreateActionPopup(tk.Toplevel):
         self.layout = get_layout(self.controller_type)
         self.button_mapper = self.layout.get_button_layout()
         self.d_pad_mapper = self.layout.get_d_pad_layout()
+        self.axis_mapper = self.layout.get_axis_layout()
 
-        if self.controller_type == ControllerType.XBOX:
-            path = resources.XBOX_CONTROLLER_LAYOUT
-        else:
-            path = resources.PLAYSTATION_CONTROLLER_LAYOUT
-
-        image = Image.open(path)
-        image = image.resize(
-            (width, int(image.height * width / image.width)),
-        ).convert(mode="RGBA")
-        image = ImageTk.PhotoImage(image)
+        image = self.photo_images.get_layout_image(self.controller_type, width)
         self.label_layout.configure(image=image)
-        self.label_layout.image = image
 
-        for widget in self.frame_buttons.winfo_children():
-            widget.destroy()
-
-        tk.Label(self.frame_buttons, text="Buttons:", anchor="w").grid(
-            row=0, column=0, sticky="W"
-        )
         counter = 0
         buttons_per_column = 8
-        self.gamepad_input_icons = {
-            button: ImageTk.PhotoImage(image)
-            for button, image in self.layout.get_button_icons(
-                icon_size=(32, 32)
-            ).items()
-        }
-        for button in self.button_mapper.keys():
-            self.var_buttons[button] = IntVar()
-            check = Checkbutton(
-                self.frame_buttons,
+        self.gamepad_input_icons = self.photo_images.get_icons(
+            self.controller_type, size=32
+        )
+        self.var_buttons = {}
+        self.pool_checkbuttons.reset()
+        for button in list(self.button_mapper.keys()) + list(self.axis_mapper.keys()):
+            var = self.__button_vars.get(button, None)
+            if var is None:
+                var = IntVar()
+                self.__button_vars[button] = var
+            var.set(0)
+            self.var_buttons[button] = var
+            check = self.pool_checkbuttons.get()
+            check.configure(
                 text=button,
-                variable=self.var_buttons[button],
-                anchor="w",
+                variable=var,
                 image=self.gamepad_input_icons[button],
             )
             check.grid(
@@ -285,15 +293,16 @@ class CreateActionPopup(tk.Toplevel):
                 column=counter // buttons_per_column,
             )
             counter += 1
+        self.pool_checkbuttons.hide_unused()
 
         self.var_d_pad.set(-1)
+        self.pool_radiobuttons.reset()
         for idx, d_pad_state in enumerate(self.d_pad_mapper.keys()):
-            check = Radiobutton(
-                self.frame_buttons,
+            check = self.pool_radiobuttons.get()
+            check.configure(
                 text=d_pad_state,
                 variable=self.var_d_pad,
                 value=idx,
-                anchor="w",
                 image=self.gamepad_input_icons[d_pad_state],
             )
             check.grid(
@@ -301,3 +310,4 @@ class CreateActionPopup(tk.Toplevel):
                 column=counter // buttons_per_column,
             )
             counter += 1
+        self.pool_radiobuttons.hide_unused()
@@ -0,0 +1,209 @@
+"""Bundle of pre-rendered images for the executables.
+
+Instead of decoding and resizing the individual PNGs on every launch, the images are rendered at
+the sizes used by the app when the executable is built (`build_bundle`) and packed into one file:
+
+    header: magic (4 bytes), format version (uint32), size of the index (uint32)
+    index:  JSON {resource name: {size key: [width, height, offset in the data]}}
+    data:   raw RGBA pixels of all images
+
+At runtime the bundle is memory-mapped and the images are created directly on the mapped memory
+(no decoding, resizing or copying). Images that are not in the bundle (e.g. a size that is not
+pre-rendered) and all images when running from source are loaded from the PNG files instead.
+"""
+
+import json
+import mmap
+from pathlib import Path
+import struct
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from controller_companion.app import resources
+from controller_companion.logs import logger
+
+# PIL is imported by the functions that use it, so the cli does not load it
+if TYPE_CHECKING:
+    from PIL import Image
+
+MAGIC = b"CCRB"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+# sizes of the input icons: rows of the mapping treeview (row height - 5) and create action popup
+BUTTON_ICON_SIZES = [(25, 25), (32, 32)]
+# width of the layout images in the create action popup
+LAYOUT_IMAGE_WIDTH = 400
+
+
+def _size_key(size: Optional[Tuple[int, int]], width: Optional[int]) -> str:
+    if size is not None:
+        return f"{size[0]}x{size[1]}"
+    if width is not None:
+        return f"w{width}"
+    return "original"
+
+
+def _render(
+    image: "Image.Image",
+    size: Optional[Tuple[int, int]] = None,
+    width: Optional[int] = None,
+) -> "Image.Image":
+    if size is not None:
+        return image.resize(size)
+    if width is not None:
+        return image.resize((width, int(image.height * width / image.width)))
+    return image
+
+
+def get_bundled_images() -> Dict[Path, List[dict]]:
+    """The images that are pre-rendered: resource path -> render options (`size` or `width`)."""
+    from controller_companion.app.controller_layouts import ControllerType, get_layout
+
+    images = {
+        # window icons and about screen
+        resources.APP_ICON_PNG: [{}, {"size": (16, 16)}, {"size": (50, 50)}],
+        resources.APP_ICON_PNG_TRAY_16: [{}],
+        resources.APP_ICON_PNG_TRAY_32: [{}],
+        # in between the inputs of a shortcut (a third of the row height)
+        resources.PLUS_ICON: [{"size": (10, 10)}],
+    }
+    for controller_type in ControllerType:
+        layout = get_layout(controller_type)
+        images[layout.get_layout_image_path()] = [{"width": LAYOUT_IMAGE_WIDTH}]
+        for path in sorted(Path(layout.get_icon_dir()).glob("*.png")):
+            images[path] = [{"size": size} for size in BUTTON_ICON_SIZES]
+    return images
+
+
+def build_bundle(output: Union[Path, str]) -> Path:
+    """Renders the images of `get_bundled_images` and writes them into a bundle.
+
+    Args:
+        output (Union[Path, str]): Path of the bundle file.
+
+    Returns:
+        Path: Path of the bundle file.
+    """
+    from PIL import Image
+
+    index: Dict[str, Dict[str, List[int]]] = {}
+    chunks: List[bytes] = []
+    offset = 0
+    for path, options in get_bundled_images().items():
+        name = Path(path).relative_to(resources.RES_DIR).as_posix()
+        source = Image.open(path)
+        for option in options:
+            image = _render(source, **option)
+            data = image.convert(mode="RGBA").tobytes()
+            key = _size_key(option.get("size", None), option.get("width", None))
+            index.setdefault(name, {})[key] = [image.width, image.height, offset]
+            chunks.append(data)
+            offset += len(data)
+
+    index_data = json.dumps(index).encode("utf-8")
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index_data)))
+        f.write(index_data)
+        for data in chunks:
+            f.write(data)
+    logger.info(f"Bundled {len(chunks)} images ({offset / 1024:.0f} KiB) in {output}")
+    return output
+
+
+class ResourceBundle:
+    """A memory-mapped bundle written by `build_bundle`."""
+
+    def __init__(self, path: Union[Path, str]):
+        """
+        Args:
+            path (Union[Path, str]): Path of the bundle file.
+
+        Raises:
+            ValueError: If the file is not a bundle or has an unsupported format version.
+        """
+        with open(path, "rb") as f:
+            self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = _HEADER.unpack_from(self.__data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is not a resource bundle of version {FORMAT_VERSION}"
+            )
+        self.__index: Dict[str, Dict[str, List[int]]] = json.loads(
+            self.__data[_HEADER.size : _HEADER.size + index_size]
+        )
+        self.__data_start = _HEADER.size + index_size
+
+    def get(
+        self,
+        name: str,
+        size: Optional[Tuple[int, int]] = None,
+        width: Optional[int] = None,
+    ) -> Optional["Image.Image"]:
+        """Gets a pre-rendered image (read-only, backed by the mapped file).
+
+        Args:
+            name (str): Path of the resource relative to the resource directory.
+            size (Optional[Tuple[int, int]], optional): Size the image was resized to. Defaults to None.
+            width (Optional[int], optional): Width the image was scaled to (keeping its aspect ratio). Defaults to None.
+
+        Returns:
+            Optional[Image.Image]: The RGBA image or None if it is not in the bundle.
+        """
+        entry = self.__index.get(name, {}).get(_size_key(size, width), None)
+        if entry is None:
+            return None
+        from PIL import Image
+
+        w, h, offset = entry
+        offset += self.__data_start
+        data = memoryview(self.__data)[offset : offset + w * h * 4]
+        return Image.frombuffer("RGBA", (w, h), data, "raw", "RGBA", 0, 1)
+
+
+_bundle: Optional[ResourceBundle] = None
+_bundle_loaded = False
+
+
+def get_bundle() -> Optional[ResourceBundle]:
+    """The bundle of the executable (None when running from source or if it can't be loaded)."""
+    global _bundle, _bundle_loaded
+    if not _bundle_loaded:
+        _bundle_loaded = True
+        if resources.is_frozen() and resources.RESOURCE_BUNDLE.is_file():
+            try:
+                _bundle = ResourceBundle(resources.RESOURCE_BUNDLE)
+            except Exception as e:
+                logger.warning(f"Failed to load the resource bundle: {e}")
+    return _bundle
+
+
+def load_image(
+    path: Union[Path, str],
+    size: Optional[Tuple[int, int]] = None,
+    width: Optional[int] = None,
+) -> "Image.Image":
+    """Loads an image resource, pre-rendered from the bundle if available.
+
+    Args:
+        path (Union[Path, str]): Path of the image file.
+        size (Optional[Tuple[int, int]], optional): Resize the image to this size. Defaults to None.
+        width (Optional[int], optional): Scale the image to this width (keeping its aspect ratio). Defaults to None.
+
+    Returns:
+        Image.Image: The image.
+    """
+    bundle = get_bundle()
+    if bundle is not None:
+        path = Path(path)
+        if path.is_relative_to(resources.RES_DIR):
+            name = path.relative_to(resources.RES_DIR).as_posix()
+            image = bundle.get(name, size=size, width=width)
+            if image is not None:
+                return image
+
+    from PIL import Image
+
+    return _render(Image.open(path), size=size, width=width)
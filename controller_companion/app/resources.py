@@ -48,3 +48,6 @@ XBOX_BUTTONS_DIR = __get_resource_path("controller_companion/app/res/xbox")
 PLAYSTATION_BUTTONS_DIR = __get_resource_path(
     "controller_companion/app/res/playstation"
 )
+RES_DIR = __get_resource_path("controller_companion/app/res")
+# pre-rendered images, only included in the executables (see resource_bundle.py)
+RESOURCE_BUNDLE = __get_resource_path("controller_companion/app/res/resources.bundle")
@@ -0,0 +1,204 @@
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Callable, List, Optional, TypeVar
+
+from controller_companion.logs import logger
+
+T = TypeVar("T")
+
+
+def _write_atomic(path: Path, data: bytes):
+    # a crash can't leave a partially written file behind: the data is written to a temporary
+    # file, which is synced and renamed over the file
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(path: Path):
+    # makes the rename durable, directories can't be opened on windows
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+class SettingsStore:
+    """Loads the settings file and saves it on a background writer thread.
+
+    Saves are debounced: the settings are written `delay_s` after the first unsaved change, so a
+    burst of changes results in a single write and the caller never blocks on the disk. Each write
+    goes to a temporary file, which is synced and renamed over the settings file, so a crash can't
+    leave a partially written settings file behind. Before a write, the previous settings file is
+    kept as backup (if it is valid json), up to `backup_count` backups are kept
+    (`settings.json.bak1` is the newest). `load` falls back to them if the settings file can't be
+    loaded.
+    """
+
+    def __init__(self, path: Path, delay_s: float = 0.5, backup_count: int = 3):
+        """
+        Args:
+            path (Path): The settings file.
+            delay_s (float, optional): Time between the first unsaved change and the write. Defaults to 0.5.
+            backup_count (int, optional): Number of kept backups. Defaults to 3.
+        """
+        self.path = Path(path)
+        self.delay_s = delay_s
+        self.backup_count = backup_count
+        # file the settings were loaded from (the settings file or a backup)
+        self.loaded_from: Optional[Path] = None
+        self.thread: Optional[threading.Thread] = None
+        self.__condition = threading.Condition()
+        self.__pending: Optional[dict] = None
+        self.__deadline = 0.0
+        self.__writing = False
+        self.__closed = False
+
+    def get_backup_paths(self) -> List[Path]:
+        """Paths of the backups, from the newest to the oldest."""
+        return [
+            self.path.with_name(f"{self.path.name}.bak{i}")
+            for i in range(1, self.backup_count + 1)
+        ]
+
+    def load(self, parse: Callable[[dict], T]) -> Optional[T]:
+        """Loads the settings file or, if it can't be loaded, the newest backup that can be loaded.
+
+        Args:
+            parse (Callable[[dict], T]): Converts the loaded json, raises an exception if it is invalid.
+
+        Raises:
+            Exception: The error of the settings file, if neither it nor a backup could be loaded.
+
+        Returns:
+            Optional[T]: The parsed settings or None if there is no settings file.
+        """
+        if not self.path.is_file():
+            return None
+
+        error = None
+        for path in [self.path] + self.get_backup_paths():
+            if not path.is_file():
+                continue
+            try:
+                result = parse(json.loads(path.read_text()))
+            except Exception as e:
+                logger.warning(f"Failed to load the settings from {path}: {e}")
+                if error is None:
+                    error = e
+                continue
+            self.loaded_from = path
+            return result
+        raise error
+
+    def save(self, settings: dict):
+        """Schedules a write of the settings (never blocks).
+
+        Only a shallow copy of the settings is kept, so their values must be replaced instead of
+        being modified in place until they were written.
+
+        Args:
+            settings (dict): The settings, must be serializable to json.
+        """
+        with self.__condition:
+            if self.__closed:
+                logger.warning(
+                    "Settings were saved after the settings store was closed."
+                )
+                return
+            if self.__pending is None:
+                self.__deadline = time.monotonic() + self.delay_s
+            self.__pending = dict(settings)
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.__run, name="SettingsWriter", daemon=True
+                )
+                self.thread.start()
+            self.__condition.notify_all()
+
+    def has_unsaved_changes(self) -> bool:
+        """Checks if settings were saved that are not written to the settings file yet."""
+        with self.__condition:
+            return self.__pending is not None or self.__writing
+
+    def flush(self):
+        """Writes the pending settings now and waits until they were written."""
+        with self.__condition:
+            self.__deadline = 0.0
+            self.__condition.notify_all()
+            while self.__pending is not None or self.__writing:
+                self.__condition.wait()
+
+    def close(self):
+        """Writes the pending settings and stops the writer thread."""
+        self.flush()
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+            thread = self.thread
+        if thread is not None:
+            thread.join()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while True:
+                    if self.__pending is not None:
+                        remaining = self.__deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.__condition.wait(remaining)
+                    elif self.__closed:
+                        return
+                    else:
+                        self.__condition.wait()
+                settings, self.__pending = self.__pending, None
+                self.__writing = True
+
+            try:
+                self.__write(settings)
+            except Exception as e:
+                logger.error(f"Failed to save the settings to {self.path}: {e}")
+            finally:
+                with self.__condition:
+                    self.__writing = False
+                    self.__condition.notify_all()
+
+    def __write(self, settings: dict):
+        data = json.dumps(settings, indent=4).encode("utf-8")
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.__backup()
+        _write_atomic(self.path, data)
+        logger.debug("Saved settings to: %s", self.path)
+
+    def __backup(self):
+        # keeps the current settings file as the newest backup, if it is a valid snapshot
+        backups = self.get_backup_paths()
+        if not backups:
+            return
+        try:
+            previous = self.path.read_bytes()
+            json.loads(previous)
+        except (OSError, ValueError):
+            # no settings file yet or it is corrupt (e.g. edited by hand)
+            return
+        if backups[0].is_file() and backups[0].read_bytes() == previous:
+            return
+
+        for newer, older in reversed(list(zip(backups, backups[1:]))):
+            if newer.is_file():
+                os.replace(newer, older)
+        _write_atomic(backups[0], previous)
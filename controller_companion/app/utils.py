@@ -1,17 +1,22 @@
 from enum import Enum
 import platform
-from tkinter import Tk
-from typing import List
-from PIL import Image, ImageTk
+from typing import TYPE_CHECKING, List
 
 
 from controller_companion.app import resources
+from controller_companion.app.resource_bundle import load_image
 
+# PIL and tkinter are imported by the functions that use them, so the cli does not load them
+if TYPE_CHECKING:
+    from tkinter import Tk
+    from PIL import Image
 
-def set_window_icon(root: Tk):
-    im = Image.open(resources.APP_ICON_PNG)
-    photo_32 = ImageTk.PhotoImage(im)
-    photo_16 = ImageTk.PhotoImage(im.resize(size=(16, 16)))
+
+def set_window_icon(root: "Tk"):
+    from PIL import ImageTk
+
+    photo_32 = ImageTk.PhotoImage(load_image(resources.APP_ICON_PNG))
+    photo_16 = ImageTk.PhotoImage(load_image(resources.APP_ICON_PNG, size=(16, 16)))
     root.iconphoto(False, photo_32, photo_16)
 
 
@@ -26,10 +31,12 @@ def get_os() -> OperatingSystem:
 
 
 def combine_images_horizontally(
-    images: List[Image.Image],
+    images: List["Image.Image"],
     height: int,
     center_vertically=True,
-) -> Image.Image:
+) -> "Image.Image":
+    from PIL import Image
+
     total_width = sum([i.width for i in images])
     combined_icons = Image.new("RGBA", (total_width, height))
     x_offset = 0
@@ -40,3 +47,20 @@ def combine_images_horizontally(
         x_offset += im.size[0]
 
     return combined_icons
+
+
+def create_text_icon(text: str, height: int, color="black") -> "Image.Image":
+    """Renders a text into a transparent image (e.g. for controller inputs without icon)."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=max(1, int(height * 0.6)))
+    except TypeError:
+        # Pillow < 10.1 only has a bitmap default font of a fixed size
+        font = ImageFont.load_default()
+    left, top, right, bottom = font.getbbox(text)
+    image = Image.new("RGBA", (right - left + 4, height))
+    ImageDraw.Draw(image).text(
+        (2 - left, (height - (bottom - top)) // 2 - top), text, fill=color, font=font
+    )
+    return image
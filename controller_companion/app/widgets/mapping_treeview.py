@@ -0,0 +1,146 @@
+import tkinter
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, List, Optional
+
+from PIL import ImageTk
+
+from controller_companion.app.icon_cache import ShortcutImageCache
+from controller_companion.app.widgets.controller_listbox import PopupMenuTreeview
+from controller_companion.mapping import Mapping
+
+
+class MappingTreeview(PopupMenuTreeview):
+    """Treeview of mappings (shortcut image, name and target) that scales to thousands of mappings.
+
+    The rows are inserted page by page, the next page is inserted once the view is scrolled close
+    to the end of the inserted rows. The shortcut images are only set for the visible rows, so the
+    number of bitmaps that are held does not grow with the number of mappings.
+    """
+
+    def __init__(
+        self,
+        parent,
+        shortcut_images: ShortcutImageCache,
+        rowheight: int,
+        page_size: int = 100,
+        menu_actions: Dict[str, Callable[[None], None]] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            parent: The parent widget.
+            shortcut_images (ShortcutImageCache): Creates the shortcut images of the rows.
+            rowheight (int): Height of the rows (as configured in the style of the treeview).
+            page_size (int, optional): Number of rows that are inserted at once. Defaults to 100.
+            menu_actions (Dict[str, Callable[[None], None]], optional): Actions of the context menu. Defaults to None.
+        """
+        super().__init__(parent, menu_actions=menu_actions, **kwargs)
+        self.shortcut_images = shortcut_images
+        self.rowheight = rowheight
+        self.page_size = page_size
+        self.scrollbar: Optional[ttk.Scrollbar] = None
+        # the shown mappings, only the first len(self.__iids) of them are inserted
+        self.__mappings: List[Mapping] = []
+        self.__iids: List[str] = []
+        self.__row_mappings: Dict[str, Mapping] = {}
+        # images of the visible rows, the treeview does not keep references to them
+        self.__row_images: Dict[str, ImageTk.PhotoImage] = {}
+        self.__update_scheduled = False
+
+        self.configure(yscrollcommand=self.__on_scroll)
+        self.bind("<Configure>", lambda _: self.__schedule_update(), add=True)
+
+    def set_mappings(self, mappings: Iterable[Mapping]):
+        """Replaces the shown mappings."""
+        self.delete(*self.__iids)
+        self.__mappings = list(mappings)
+        self.__iids = []
+        self.__row_mappings = {}
+        self.__row_images = {}
+        self.yview_moveto(0)
+        self.__load_page()
+        self.__schedule_update()
+
+    def append(self, mapping: Mapping):
+        """Shows another mapping at the end."""
+        all_loaded = len(self.__iids) == len(self.__mappings)
+        self.__mappings.append(mapping)
+        if all_loaded:
+            self.__insert(mapping)
+            self.__schedule_update()
+
+    def remove(self, mappings: Iterable[Mapping]):
+        """Removes the rows of the given mapping objects (compared by identity)."""
+        removed = set(id(m) for m in mappings)
+        iids = [iid for iid in self.__iids if id(self.__row_mappings[iid]) in removed]
+        self.delete(*iids)
+        for iid in iids:
+            del self.__row_mappings[iid]
+            self.__row_images.pop(iid, None)
+        self.__mappings = [m for m in self.__mappings if id(m) not in removed]
+        self.__iids = [iid for iid in self.__iids if iid in self.__row_mappings]
+        self.__schedule_update()
+
+    def selected_mappings(self) -> List[Mapping]:
+        return [self.__row_mappings[iid] for iid in self.selection()]
+
+    def __insert(self, mapping: Mapping):
+        iid = self.insert(
+            "",
+            tkinter.END,
+            text="",
+            values=(
+                mapping.name,
+                mapping.target,
+            ),
+        )
+        self.__iids.append(iid)
+        self.__row_mappings[iid] = mapping
+
+    def __load_page(self):
+        start = len(self.__iids)
+        for mapping in self.__mappings[start : start + self.page_size]:
+            self.__insert(mapping)
+
+    def __on_scroll(self, first: str, last: str):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= 0.9 and len(self.__iids) < len(self.__mappings):
+            # close to the end of the inserted rows
+            self.__load_page()
+        self.__schedule_update()
+
+    def __schedule_update(self):
+        if not self.__update_scheduled:
+            self.__update_scheduled = True
+            self.after_idle(self.__update_visible_rows)
+
+    def __update_visible_rows(self):
+        self.__update_scheduled = False
+        top = int(round(self.yview()[0] * len(self.__iids)))
+        count = self.winfo_height() // self.rowheight + 1
+        visible = self.__iids[top : top + count]
+
+        # release the images of the rows that were scrolled out of the view
+        visible_set = set(visible)
+        for iid in [iid for iid in self.__row_images if iid not in visible_set]:
+            self.item(iid, image="")
+            del self.__row_images[iid]
+
+        min_width = self.column("#0", "minwidth")
+        for iid in visible:
+            if iid in self.__row_images:
+                continue
+            mapping = self.__row_mappings[iid]
+            image = self.shortcut_images.get(
+                mapping.controller_type,
+                mapping.active_controller_buttons,
+                height=self.rowheight,
+            )
+            self.item(iid, image=image)
+            self.__row_images[iid] = image
+            # make sure the width of the first column is large enough to fit the shortcut image
+            # an offset is added to account for the treeview's indicator at the very left
+            min_width = max(min_width, image.width() + 30)
+        if min_width != self.column("#0", "minwidth"):
+            self.column("#0", minwidth=min_width)
@@ -0,0 +1,35 @@
+import tkinter as tk
+from typing import Callable, Generic, List, TypeVar
+
+W = TypeVar("W", bound=tk.Widget)
+
+
+class WidgetPool(Generic[W]):
+    """Reuses grid widgets instead of destroying and recreating them (e.g. when a frame is rebuilt).
+
+    Call `reset`, then `get` one widget per shown item (and configure and grid it), then
+    `hide_unused` to remove the remaining widgets of the pool from the grid.
+    """
+
+    def __init__(self, factory: Callable[[], W]):
+        """
+        Args:
+            factory (Callable[[], W]): Creates a new widget if the pool is exhausted.
+        """
+        self.factory = factory
+        self.__widgets: List[W] = []
+        self.__used = 0
+
+    def reset(self):
+        self.__used = 0
+
+    def get(self) -> W:
+        if self.__used == len(self.__widgets):
+            self.__widgets.append(self.factory())
+        widget = self.__widgets[self.__used]
+        self.__used += 1
+        return widget
+
+    def hide_unused(self):
+        for widget in self.__widgets[self.__used :]:
+            widget.grid_remove()
@@ -0,0 +1,92 @@
+from typing import Dict, List, Tuple
+
+from controller_companion.controller import Controller
+
+
+class AxisPipeline:
+    """Turns the motion of analog axes into discrete virtual inputs (e.g. "LT" or "RS-Up").
+
+    Axis events are coalesced: only the latest value of each axis is kept until `process` is
+    called once per batch of events, which then applies the thresholds to all changed axes of all
+    controllers in a single pass. The thresholds use hysteresis, an input is activated once its
+    axis reaches `press_threshold` and released once it falls below `release_threshold`, so noise
+    around a threshold does not toggle the input.
+    """
+
+    def __init__(self, press_threshold: float = 0.6, release_threshold: float = 0.4):
+        """
+        Args:
+            press_threshold (float, optional): Deflection in [0, 1] that activates an axis input. Defaults to 0.6.
+            release_threshold (float, optional): Deflection in [0, 1] below which an active axis input is released. Defaults to 0.4.
+
+        Raises:
+            ValueError: If the thresholds are not 0 < release_threshold <= press_threshold <= 1.
+        """
+        if not 0 < release_threshold <= press_threshold <= 1:
+            raise ValueError(
+                f"Invalid axis thresholds (press: {press_threshold}, release: {release_threshold})!"
+            )
+        self.press_threshold = press_threshold
+        self.release_threshold = release_threshold
+        # (instance id, axis) -> latest value
+        self.__pending: Dict[Tuple[int, int], float] = {}
+
+    def set_axis(self, instance_id: int, axis: int, value: float):
+        """Stores the latest value of an axis (in [-1, 1]) until the next `process` call."""
+        self.__pending[(instance_id, axis)] = value
+
+    def remove(self, instance_id: int):
+        """Discards the pending values of a removed controller."""
+        for key in [key for key in self.__pending if key[0] == instance_id]:
+            del self.__pending[key]
+
+    def reset(self):
+        """Discards all pending values."""
+        self.__pending.clear()
+
+    def process(self, controllers: Dict[int, Controller]) -> List[int]:
+        """Applies the pending axis values to the states of the controllers.
+
+        Args:
+            controllers (Dict[int, Controller]): The controllers by their instance id.
+
+        Returns:
+            List[int]: Instance ids of the controllers whose active axis inputs changed.
+        """
+        if not self.__pending:
+            return []
+        pending, self.__pending = self.__pending, {}
+        press_threshold = self.press_threshold
+        release_threshold = self.release_threshold
+
+        # new bitmask of the active axis inputs per controller
+        masks: Dict[int, int] = {}
+        for (instance_id, axis), value in pending.items():
+            controller = controllers.get(instance_id, None)
+            if controller is None:
+                continue
+            layout = controller.layout
+            inputs = layout.get_axis_inputs(axis)
+            if not inputs:
+                continue
+
+            mask = masks.get(instance_id, None)
+            if mask is None:
+                mask = controller.controller_state.axes
+            if layout.is_trigger_axis(axis):
+                # triggers rest at -1
+                value = (value + 1) / 2
+            for bit, direction in inputs:
+                deflection = value * direction
+                if mask >> bit & 1:
+                    if deflection < release_threshold:
+                        mask &= ~(1 << bit)
+                elif deflection >= press_threshold:
+                    mask |= 1 << bit
+            masks[instance_id] = mask
+
+        return [
+            instance_id
+            for instance_id, mask in masks.items()
+            if controllers[instance_id].update_controller_state(axes=mask)
+        ]
@@ -0,0 +1,164 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from controller_companion.mapping import Mapping
+
+# see Mapping.get_key
+MappingKey = Tuple[FrozenSet[str], str]
+
+
+class _ControllerComboState:
+    def __init__(self):
+        # mappings whose input combination is currently held
+        self.held: Dict[MappingKey, Mapping] = {}
+        # time of the last execution per mapping
+        self.last_fired: Dict[MappingKey, float] = {}
+        # time the input combination was left per mapping
+        self.released_at: Dict[MappingKey, float] = {}
+        # time of the next hold-to-repeat execution per mapping
+        self.next_repeat: Dict[MappingKey, float] = {}
+
+
+class ComboDetector:
+    """Decides when the mappings matching the state of a controller are executed.
+
+    A mapping fires on the rising edge, i.e. when a controller enters its input combination, and
+    not again while the combination is held. The following options of the mapping are respected:
+    - `debounce_ms`: leaving and re-entering the combination within this window does not fire again.
+    - `repeat_ms`: while the combination is held, the mapping fires again in this interval.
+    - `cooldown_ms`: min time between two executions of the mapping on the same controller.
+
+    The state of the mappings is tracked by their key (see `Mapping.get_key`), so it is kept when
+    the mappings are replaced by equivalent ones (e.g. when the config is reloaded).
+
+    All times are given in seconds as returned by `time.monotonic()`.
+    """
+
+    def __init__(self):
+        self.__controllers: Dict[int, _ControllerComboState] = {}
+
+    def update(
+        self, instance_id: int, matching: List[Mapping], now: float
+    ) -> List[Mapping]:
+        """Updates the mappings that match the current state of a controller.
+
+        Args:
+            instance_id (int): Instance id of the controller.
+            matching (List[Mapping]): Mappings matching the current state of the controller.
+            now (float): The current time.
+
+        Returns:
+            List[Mapping]: The mappings that need to be executed.
+        """
+        state = self.__controllers.get(instance_id, None)
+        if state is None:
+            if len(matching) == 0:
+                return []
+            state = self.__controllers.setdefault(instance_id, _ControllerComboState())
+
+        held = {mapping.get_key(): mapping for mapping in matching}
+        for key in state.held:
+            if key not in held:
+                state.released_at[key] = now
+                state.next_repeat.pop(key, None)
+
+        fired = []
+        for key, mapping in held.items():
+            if key in state.held:
+                continue
+
+            if now - state.released_at.get(key, -1e9) < mapping.debounce_ms / 1000:
+                # the combination was only left for a short time (e.g. a bouncing button)
+                # so it is treated as if it has been held all the time.
+                if mapping.repeat_ms > 0:
+                    state.next_repeat.setdefault(
+                        key,
+                        state.last_fired.get(key, now) + mapping.repeat_ms / 1000,
+                    )
+            elif self.__fire(state, key, mapping, now):
+                fired.append(mapping)
+
+        state.held = held
+        return fired
+
+    def set_mappings(self, mappings: Iterable[Mapping]):
+        """Carries the state over to a new set of mappings (e.g. after the config was reloaded).
+
+        Held mappings are replaced by the new mapping with the same key, so they are neither fired
+        again nor lose their cooldown. The state of mappings that no longer exist is dropped.
+
+        Args:
+            mappings (Iterable[Mapping]): The new mappings.
+        """
+        new_mappings = {mapping.get_key(): mapping for mapping in mappings}
+        for state in self.__controllers.values():
+            state.held = {
+                key: new_mappings[key] for key in state.held if key in new_mappings
+            }
+            for times in (state.last_fired, state.released_at):
+                for key in [key for key in times if key not in new_mappings]:
+                    del times[key]
+            # the repeat option of a held mapping might have been removed
+            for key in [
+                key
+                for key in state.next_repeat
+                if key not in state.held or state.held[key].repeat_ms <= 0
+            ]:
+                del state.next_repeat[key]
+
+    def poll(self, now: float) -> List[Tuple[int, Mapping]]:
+        """Get the mappings whose hold-to-repeat execution is due.
+
+        Args:
+            now (float): The current time.
+
+        Returns:
+            List[Tuple[int, Mapping]]: The due mappings with the instance id of their controller.
+        """
+        fired = []
+        for instance_id, state in self.__controllers.items():
+            for key, due in list(state.next_repeat.items()):
+                mapping = state.held[key]
+                if now >= due and self.__fire(state, key, mapping, now):
+                    fired.append((instance_id, mapping))
+        return fired
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the time of the next hold-to-repeat execution.
+
+        Returns:
+            Optional[float]: The time or None if no mapping with repeat is held.
+        """
+        return min(
+            (
+                due
+                for state in self.__controllers.values()
+                for due in state.next_repeat.values()
+            ),
+            default=None,
+        )
+
+    def is_holding(self, instance_id: int) -> bool:
+        """Check if the controller currently holds the input combination of any mapping."""
+        state = self.__controllers.get(instance_id, None)
+        return state is not None and len(state.held) > 0
+
+    def remove(self, instance_id: int):
+        """Forget the state of a controller (e.g. because it was disconnected)."""
+        self.__controllers.pop(instance_id, None)
+
+    def __fire(
+        self,
+        state: _ControllerComboState,
+        key: MappingKey,
+        mapping: Mapping,
+        now: float,
+    ) -> bool:
+        last_fired = state.last_fired.get(key, None)
+        if mapping.repeat_ms > 0:
+            state.next_repeat[key] = now + mapping.repeat_ms / 1000
+
+        if last_fired is not None and now - last_fired < mapping.cooldown_ms / 1000:
+            return False
+
+        state.last_fired[key] = now
+        return True
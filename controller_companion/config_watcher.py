@@ -0,0 +1,156 @@
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+import threading
+from typing import Callable, Optional, Tuple
+
+from controller_companion.app.utils import OperatingSystem, get_os
+from controller_companion.logs import logger
+
+# inotify constants from sys/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+# struct inotify_event {int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[];}
+INOTIFY_EVENT_FORMAT = "iIII"
+INOTIFY_EVENT_SIZE = struct.calcsize(INOTIFY_EVENT_FORMAT)
+
+
+class ConfigWatcher:
+    """Watches a file for changes and calls a callback (on the watcher thread) if it changed.
+
+    On Linux, inotify is used to get notified about changes of the file immediately. On other
+    platforms (or if inotify is not available), the modification time of the file is polled.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        callback: Callable[[Path], None],
+        poll_interval_s: float = 1.0,
+        debounce_s: float = 0.05,
+    ):
+        """
+        Args:
+            path (Path): The watched file.
+            callback (Callable[[Path], None]): Called with the path when the file changed.
+            poll_interval_s (float, optional): Poll interval if inotify is not available. Defaults to 1.0.
+            debounce_s (float, optional): Changes within this time are reported only once. Defaults to 0.05.
+        """
+        self.path = Path(path).absolute()
+        self.callback = callback
+        self.poll_interval_s = poll_interval_s
+        self.debounce_s = debounce_s
+        self.thread: Optional[threading.Thread] = None
+        self.__stop_event = threading.Event()
+        self.__wake_up_r, self.__wake_up_w = None, None
+
+    def start(self):
+        self.__stop_event.clear()
+        self.__wake_up_r, self.__wake_up_w = os.pipe()
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.__stop_event.set()
+            os.write(self.__wake_up_w, b"\0")
+            self.thread.join()
+        for fd in [self.__wake_up_r, self.__wake_up_w]:
+            if fd is not None:
+                os.close(fd)
+        self.__wake_up_r, self.__wake_up_w = None, None
+
+    def __run(self):
+        inotify_fd = self.__init_inotify()
+        if inotify_fd is None:
+            logger.debug(f"Polling {self.path} for changes.")
+            self.__poll()
+        else:
+            logger.debug(f"Watching {self.path} for changes using inotify.")
+            try:
+                self.__watch(inotify_fd)
+            finally:
+                os.close(inotify_fd)
+
+    def __notify(self):
+        try:
+            self.callback(self.path)
+        except Exception as e:
+            logger.error(f"Failed to handle the change of {self.path}: {e}")
+
+    # ---------------------------------- polling --------------------------------- #
+    def __stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def __poll(self):
+        last = self.__stat()
+        while not self.__stop_event.wait(self.poll_interval_s):
+            current = self.__stat()
+            if current != last:
+                last = current
+                if current is not None:
+                    self.__notify()
+
+    # ---------------------------------- inotify --------------------------------- #
+    def __init_inotify(self) -> Optional[int]:
+        if get_os() != OperatingSystem.LINUX or not self.path.parent.is_dir():
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK)
+            if fd < 0:
+                return None
+            # the directory is watched, as editors often replace the file instead of writing it
+            wd = libc.inotify_add_watch(
+                fd,
+                str(self.path.parent).encode(),
+                IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE,
+            )
+            if wd < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def __watch(self, inotify_fd: int):
+        name = os.fsencode(self.path.name)
+        while not self.__stop_event.is_set():
+            if not self.__wait_for_change(inotify_fd, name, timeout=None):
+                continue
+            # wait until the file is not changing anymore
+            while self.__wait_for_change(inotify_fd, name, timeout=self.debounce_s):
+                pass
+            if not self.__stop_event.is_set() and self.path.is_file():
+                self.__notify()
+
+    def __wait_for_change(
+        self, inotify_fd: int, name: bytes, timeout: Optional[float]
+    ) -> bool:
+        readable, _, _ = select.select([inotify_fd, self.__wake_up_r], [], [], timeout)
+        if inotify_fd not in readable:
+            return False
+
+        changed = False
+        try:
+            data = os.read(inotify_fd, 4096)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset + INOTIFY_EVENT_SIZE <= len(data):
+            _, _, _, length = struct.unpack_from(INOTIFY_EVENT_FORMAT, data, offset)
+            offset += INOTIFY_EVENT_SIZE
+            event_name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            changed |= event_name == name
+        return changed
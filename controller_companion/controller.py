@@ -1,6 +1,5 @@
 from dataclasses import dataclass
-import os
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, FrozenSet, List, Optional, Tuple
 
 from controller_companion.app.controller_layouts import (
     ControllerType,
@@ -8,14 +7,12 @@ from controller_companion.app.controller_layouts import (
 )
 
 from controller_companion.logs import logger
-
-# import pygame, hide welcome message
-os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "yes"
-import pygame
-
-
 from controller_companion.controller_state import ControllerState
 
+if TYPE_CHECKING:
+    # pygame is only needed by the pygame input backend
+    import pygame
+
 
 class Controller:
 
@@ -34,25 +31,19 @@ class Controller:
         self.power_level = power_level
         self.initialized = initialized
         self.layout = get_layout(controller_type)
-        self.active_controller_inputs = (
-            active_controller_inputs if active_controller_inputs else []
-        )
-        self.__controller_state = (
-            __controller_state if __controller_state else ControllerState()
-        )
+        if __controller_state is None:
+            __controller_state = self.__state_from_inputs(
+                active_controller_inputs if active_controller_inputs else []
+            )
+        self.__controller_state = __controller_state
+        # the active inputs are derived lazily from the controller state
+        self.__active_controller_inputs: Optional[List[str]] = None
+        self.__active_xbox_combo: Optional[FrozenSet[str]] = None
 
     @classmethod
-    def from_pygame(cls, joystick: pygame.joystick.JoystickType):
+    def from_pygame(cls, joystick: "pygame.joystick.JoystickType"):
         name = joystick.get_name().removeprefix("Controller (").removesuffix(")")
-        controller_type = ControllerType.XBOX
-        if "xbox" in name.lower():
-            controller_type = ControllerType.XBOX
-        elif any([n in name.lower() for n in ["ps3", "ps4", "ps5", "playstation"]]):
-            controller_type = ControllerType.PLAYSTATION
-        else:
-            logger.warning(
-                f'Failed to find out the type of controller for "{name}" so the {controller_type.name} layout will be used.'
-            )
+        controller_type = cls.detect_controller_type(name)
 
         return cls(
             # on windows the controller name is wrapped inside "Controller()" when connected via USB (XBOX)
@@ -64,22 +55,34 @@ class Controller:
             controller_type=controller_type,
         )
 
+    @staticmethod
+    def detect_controller_type(name: str) -> ControllerType:
+        """Guesses the type of a controller from its name (defaults to Xbox)."""
+        controller_type = ControllerType.XBOX
+        if "xbox" in name.lower():
+            controller_type = ControllerType.XBOX
+        elif any(
+            [
+                n in name.lower()
+                for n in ["ps3", "ps4", "ps5", "playstation", "dualsense", "dualshock"]
+            ]
+        ):
+            controller_type = ControllerType.PLAYSTATION
+        else:
+            logger.warning(
+                f'Failed to find out the type of controller for "{name}" so the {controller_type.name} layout will be used.'
+            )
+        return controller_type
+
     def matches(
         self,
         active_controller_inputs: List[str],
         controller_type: ControllerType,
     ) -> bool:
-        other = Controller(
-            None,
-            None,
-            None,
-            False,
-            controller_type=controller_type,
-            active_controller_inputs=active_controller_inputs,
-        )
-
-        return (
-            self.get_active_xbox_button_names() == other.get_active_xbox_button_names()
+        return self.active_xbox_combo == frozenset(
+            get_layout(controller_type).convert_button_names_to_xbox(
+                active_controller_inputs, sort=False
+            )
         )
 
     def update_controller_state(
@@ -87,21 +90,82 @@ class Controller:
         button: Optional[int] = None,
         d_pad_state: Optional[Tuple[int, int]] = None,
         add_button: bool = True,
-    ):
+        axes: Optional[int] = None,
+    ) -> bool:
+        """Updates the state of the controller.
+
+        Args:
+            button (Optional[int], optional): Number of the pressed/ released button. Defaults to None.
+            d_pad_state (Optional[Tuple[int, int]], optional): New state of the d-pad. Defaults to None.
+            add_button (bool, optional): True if the button was pressed, False if it was released. Defaults to True.
+            axes (Optional[int], optional): New bitmask of the active axis inputs. Defaults to None.
+
+        Returns:
+            bool: True if the state of the controller changed.
+        """
+        changed = False
         if button is not None:
             if add_button:
-                self.__controller_state.active_buttons.append(button)
+                changed |= self.__controller_state.press(button)
             else:
-                self.__controller_state.active_buttons.remove(button)
+                changed |= self.__controller_state.release(button)
 
         if d_pad_state is not None:
-            self.__controller_state.d_pad_state = d_pad_state
+            changed |= self.__controller_state.set_d_pad_state(d_pad_state)
+
+        if axes is not None:
+            changed |= self.__controller_state.set_axes(axes)
+
+        if changed:
+            self.__active_controller_inputs = None
+            self.__active_xbox_combo = None
+
+        return changed
+
+    @property
+    def controller_state(self) -> ControllerState:
+        return self.__controller_state
 
-        self.active_controller_inputs = self.layout.button_numbers_to_names(
-            buttons=self.__controller_state.active_buttons,
-            d_pad=self.__controller_state.d_pad_state,
+    @property
+    def active_controller_inputs(self) -> List[str]:
+        """Names of the active controller inputs (sorted)."""
+        if self.__active_controller_inputs is None:
+            names, self.__active_xbox_combo = self.layout.get_inputs(
+                self.__controller_state
+            )
+            self.__active_controller_inputs = list(names)
+        return self.__active_controller_inputs
+
+    @property
+    def active_xbox_combo(self) -> FrozenSet[str]:
+        """The active controller inputs using the Xbox button names."""
+        if self.__active_xbox_combo is None:
+            _, self.__active_xbox_combo = self.layout.get_inputs(
+                self.__controller_state
+            )
+        return self.__active_xbox_combo
+
+    def __state_from_inputs(
+        self, active_controller_inputs: List[str]
+    ) -> ControllerState:
+        button_layout = self.layout.get_button_layout()
+        d_pad_layout = self.layout.get_d_pad_layout()
+        axis_layout = self.layout.get_axis_layout()
+        buttons = []
+        d_pad_state = (0, 0)
+        axes = []
+        for name in active_controller_inputs:
+            if name in button_layout:
+                buttons.append(button_layout[name])
+            elif name in d_pad_layout:
+                d_pad_state = d_pad_layout[name]
+            elif name in axis_layout:
+                axes.append(self.layout.get_axis_bit(name))
+            else:
+                raise Exception(f"Unknown controller input {name} for {self.layout}.")
+        return ControllerState(
+            active_buttons=buttons, d_pad_state=d_pad_state, active_axes=axes
         )
-        self.active_controller_inputs.sort()
 
     def get_active_xbox_button_names(self):
         return self.layout.convert_button_names_to_xbox(
@@ -109,9 +173,9 @@ class Controller:
         )
 
     def __repr__(self):
-        content = ", ".join(
-            f'{key}: "{value}"'
-            for key, value in self.__dict__.items()
-            if not key.startswith("_")
+        # the fields are listed explicitly, which is cheaper than iterating over __dict__
+        return (
+            f'Controller(name: "{self.name}", guid: "{self.guid}", '
+            f'power_level: "{self.power_level}", initialized: "{self.initialized}", '
+            f'layout: "{self.layout}", active_controller_inputs: "{self.active_controller_inputs}")'
         )
-        return f"Controller({content})"
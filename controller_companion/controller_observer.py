@@ -1,7 +1,20 @@
-import os
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
 import threading
+import time
 import traceback
-from typing import Callable, Dict, List
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
 
 
 from controller_companion.app.controller_layouts import (
@@ -10,22 +23,75 @@ from controller_companion.app.controller_layouts import (
 from controller_companion.logs import logger
 from controller_companion import logs
 
-# import pygame, hide welcome message
-os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "yes"
-import pygame
-from rich.table import Table
-from rich.console import Console
+from controller_companion.axis_pipeline import AxisPipeline
+from controller_companion.combo_detector import ComboDetector
+from controller_companion.config_watcher import ConfigWatcher
+from controller_companion.dispatcher import LatestValueDispatcher
+from controller_companion.executor import ActionExecutor, AsyncActionExecutor
+from controller_companion.input_backend import (
+    InputBackend,
+    InputEvent,
+    InputEventType,
+    PygameInputBackend,
+)
+from controller_companion.mapping import Mapping, load_mappings
+from controller_companion.registry import MappingRegistry
+from controller_companion.controller import Controller
 
+# asyncio is only imported when observing through `run`
+if TYPE_CHECKING:
+    import asyncio
 
-from controller_companion.mapping import Mapping
-from controller_companion.controller import Controller
+
+class ObserverEventType(Enum):
+    CONTROLLER_CONNECTED = "Controller Connected"
+    CONTROLLER_DISCONNECTED = "Controller Disconnected"
+    MAPPING_TRIGGERED = "Mapping Triggered"
+
+
+class ObserverEvent(NamedTuple):
+    """Event that is delivered by `ControllerObserver.events`."""
+
+    type: ObserverEventType
+    instance_id: int
+    # the connected controller (None if it was disconnected)
+    controller: Optional[Controller] = None
+    # the triggered mapping
+    mapping: Optional[Mapping] = None
 
 
 class ControllerObserver:
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 4, backend: Optional[InputBackend] = None):
+        """
+        Args:
+            max_workers (int, optional): Max number of actions that are executed in parallel. Defaults to 4.
+            backend (Optional[InputBackend], optional): Source of the controller events. Defaults to a PygameInputBackend.
+        """
         self.thread = None
         self.do_run = False
+        self.max_workers = max_workers
+        self.executor: Optional[ActionExecutor] = None
+        self.combo_detector = ComboDetector()
+        self.axis_pipeline = AxisPipeline()
+        # defined mappings and disabled controllers, published as immutable snapshots
+        self.registry = MappingRegistry()
+        self.config_watcher: Optional[ConfigWatcher] = None
+        self.controllers: Dict[int, Controller] = {}
+        self.backend = backend if backend is not None else PygameInputBackend()
+        # statistics about restarts of the observation after exceptions
+        self.restart_count = 0
+        self.last_error: Optional[str] = None
+        self.last_restart_time: Optional[float] = None
+        self.__stop_event = threading.Event()
+        self.__axes_enabled = False
+        # version of the registry snapshot whose mappings the combo detector knows
+        self.__mappings_version = -1
+        # only set while observing through `run`
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__woken: Optional[asyncio.Event] = None
+        self.__event_queue: "Optional[asyncio.Queue[Optional[ObserverEvent]]]" = None
+        self.__max_queued_events = 256
 
     def start_detached(
         self,
@@ -34,6 +100,9 @@ class ControllerObserver:
         controller_callback: Callable[[List[Controller]], None] = None,
         restart_delay_ms: int = 1000,
         disabled_controllers: List[str] = None,
+        wait_timeout_ms: int = 1000,
+        max_restart_delay_ms: int = 60000,
+        detect_transient_combos: bool = True,
     ):
         self.thread = threading.Thread(
             target=self.start,
@@ -46,6 +115,9 @@ class ControllerObserver:
                 "controller_callback": controller_callback,
                 "restart_delay_ms": restart_delay_ms,
                 "disabled_controllers": disabled_controllers,
+                "wait_timeout_ms": wait_timeout_ms,
+                "max_restart_delay_ms": max_restart_delay_ms,
+                "detect_transient_combos": detect_transient_combos,
             },
         )
         self.thread.start()
@@ -57,8 +129,190 @@ class ControllerObserver:
         controller_callback: Callable[[List[Controller]], None] = None,
         restart_delay_ms: int = 1000,
         disabled_controllers: List[str] = None,
+        wait_timeout_ms: int = 1000,
+        max_restart_delay_ms: int = 60000,
+        detect_transient_combos: bool = True,
+    ):
+        """Observes the controller inputs and executes the defined mappings.
+
+        If an exception occurs, the observation is restarted after a delay that doubles with
+        every consecutive failure (up to `max_restart_delay_ms`).
+
+        Args:
+            defined_actions (List[Mapping]): List of defined mappings.
+            debug (bool, optional): Enable debug messages. Defaults to False.
+            controller_callback (Callable[[List[Controller]], None], optional): Called when a controller is connected or removed. Defaults to None.
+            restart_delay_ms (int, optional): Initial delay before the observation is restarted after an exception. Defaults to 1000.
+            disabled_controllers (List[str], optional): List of guids of the disabled controllers. Defaults to None.
+            wait_timeout_ms (int, optional): Max time the observer blocks while waiting for new events. Defaults to 1000.
+            max_restart_delay_ms (int, optional): Max delay before the observation is restarted. Defaults to 60000.
+            detect_transient_combos (bool, optional): Also detect input combinations that only exist in between the events of one batch (e.g. a button that is pressed and released within one batch). Defaults to True.
+        """
+        self.__begin(defined_actions, debug, disabled_controllers)
+        if self.executor is None:
+            self.executor = ActionExecutor(max_workers=self.max_workers)
+        # the callback is called by a single dispatcher thread so it does not keep the observer
+        # waiting (e.g. app in background). controller changes that happen while the callback is
+        # running are coalesced into the latest list of controllers.
+        dispatcher = (
+            LatestValueDispatcher(
+                controller_callback, name="ControllerCallbackDispatcher"
+            )
+            if controller_callback
+            else None
+        )
+        restart_delay = restart_delay_ms
+
+        while self.do_run:
+            # the backend is only opened again if it was shut down by the exception, this way
+            # the already opened controllers and their states are kept.
+            if not self.backend.is_open():
+                self.backend.open()
+            started = time.monotonic()
+
+            try:
+                self.__subscribe_to_events(
+                    dispatcher=dispatcher,
+                    wait_timeout_ms=wait_timeout_ms,
+                    detect_transient_combos=detect_transient_combos,
+                )
+            except Exception:
+                restart_delay = self.__on_exception(
+                    started, restart_delay, restart_delay_ms, max_restart_delay_ms
+                )
+                self.__stop_event.wait(restart_delay / 1000)
+                restart_delay = min(restart_delay * 2, max_restart_delay_ms)
+
+        if dispatcher is not None:
+            dispatcher.close()
+        self.backend.close()
+        self.executor.shutdown()
+        self.executor = None
+
+    async def run(
+        self,
+        defined_actions: List[Mapping],
+        debug: bool = False,
+        controller_callback: Callable[[List[Controller]], None] = None,
+        restart_delay_ms: int = 1000,
+        disabled_controllers: List[str] = None,
+        wait_timeout_ms: int = 1000,
+        max_restart_delay_ms: int = 60000,
+        detect_transient_combos: bool = True,
+        max_queued_events: int = 256,
+    ):
+        """Observes the controller inputs inside the running event loop until `stop` is called.
+
+        Works like `start`, but integrates with asyncio: backends that provide a file descriptor
+        (e.g. evdev) are waited on by the event loop itself, other backends wait on a single worker
+        thread. Controller hot-plugs and triggered mappings are delivered through `events`. Unless
+        another executor was set, the actions are awaited by an `AsyncActionExecutor`.
+
+        Args:
+            defined_actions (List[Mapping]): List of defined mappings.
+            debug (bool, optional): Enable debug messages. Defaults to False.
+            controller_callback (Callable[[List[Controller]], None], optional): Called on the event loop when a controller is connected or removed, may also be a coroutine function. Defaults to None.
+            restart_delay_ms (int, optional): Initial delay before the observation is restarted after an exception. Defaults to 1000.
+            disabled_controllers (List[str], optional): List of guids of the disabled controllers. Defaults to None.
+            wait_timeout_ms (int, optional): Max time the observer waits for new events. Defaults to 1000.
+            max_restart_delay_ms (int, optional): Max delay before the observation is restarted. Defaults to 60000.
+            detect_transient_combos (bool, optional): Also detect input combinations that only exist in between the events of one batch. Defaults to True.
+            max_queued_events (int, optional): Max number of buffered events of `events`, the oldest event is dropped if they are not consumed in time. Defaults to 256.
+        """
+        import asyncio
+        import inspect
+
+        loop = asyncio.get_running_loop()
+        self.__begin(defined_actions, debug, disabled_controllers)
+        if self.executor is None:
+            self.executor = AsyncActionExecutor(max_workers=self.max_workers)
+        self.__max_queued_events = max_queued_events
+        self.__woken = asyncio.Event()
+        self.__loop = loop
+        # opens and waits on backends that can't be waited on by the event loop
+        worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ControllerObserver"
+        )
+        callbacks: Set[asyncio.Future] = set()
+
+        def on_hotplug(event: ObserverEvent):
+            self.__publish(event)
+            if controller_callback:
+                result = controller_callback(list(self.controllers.values()))
+                if inspect.isawaitable(result):
+                    future = asyncio.ensure_future(result)
+                    callbacks.add(future)
+                    future.add_done_callback(callbacks.discard)
+
+        restart_delay = restart_delay_ms
+        try:
+            while self.do_run:
+                if not self.backend.is_open():
+                    await loop.run_in_executor(worker, self.backend.open)
+                started = time.monotonic()
+
+                try:
+                    await self.__subscribe_to_events_async(
+                        worker=worker,
+                        on_hotplug=on_hotplug,
+                        wait_timeout_ms=wait_timeout_ms,
+                        detect_transient_combos=detect_transient_combos,
+                    )
+                except Exception:
+                    restart_delay = self.__on_exception(
+                        started, restart_delay, restart_delay_ms, max_restart_delay_ms
+                    )
+                    if self.do_run:
+                        await self.__wait_woken(restart_delay)
+                    restart_delay = min(restart_delay * 2, max_restart_delay_ms)
+        finally:
+            self.do_run = False
+            self.__loop = None
+            # the worker might still be waiting for events
+            self.backend.wake_up()
+            await loop.run_in_executor(worker, self.backend.close)
+            worker.shutdown(wait=False)
+            # the shutdown of an AsyncActionExecutor awaits its running actions
+            result = self.executor.shutdown()
+            if inspect.isawaitable(result):
+                await result
+            self.executor = None
+            self.__publish(None)
+            self.__event_queue = None
+
+    async def events(self) -> AsyncIterator[ObserverEvent]:
+        """Iterates over the controller hot-plugs and triggered mappings while observing through `run`.
+
+        The iteration ends when `run` returns, it ends immediately if the observer is not running
+        through `run` (e.g. if `run` was only scheduled as a task but did not start yet or already
+        returned). Events are only buffered once the iteration started, the oldest event is dropped
+        if the buffer is full (see `max_queued_events` of `run`).
+
+        Yields:
+            ObserverEvent: The next event.
+        """
+        import asyncio
+
+        if self.__loop is None:
+            # not running, nothing would ever be published to the queue
+            return
+        if self.__event_queue is None:
+            self.__event_queue = asyncio.Queue(maxsize=self.__max_queued_events)
+        events = self.__event_queue
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            yield event
+
+    def __begin(
+        self,
+        defined_actions: List[Mapping],
+        debug: bool,
+        disabled_controllers: Optional[List[str]],
     ):
         self.do_run = True
+        self.__stop_event.clear()
 
         if debug:
             logs.set_log_level(logs.DEBUG)
@@ -67,6 +321,9 @@ class ControllerObserver:
 
         # ------------------- print the defined mappings in a table ------------------ #
         if len(defined_actions) > 0:
+            from rich.console import Console
+            from rich.table import Table
+
             table = Table(title="Defined Mappings")
             table.add_column("Name", justify="left", style="blue", header_style="blue")
             table.add_column(
@@ -94,135 +351,365 @@ class ControllerObserver:
             logger.info("No mappings have been defined.")
         # ---------------------------------------------------------------------------- #
 
-        logger.debug(f"Disabled controllers: {disabled_controllers}")
+        logger.debug("Disabled controllers: %s", disabled_controllers)
         logger.info("Listening to controller inputs.")
 
-        pygame.init()
+        self.registry.publish(
+            mappings=defined_actions, disabled_controllers=disabled_controllers or []
+        )
+
+    def __on_exception(
+        self,
+        started: float,
+        restart_delay: int,
+        restart_delay_ms: int,
+        max_restart_delay_ms: int,
+    ) -> int:
+        """Records the current exception and returns the delay before the observation is restarted."""
+        self.restart_count += 1
+        self.last_error = traceback.format_exc()
+        self.last_restart_time = time.time()
+        logger.error(
+            "An exception occurred inside __subscribe_to_events:\n%s", self.last_error
+        )
+
+        if (time.monotonic() - started) * 1000 > max_restart_delay_ms:
+            # the observation ran fine for a while, so don't keep the backoff
+            restart_delay = restart_delay_ms
+        logger.info(
+            "restarting controller observation in %sms (restart #%s)",
+            restart_delay,
+            self.restart_count,
+        )
+        return restart_delay
+
+    def set_mappings(self, mappings: List[Mapping]):
+        """Replaces the defined mappings. Can be called from any thread, also while observing.
 
+        The mappings are compiled by the calling thread and published as a new snapshot, so the
+        observer thread never waits for the update and never sees a partial state.
+
+        Args:
+            mappings (List[Mapping]): The new mappings (the list is copied).
+        """
+        self.registry.publish(mappings=mappings)
+
+    def set_disabled_controllers(self, disabled_controllers: List[str]):
+        """Replaces the disabled controllers. Can be called from any thread, also while observing.
+
+        Args:
+            disabled_controllers (List[str]): The guids of the disabled controllers (the list is copied).
+        """
+        self.registry.publish(disabled_controllers=disabled_controllers)
+
+    def watch_config(self, path: Path):
+        """Reloads the mappings whenever the config file changes (without restarting the observer).
+
+        If the changed config file is invalid, the previous mappings are kept.
+
+        Args:
+            path (Path): The config file.
+        """
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+        self.config_watcher = ConfigWatcher(path, callback=self.__reload_config)
+        self.config_watcher.start()
+
+    def __reload_config(self, path: Path):
         try:
-            self.__subscribe_to_pygame_events(
-                defined_actions=defined_actions,
-                controller_callback=controller_callback,
-                disabled_controllers=disabled_controllers,
-            )
-        except Exception:
+            mappings = load_mappings(path)
+        except Exception as e:
             logger.error(
-                f"An exception occurred inside __process_pygame_events:\n{traceback.format_exc()}"
+                "Failed to reload the config file %s, keeping the previous mappings: %s",
+                path,
+                e,
             )
-            logger.info(f"restarting controller observation in {restart_delay_ms}s")
-            pygame.time.wait(restart_delay_ms)
-            return self.start(
-                defined_actions=defined_actions,
-                debug=debug,
-                controller_callback=controller_callback,
-                restart_delay_ms=restart_delay_ms,
-            )
-
-        pygame.quit()
+            return
+        self.set_mappings(mappings)
+        logger.info("Reloaded %s mappings from %s", len(mappings), path)
 
     def stop(self):
-        """Stops the controller observer thread if it was launches detached."""
-        if self.thread and self.thread.is_alive:
+        """Stops the controller observation, either the detached thread or `run`."""
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+        if self.thread and self.thread.is_alive():
             self.do_run = False
+            self.__stop_event.set()
+            self.wake_up()
             self.thread.join()
             logger.debug("ControllerObserver thread stopped.")
+        elif self.__loop is not None:
+            # `run` returns as soon as the event loop processed the wake up
+            self.do_run = False
+            self.wake_up()
+
+    def wake_up(self):
+        """Wakes up the observer loop if it is currently waiting for new events."""
+        self.backend.wake_up()
+        loop = self.__loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.__woken.set)
+            except RuntimeError:
+                # the event loop is already closed
+                pass
 
-    def __subscribe_to_pygame_events(
+    def __subscribe_to_events(
         self,
-        defined_actions: Dict[str, Mapping] = {},
-        controller_callback: Callable[[List[Controller]], None] = None,
-        disabled_controllers: List[str] = None,
+        dispatcher: Optional[LatestValueDispatcher] = None,
+        wait_timeout_ms: int = 1000,
+        detect_transient_combos: bool = True,
     ):
-        controllers: Dict[int, Controller] = {}
-        # we do not really need access the joysticks, but apparently we need to
-        # keep a reference to all connected joysticks for them to function.
-        pygame_joysticks: Dict[int, pygame.joystick.JoystickType] = {}
+        backend = self.backend
+        self.__reset_axes_enabled()
+
+        def on_hotplug(event: ObserverEvent):
+            if dispatcher is not None:
+                dispatcher.submit(list(self.controllers.values()))
+
+        # the processes of the actions that finished are reaped regularly (the processes of the
+        # AsyncActionExecutor are reaped by asyncio)
+        supervisor = (
+            self.executor.supervisor
+            if isinstance(self.executor, ActionExecutor)
+            else None
+        )
+        last_reap = time.monotonic()
 
         while self.do_run:
-            for event in pygame.event.get():
-                instance_id = event.dict.get("instance_id", None)
+            self.__update_axes_enabled()
+            # block until the next event arrives (or the timeout is reached) and then drain all
+            # remaining events.
+            events = backend.wait(self.__next_timeout(wait_timeout_ms))
+            self.__process_events(events, on_hotplug, detect_transient_combos)
 
-                if event.type in [pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP]:
-                    button = event.dict["button"]
+            if supervisor is not None and time.monotonic() - last_reap >= 1.0:
+                last_reap = time.monotonic()
+                supervisor.reap()
 
-                    controllers[instance_id].update_controller_state(
-                        button=button, add_button=event.type == pygame.JOYBUTTONDOWN
-                    )
-                elif event.type == pygame.JOYHATMOTION:
-                    d_pad_state = event.dict["value"]
-                    controllers[instance_id].update_controller_state(
-                        d_pad_state=d_pad_state
+    async def __subscribe_to_events_async(
+        self,
+        worker: ThreadPoolExecutor,
+        on_hotplug: Callable[[ObserverEvent], None],
+        wait_timeout_ms: int = 1000,
+        detect_transient_combos: bool = True,
+    ):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        backend = self.backend
+        self.__reset_axes_enabled()
+
+        fd = backend.fileno()
+        if fd is not None:
+            try:
+                loop.add_reader(fd, self.__woken.set)
+            except NotImplementedError:
+                # e.g. the ProactorEventLoop on Windows
+                fd = None
+
+        try:
+            while self.do_run:
+                self.__update_axes_enabled()
+                if fd is None:
+                    events = await loop.run_in_executor(
+                        worker, backend.wait, self.__next_timeout(wait_timeout_ms)
                     )
-                elif event.type in [pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED]:
-                    if event.type == pygame.JOYDEVICEADDED:
-                        joy = pygame.joystick.Joystick(event.device_index)
-                        instance_id = joy.get_instance_id()
-                        pygame_joysticks[instance_id] = joy
-
-                        controllers[instance_id] = Controller.from_pygame(joystick=joy)
-                        logger.info(f"Controller connected: {controllers[instance_id]}")
-                    else:
-                        c = controllers.pop(instance_id)
-                        logger.info(f"Controller removed: {c}")
-                        del pygame_joysticks[event.instance_id]
-
-                    if controller_callback:
-                        # call the callback through a thread so it does not keep the observer waiting (e.g. app in background)
-                        threading.Thread(
-                            target=controller_callback,
-                            args=[list(controllers.values())],
-                        ).start()
                 else:
-                    # skip all other events. this way only relevant updates are processed below.
-                    # this is relevant as e.g. thumbstick updates spam lots of updates
-                    continue
-                self.__check_for_mappings(
-                    controllers, defined_actions, disabled_controllers
+                    # the reader sets the event again if the backend is still readable
+                    self.__woken.clear()
+                    events = backend.wait(0)
+                self.__process_events(events, on_hotplug, detect_transient_combos)
+
+                if fd is not None and self.do_run:
+                    await self.__wait_woken(self.__next_timeout(wait_timeout_ms))
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+
+    async def __wait_woken(self, timeout_ms: int):
+        import asyncio
+
+        try:
+            await asyncio.wait_for(self.__woken.wait(), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+    def __publish(self, event: Optional[ObserverEvent]):
+        """Adds an event to the queue of `events` (None ends the iteration)."""
+        events = self.__event_queue
+        if events is None:
+            # nobody is listening
+            return
+        if events.full():
+            dropped = events.get_nowait()
+            logger.debug("Dropped observer event as the queue is full: %s", dropped)
+        events.put_nowait(event)
+
+    def __next_timeout(self, wait_timeout_ms: int) -> int:
+        timeout = wait_timeout_ms
+        deadline = self.combo_detector.next_deadline()
+        if deadline is not None:
+            # wake up in time for the next hold-to-repeat execution
+            timeout = min(timeout, max(1, int((deadline - time.monotonic()) * 1000)))
+        return timeout
+
+    def __process_events(
+        self,
+        events: List[InputEvent],
+        on_hotplug: Callable[[ObserverEvent], None],
+        detect_transient_combos: bool,
+    ):
+        controllers = self.controllers
+
+        snapshot = self.registry.snapshot
+        if snapshot.version != self.__mappings_version:
+            # the mappings were replaced (e.g. the config was reloaded), held combinations are
+            # carried over to the new mappings so they don't fire again
+            self.__mappings_version = snapshot.version
+            self.combo_detector.set_mappings(snapshot.mappings)
+
+        # the events of the batch are applied to the controller states first and the
+        # mappings are evaluated once per changed controller afterwards.
+        changed = set()
+        for event in events:
+            instance_id = event.instance_id
+
+            if event.type == InputEventType.BUTTON_DOWN:
+                state_changed = controllers[instance_id].update_controller_state(
+                    button=event.button, add_button=True
                 )
+            elif event.type == InputEventType.BUTTON_UP:
+                state_changed = controllers[instance_id].update_controller_state(
+                    button=event.button, add_button=False
+                )
+            elif event.type == InputEventType.HAT:
+                state_changed = controllers[instance_id].update_controller_state(
+                    d_pad_state=event.value
+                )
+            elif event.type == InputEventType.AXIS:
+                # only the latest value per axis is kept and applied after the whole batch
+                self.axis_pipeline.set_axis(instance_id, event.axis, event.value)
+                continue
+            else:
+                if event.type == InputEventType.DEVICE_ADDED:
+                    controllers[instance_id] = event.controller
+                    logger.info("Controller connected: %s", event.controller)
+                    on_hotplug(
+                        ObserverEvent(
+                            ObserverEventType.CONTROLLER_CONNECTED,
+                            instance_id,
+                            controller=event.controller,
+                        )
+                    )
+                else:
+                    c = controllers.pop(instance_id)
+                    self.combo_detector.remove(instance_id)
+                    self.axis_pipeline.remove(instance_id)
+                    changed.discard(instance_id)
+                    logger.info("Controller removed: %s", c)
+                    on_hotplug(
+                        ObserverEvent(
+                            ObserverEventType.CONTROLLER_DISCONNECTED, instance_id
+                        )
+                    )
+                continue
+
+            if not state_changed:
+                continue
+            changed.add(instance_id)
+            if detect_transient_combos and (
+                controllers[instance_id].active_xbox_combo
+                in self.registry.snapshot.mapping_index
+                or self.combo_detector.is_holding(instance_id)
+            ):
+                # the intermediate state matches a mapping (or releases one), so it is
+                # evaluated right away as it might not exist anymore at the end of the batch
+                self.__check_for_mappings(controllers, [instance_id])
+
+        # axis inputs only change if an axis crossed its threshold
+        changed.update(self.axis_pipeline.process(controllers))
+
+        if changed:
+            self.__check_for_mappings(controllers, changed)
+            if logger.isEnabledFor(logs.DEBUG):
+                logger.debug("Controller state changed: %s", controllers)
+
+        for instance_id, action in self.combo_detector.poll(time.monotonic()):
+            self.__execute(action, instance_id)
 
-                if event.type in [
-                    pygame.JOYBUTTONDOWN,
-                    pygame.JOYBUTTONUP,
-                    pygame.JOYHATMOTION,
-                ]:
-                    logger.debug(f"Controller state changed: {controllers}")
-            pygame.time.wait(250)
+    def __reset_axes_enabled(self):
+        self.__axes_enabled = False
+        self.backend.set_axes_enabled(False)
+
+    def __update_axes_enabled(self):
+        # only listen to the axes if they are used by a mapping, so they cost nothing otherwise
+        uses_axes = self.registry.snapshot.mapping_index.uses_axes
+        if uses_axes != self.__axes_enabled:
+            self.__set_axes_enabled(uses_axes)
+
+    def __set_axes_enabled(self, enabled: bool):
+        self.__axes_enabled = enabled
+        self.backend.set_axes_enabled(enabled)
+        if not enabled:
+            # the axis inputs would be stuck otherwise, as no more updates are received
+            self.axis_pipeline.reset()
+            changed = [
+                instance_id
+                for instance_id, controller in self.controllers.items()
+                if controller.update_controller_state(axes=0)
+            ]
+            self.__check_for_mappings(self.controllers, changed)
+        logger.debug("Listening to axis inputs: %s", enabled)
 
     def __check_for_mappings(
-        self,
-        controller_states: Dict[int, Controller],
-        defined_actions: List[Mapping],
-        disabled_controllers: List[str] = None,
+        self, controller_states: Dict[int, Controller], instance_ids: Iterable[int]
     ):
-        """Checks if one of the current controller states matches a defined mapping.
+        """Checks if the current states of the given controllers match a defined mapping.
 
         Args:
             controller_states (Dict[int, ControllerState]): Dict of all current controller states where the key is the instance-id.
-            defined_actions (List[Mapping]): List of defined mappings.
-            disabled_controllers (List[str]): List of guids of the disabled controllers.
+            instance_ids (Iterable[int]): Instance ids of the controllers to check (e.g. the ones whose state changed).
         """
-        if disabled_controllers is None:
-            disabled_controllers = []
+        # take the current snapshot once, newer versions might be published by other threads
+        snapshot = self.registry.snapshot
+        now = time.monotonic()
 
-        for instance_id, controller in controller_states.items():
+        debug = logger.isEnabledFor(logs.DEBUG)
+
+        for instance_id in instance_ids:
+            controller = controller_states[instance_id]
             if (
-                not isinstance(controller.layout, XboxControllerLayout)
+                debug
+                and not isinstance(controller.layout, XboxControllerLayout)
                 and len(controller.active_controller_inputs) > 0
             ):
                 logger.debug(
-                    f"{controller.name} emulated Xbox buttons: {controller.get_active_xbox_button_names()}"
+                    "%s emulated Xbox buttons: %s",
+                    controller.name,
+                    controller.get_active_xbox_button_names(),
                 )
 
-            for action in defined_actions:
-                if controller.matches(
-                    active_controller_inputs=action.active_controller_buttons,
-                    controller_type=action.controller_type,
-                ):
-                    if controller.guid not in disabled_controllers:
-                        logger.info(
-                            f"Mapping detected: {action} on controller {instance_id}"
-                        )
-                        action.execute()
+            if snapshot.is_disabled(controller.guid):
+                matching = []
+            else:
+                matching = snapshot.mapping_index.lookup(controller.active_xbox_combo)
+
+            # only execute the mappings that were just entered (or are debounced etc.)
+            for action in self.combo_detector.update(instance_id, matching, now):
+                self.__execute(action, instance_id)
+
+    def __execute(self, action: Mapping, instance_id: int):
+        # the action is executed by a worker thread (or task), so the observer never blocks
+        self.executor.submit(action)
+        logger.info('Mapping detected: "%s" on controller %s', action.name, instance_id)
+        if self.__loop is not None:
+            self.__publish(
+                ObserverEvent(
+                    ObserverEventType.MAPPING_TRIGGERED, instance_id, mapping=action
+                )
+            )
 
 
 if __name__ == "__main__":
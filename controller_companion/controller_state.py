@@ -29,25 +29,128 @@ d_pad_mapper = {
 d_pad_mapper_inv = {v: k for k, v in d_pad_mapper.items()}
 
 
+def pack_d_pad_state(d_pad_state: Tuple[int, int]) -> int:
+    """Packs a d-pad state (x, y), where x and y are in [-1, 0, 1], into a small int (0-10)."""
+    x, y = d_pad_state
+    return (x + 1) | ((y + 1) << 2)
+
+
+def unpack_d_pad_state(packed: int) -> Tuple[int, int]:
+    """Inverse of `pack_d_pad_state`."""
+    return ((packed & 0b11) - 1, (packed >> 2) - 1)
+
+
 class ControllerState:
+    """Compact state of a controller.
+
+    The pressed buttons are stored as a bitmask (bit n is set if button n is pressed) and the
+    d-pad state is packed into a small int. The list of active buttons is derived lazily and
+    cached until the state changes. The virtual inputs of the analog axes (e.g. a pulled trigger)
+    are stored as a bitmask as well, where bit n is the n-th axis input of the controller layout.
+    """
+
+    __slots__ = ("__buttons", "__d_pad", "__axes", "__active_buttons")
 
     def __init__(
         self,
         active_buttons: Optional[List[int]] = None,
         d_pad_state: Tuple[int, int] = (0, 0),
+        active_axes: Optional[List[int]] = None,
     ):
-        self.active_buttons: List[int] = active_buttons if active_buttons else []
-        self.d_pad_state: Tuple[int, int] = d_pad_state
+        self.__buttons = 0
+        for button in active_buttons if active_buttons else []:
+            self.__buttons |= 1 << button
+        self.__d_pad = pack_d_pad_state(d_pad_state)
+        self.__axes = 0
+        for axis_input in active_axes if active_axes else []:
+            self.__axes |= 1 << axis_input
+        self.__active_buttons = None
+
+    @property
+    def buttons(self) -> int:
+        """Bitmask of the pressed buttons."""
+        return self.__buttons
+
+    @property
+    def d_pad(self) -> int:
+        """Packed d-pad state (see `pack_d_pad_state`)."""
+        return self.__d_pad
+
+    @property
+    def axes(self) -> int:
+        """Bitmask of the active axis inputs."""
+        return self.__axes
+
+    @property
+    def active_buttons(self) -> Tuple[int, ...]:
+        """Numbers of the pressed buttons in ascending order."""
+        if self.__active_buttons is None:
+            buttons = self.__buttons
+            self.__active_buttons = tuple(
+                i for i in range(buttons.bit_length()) if buttons >> i & 1
+            )
+        return self.__active_buttons
+
+    @property
+    def d_pad_state(self) -> Tuple[int, int]:
+        return unpack_d_pad_state(self.__d_pad)
+
+    def press(self, button: int) -> bool:
+        """Marks the button as pressed.
+
+        Returns:
+            bool: True if the state changed.
+        """
+        buttons = self.__buttons | (1 << button)
+        if buttons == self.__buttons:
+            return False
+        self.__buttons = buttons
+        self.__active_buttons = None
+        return True
+
+    def release(self, button: int) -> bool:
+        """Marks the button as released.
+
+        Returns:
+            bool: True if the state changed.
+        """
+        buttons = self.__buttons & ~(1 << button)
+        if buttons == self.__buttons:
+            return False
+        self.__buttons = buttons
+        self.__active_buttons = None
+        return True
+
+    def set_d_pad_state(self, d_pad_state: Tuple[int, int]) -> bool:
+        """Sets the state of the d-pad.
+
+        Returns:
+            bool: True if the state changed.
+        """
+        d_pad = pack_d_pad_state(d_pad_state)
+        if d_pad == self.__d_pad:
+            return False
+        self.__d_pad = d_pad
+        return True
+
+    def set_axes(self, axes: int) -> bool:
+        """Sets the bitmask of the active axis inputs.
+
+        Returns:
+            bool: True if the state changed.
+        """
+        if axes == self.__axes:
+            return False
+        self.__axes = axes
+        return True
 
     def __repr__(self):
         return self.__str__()
 
     def __str__(self):
-        self.active_buttons.sort()
-        return f"<ControllerState active_buttons: {self.active_buttons}, d_pad_action: {self.d_pad_state}>"
+        return f"<ControllerState active_buttons: {list(self.active_buttons)}, d_pad_action: {self.d_pad_state}, axes: {self.__axes:#b}>"
 
     def describe(self) -> str:
-        self.active_buttons.sort()
         s = ",".join(
             [
                 button_mapper_inv.get(button, f"button_{button}")
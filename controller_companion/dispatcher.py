@@ -0,0 +1,74 @@
+import threading
+from typing import Any, Callable, Optional
+
+from controller_companion.logs import logger
+
+# marks that no value is pending (None is a valid value)
+_NOTHING = object()
+
+
+class LatestValueDispatcher:
+    """Calls a callback with submitted values on a single dispatcher thread.
+
+    Values are coalesced: only the latest value is kept until the callback is called, so a burst of
+    submissions (e.g. a flapping USB hub connecting and removing controllers) results in at most
+    one pending call. The values are passed on in the order they were submitted.
+    """
+
+    def __init__(self, callback: Callable[[Any], None], name: str = "Dispatcher"):
+        """
+        Args:
+            callback (Callable[[Any], None]): Called on the dispatcher thread with the latest value.
+            name (str, optional): Name of the dispatcher thread. Defaults to "Dispatcher".
+        """
+        self.callback = callback
+        self.name = name
+        self.thread: Optional[threading.Thread] = None
+        self.__condition = threading.Condition()
+        self.__pending: Any = _NOTHING
+        self.__closed = False
+
+    def submit(self, value: Any):
+        """Replaces the pending value and wakes up the dispatcher thread (never blocks).
+
+        Args:
+            value (Any): The value the callback is called with.
+        """
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__pending = value
+            if self.thread is None:
+                # started on the first value, so unused dispatchers don't cost a thread
+                self.thread = threading.Thread(
+                    target=self.__run, name=self.name, daemon=True
+                )
+                self.thread.start()
+            self.__condition.notify()
+
+    def close(self, wait: bool = False):
+        """Stops the dispatcher thread after the pending value was passed on.
+
+        Args:
+            wait (bool, optional): Wait until the dispatcher thread finished. Defaults to False.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+            thread = self.thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while self.__pending is _NOTHING and not self.__closed:
+                    self.__condition.wait()
+                if self.__pending is _NOTHING:
+                    return
+                value, self.__pending = self.__pending, _NOTHING
+
+            try:
+                self.callback(value)
+            except Exception as e:
+                logger.error(f"Exception inside the callback of {self.name}: {e}")
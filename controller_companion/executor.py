@@ -0,0 +1,243 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import threading
+import time
+import traceback
+from typing import Deque, Dict, Optional, Set
+
+from controller_companion.logs import logger
+from controller_companion.mapping import ConcurrencyPolicy, Mapping
+from controller_companion.process_supervisor import ProcessSupervisor
+
+
+class _MappingState:
+    def __init__(self):
+        self.running = False
+        self.pending: Deque[float] = deque()
+
+
+def _log_finished(
+    mapping: Mapping,
+    exit_code: Optional[int],
+    triggered_at: float,
+    start: float,
+    end: float,
+):
+    message = 'Action of mapping "%s" finished in %.1fms (waited %.1fms)'
+    args = (mapping.name, (end - start) * 1000, (start - triggered_at) * 1000)
+    if exit_code is None:
+        logger.debug(f"{message}.", *args)
+    elif exit_code == 0:
+        logger.debug(f"{message} with exit code %s.", *args, exit_code)
+    else:
+        logger.warning(f"{message} with exit code %s.", *args, exit_code)
+
+
+class ActionExecutor:
+    """Runs the actions of triggered mappings on a bounded pool of worker threads.
+
+    Submitting an action never blocks. Each mapping runs at most one action at a time, further
+    triggers are handled according to the `ConcurrencyPolicy` of the mapping.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 16):
+        """
+        Args:
+            max_workers (int, optional): Max number of actions that run in parallel. Defaults to 4.
+            max_queued (int, optional): Max number of pending triggers per mapping. Defaults to 16.
+        """
+        self.max_queued = max_queued
+        self.__pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ActionExecutor"
+        )
+        self.__lock = threading.Lock()
+        self.__states: Dict[Mapping, _MappingState] = {}
+        self.supervisor = ProcessSupervisor()
+
+    def submit(self, mapping: Mapping) -> bool:
+        """Schedules the execution of the action of a mapping.
+
+        Args:
+            mapping (Mapping): The triggered mapping.
+
+        Returns:
+            bool: True if the action will be executed, False if the trigger was dropped.
+        """
+        with self.__lock:
+            state = self.__states.setdefault(mapping, _MappingState())
+
+            if not state.running:
+                state.running = True
+                self.__pool.submit(self.__run, mapping, state, time.perf_counter())
+                return True
+
+            if mapping.concurrency == ConcurrencyPolicy.DROP:
+                accepted = False
+            elif mapping.concurrency == ConcurrencyPolicy.REPLACE:
+                state.pending.clear()
+                state.pending.append(time.perf_counter())
+                accepted = True
+            else:
+                accepted = len(state.pending) < self.max_queued
+                if accepted:
+                    state.pending.append(time.perf_counter())
+
+        if not accepted:
+            logger.debug(
+                'Dropped trigger of mapping "%s" as its action is still running.',
+                mapping.name,
+            )
+        return accepted
+
+    def shutdown(self, wait: bool = False):
+        """Stops the executor. Pending triggers are discarded, spawned processes are left running
+        (see `ProcessSupervisor.close`).
+
+        Args:
+            wait (bool, optional): Wait for the running actions to finish. Defaults to False.
+        """
+        with self.__lock:
+            for state in self.__states.values():
+                state.pending.clear()
+        self.__pool.shutdown(wait=wait)
+        self.supervisor.close()
+
+    def __run(self, mapping: Mapping, state: _MappingState, triggered_at: float):
+        while True:
+            self.__execute(mapping, triggered_at)
+
+            with self.__lock:
+                if len(state.pending) == 0:
+                    state.running = False
+                    del self.__states[mapping]
+                    return
+                triggered_at = state.pending.popleft()
+
+    def __execute(self, mapping: Mapping, triggered_at: float):
+        start = time.perf_counter()
+        try:
+            exit_code = mapping.execute(
+                timeout=mapping.timeout, supervisor=self.supervisor
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning(
+                f'Action of mapping "{mapping.name}" timed out after {mapping.timeout}s.'
+            )
+            return
+        except Exception:
+            logger.error(
+                f'Action of mapping "{mapping.name}" failed:\n{traceback.format_exc()}'
+            )
+            return
+
+        _log_finished(mapping, exit_code, triggered_at, start, time.perf_counter())
+
+
+class AsyncActionExecutor:
+    """Runs the actions of triggered mappings as tasks of the running asyncio event loop.
+
+    Has the same policies as the `ActionExecutor`, but the actions are awaited (see
+    `Mapping.execute_async`) instead of being executed by worker threads, and `shutdown` is a
+    coroutine. Must only be used from the thread of the event loop.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 16):
+        """
+        Args:
+            max_workers (int, optional): Max number of actions that run in parallel. Defaults to 4.
+            max_queued (int, optional): Max number of pending triggers per mapping. Defaults to 16.
+        """
+        import asyncio
+
+        self.max_queued = max_queued
+        self.__semaphore = asyncio.Semaphore(max_workers)
+        self.__states: Dict[Mapping, _MappingState] = {}
+        # keep references to the tasks, the event loop only keeps weak ones
+        self.tasks: Set[asyncio.Task] = set()
+
+    def submit(self, mapping: Mapping) -> bool:
+        """Schedules the execution of the action of a mapping.
+
+        Args:
+            mapping (Mapping): The triggered mapping.
+
+        Returns:
+            bool: True if the action will be executed, False if the trigger was dropped.
+        """
+        state = self.__states.setdefault(mapping, _MappingState())
+
+        if not state.running:
+            import asyncio
+
+            state.running = True
+            task = asyncio.ensure_future(
+                self.__run(mapping, state, time.perf_counter())
+            )
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            return True
+
+        if mapping.concurrency == ConcurrencyPolicy.DROP:
+            accepted = False
+        elif mapping.concurrency == ConcurrencyPolicy.REPLACE:
+            state.pending.clear()
+            state.pending.append(time.perf_counter())
+            accepted = True
+        else:
+            accepted = len(state.pending) < self.max_queued
+            if accepted:
+                state.pending.append(time.perf_counter())
+
+        if not accepted:
+            logger.debug(
+                'Dropped trigger of mapping "%s" as its action is still running.',
+                mapping.name,
+            )
+        return accepted
+
+    async def shutdown(self, wait: bool = False):
+        """Stops the executor and returns once the running actions finished. Pending triggers are discarded.
+
+        Args:
+            wait (bool, optional): Let the running actions finish instead of cancelling them (which kills their processes). Defaults to False.
+        """
+        import asyncio
+
+        for state in self.__states.values():
+            state.pending.clear()
+        tasks = list(self.tasks)
+        if not wait:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __run(self, mapping: Mapping, state: _MappingState, triggered_at: float):
+        try:
+            while True:
+                async with self.__semaphore:
+                    await self.__execute(mapping, triggered_at)
+
+                if len(state.pending) == 0:
+                    return
+                triggered_at = state.pending.popleft()
+        finally:
+            state.running = False
+            del self.__states[mapping]
+
+    async def __execute(self, mapping: Mapping, triggered_at: float):
+        start = time.perf_counter()
+        try:
+            exit_code = await mapping.execute_async(timeout=mapping.timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(
+                f'Action of mapping "{mapping.name}" timed out after {mapping.timeout}s.'
+            )
+            return
+        except Exception:
+            logger.error(
+                f'Action of mapping "{mapping.name}" failed:\n{traceback.format_exc()}'
+            )
+            return
+
+        _log_finished(mapping, exit_code, triggered_at, start, time.perf_counter())
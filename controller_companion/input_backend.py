@@ -0,0 +1,807 @@
+"""Sources of controller input events for the `ControllerObserver`.
+
+Backends:
+- `PygameInputBackend`: uses the joystick events of pygame/SDL (all platforms).
+- `EvdevInputBackend`: Linux only, reads the input devices (/dev/input/event*) directly, which
+  skips the initialization of SDL and the conversions of its event queue.
+- `FakeInputBackend`: in-memory events that are created by calling its methods (e.g. `press`).
+"""
+
+from abc import ABC, abstractmethod
+from enum import Enum
+import os
+from pathlib import Path
+import queue
+import select
+import struct
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from controller_companion.app.controller_layouts import ControllerType, get_layout
+from controller_companion.app.utils import OperatingSystem, get_os
+from controller_companion.controller import Controller
+from controller_companion.logs import logger
+
+
+class InputEventType(Enum):
+    BUTTON_DOWN = "ButtonDown"
+    BUTTON_UP = "ButtonUp"
+    # value: d-pad state (x, y), where y=1 is up
+    HAT = "Hat"
+    # value: position of the axis in [-1, 1]
+    AXIS = "Axis"
+    # controller: the connected controller
+    DEVICE_ADDED = "DeviceAdded"
+    DEVICE_REMOVED = "DeviceRemoved"
+
+
+class InputEvent(NamedTuple):
+    type: InputEventType
+    instance_id: int
+    button: Optional[int] = None
+    axis: Optional[int] = None
+    value: Any = None
+    controller: Optional[Controller] = None
+
+
+class InputBackend(ABC):
+
+    @abstractmethod
+    def open(self):
+        """Initializes the backend, connected controllers are reported as DEVICE_ADDED events."""
+        pass
+
+    @abstractmethod
+    def is_open(self) -> bool:
+        pass
+
+    @abstractmethod
+    def wait(self, timeout_ms: int) -> List[InputEvent]:
+        """Blocks until events are available (or the timeout is reached) and returns all of them.
+
+        Args:
+            timeout_ms (int): Max time to wait for the first event.
+
+        Returns:
+            List[InputEvent]: The events, empty if the timeout was reached or `wake_up` was called.
+        """
+        pass
+
+    @abstractmethod
+    def wake_up(self):
+        """Wakes up a thread that is currently waiting inside `wait`. Can be called from any thread."""
+        pass
+
+    def set_axes_enabled(self, enabled: bool):
+        """Enables/ disables the AXIS events (which are frequent and not needed by most mappings)."""
+        pass
+
+    def fileno(self) -> Optional[int]:
+        """File descriptor that is readable while events are available (only while the backend is open).
+
+        If a backend provides one, it can be waited on by an event loop (followed by `wait(0)`)
+        instead of blocking a thread inside `wait`.
+
+        Returns:
+            Optional[int]: The file descriptor, None if the backend does not provide one.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+# ---------------------------------- pygame ---------------------------------- #
+# axis of SDL's game controller mappings -> axis number of the layout (see
+# `ControllerLayout.AXIS_LAYOUT`)
+SDL_CONTROLLER_AXES = {
+    "leftx": 0,
+    "lefty": 1,
+    "rightx": 2,
+    "righty": 3,
+    "lefttrigger": 4,
+    "righttrigger": 5,
+}
+
+
+def parse_sdl_axis_mapping(mapping: Dict[str, str]) -> Dict[int, Tuple[int, int]]:
+    """Parses the axes of an SDL game controller mapping (e.g. `{"lefttrigger": "a2", ...}`).
+
+    Args:
+        mapping (Dict[str, str]): The mapping, as returned by `pygame._sdl2.controller.Controller.get_mapping`.
+
+    Returns:
+        Dict[int, Tuple[int, int]]: Joystick axis -> (axis number of the layout, sign of the value).
+    """
+    axes = {}
+    for name, layout_axis in SDL_CONTROLLER_AXES.items():
+        source = mapping.get(name, "")
+        # "~" inverts the axis. half axes ("+a2"), buttons ("b0") and hats ("h0.1") are not
+        # used for sticks and triggers by the mappings of common controllers and are skipped.
+        sign = -1 if source.endswith("~") else 1
+        source = source.rstrip("~")
+        if source.startswith("a") and source[1:].isdigit():
+            axes[int(source[1:])] = (layout_axis, sign)
+    return axes
+
+
+class PygameInputBackend(InputBackend):
+
+    def __init__(self):
+        # import pygame, hide welcome message
+        os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "yes"
+        import pygame
+
+        self.__pygame = pygame
+        # custom event that is posted to wake up the observer loop (e.g. when stopping it)
+        self.wake_up_event = pygame.event.custom_type()
+        # events that are blocked from entering the event queue so they don't keep waking up the
+        # observer loop. this is relevant as e.g. thumbstick updates spam lots of updates. the
+        # axis events (JOYAXISMOTION) are only allowed while they are enabled.
+        self.blocked_events = [pygame.JOYAXISMOTION, pygame.JOYBALLMOTION]
+        # the game controller api is only used to look up the axes of the joysticks, its events
+        # duplicate the joystick events and are always blocked
+        self.controller_events = [
+            pygame.CONTROLLERAXISMOTION,
+            pygame.CONTROLLERBUTTONDOWN,
+            pygame.CONTROLLERBUTTONUP,
+            pygame.CONTROLLERDEVICEADDED,
+            pygame.CONTROLLERDEVICEREMOVED,
+            pygame.CONTROLLERDEVICEREMAPPED,
+        ]
+        # we do not really need access the joysticks, but apparently we need to
+        # keep a reference to all connected joysticks for them to function.
+        self.pygame_joysticks: Dict[int, pygame.joystick.JoystickType] = {}
+        # instance id -> joystick axis -> (axis number of the layout, sign of the value).
+        # joysticks without entry report their axes as they are.
+        self.axis_maps: Dict[int, Dict[int, Tuple[int, int]]] = {}
+
+    def open(self):
+        self.__pygame.init()
+        self.__pygame.event.set_blocked(self.blocked_events + self.controller_events)
+
+    def is_open(self) -> bool:
+        # pygame is only initialized again if it was shut down (e.g. by an exception), this way
+        # the already opened joysticks are kept.
+        return self.__pygame.joystick.get_init()
+
+    def wait(self, timeout_ms: int) -> List[InputEvent]:
+        pygame = self.__pygame
+        # block until the next event arrives (or the timeout is reached, returning NOEVENT)
+        # and then drain all remaining events from the queue.
+        pygame_events = [pygame.event.wait(timeout=timeout_ms)]
+        pygame_events.extend(pygame.event.get())
+
+        events = []
+        for event in pygame_events:
+            if event.type == pygame.JOYBUTTONDOWN:
+                events.append(
+                    InputEvent(
+                        InputEventType.BUTTON_DOWN,
+                        event.instance_id,
+                        button=event.button,
+                    )
+                )
+            elif event.type == pygame.JOYBUTTONUP:
+                events.append(
+                    InputEvent(
+                        InputEventType.BUTTON_UP, event.instance_id, button=event.button
+                    )
+                )
+            elif event.type == pygame.JOYHATMOTION:
+                events.append(
+                    InputEvent(InputEventType.HAT, event.instance_id, value=event.value)
+                )
+            elif event.type == pygame.JOYAXISMOTION:
+                axis_map = self.axis_maps.get(event.instance_id, None)
+                if axis_map is None:
+                    axis, sign = event.axis, 1
+                elif event.axis in axis_map:
+                    axis, sign = axis_map[event.axis]
+                else:
+                    # an axis that is not part of the layout
+                    continue
+                events.append(
+                    InputEvent(
+                        InputEventType.AXIS,
+                        event.instance_id,
+                        axis=axis,
+                        value=sign * event.value,
+                    )
+                )
+            elif event.type == pygame.JOYDEVICEADDED:
+                joy = pygame.joystick.Joystick(event.device_index)
+                instance_id = joy.get_instance_id()
+                self.pygame_joysticks[instance_id] = joy
+                axis_map = self.__get_axis_map(event.device_index)
+                if axis_map is not None:
+                    self.axis_maps[instance_id] = axis_map
+                events.append(
+                    InputEvent(
+                        InputEventType.DEVICE_ADDED,
+                        instance_id,
+                        controller=Controller.from_pygame(joystick=joy),
+                    )
+                )
+            elif event.type == pygame.JOYDEVICEREMOVED:
+                del self.pygame_joysticks[event.instance_id]
+                self.axis_maps.pop(event.instance_id, None)
+                events.append(
+                    InputEvent(InputEventType.DEVICE_REMOVED, event.instance_id)
+                )
+            # all other events are skipped
+        return events
+
+    def wake_up(self):
+        try:
+            self.__pygame.event.post(self.__pygame.event.Event(self.wake_up_event))
+        except self.__pygame.error:
+            # pygame is not initialized (yet), so nobody is waiting for events
+            pass
+
+    def set_axes_enabled(self, enabled: bool):
+        if enabled:
+            self.__pygame.event.set_allowed(self.__pygame.JOYAXISMOTION)
+        else:
+            self.__pygame.event.set_blocked(self.__pygame.JOYAXISMOTION)
+
+    def close(self):
+        self.__pygame.quit()
+
+    def __get_axis_map(self, device_index: int) -> Optional[Dict[int, Tuple[int, int]]]:
+        # the order of the joystick axes depends on the driver that SDL uses for the controller
+        # (e.g. its evdev driver numbers them by their code, so the left trigger (ABS_Z) of an
+        # xpad controller is axis 2, while XInput and the HIDAPI drivers report it as axis 4).
+        # SDL's game controller mapping of the joystick tells which axis is which.
+        pygame = self.__pygame
+        from pygame._sdl2 import controller
+
+        try:
+            if not controller.get_init():
+                controller.init()
+                pygame.event.set_blocked(self.controller_events)
+            if not controller.is_controller(device_index):
+                return None
+            game_controller = controller.Controller(device_index)
+            try:
+                mapping = game_controller.get_mapping()
+            finally:
+                game_controller.quit()
+        except pygame.error as e:
+            logger.debug("Failed to get the game controller mapping: %s", e)
+            return None
+        return parse_sdl_axis_mapping(mapping)
+
+
+# ----------------------------------- evdev ---------------------------------- #
+INPUT_DIR = Path("/dev/input")
+# struct input_event {struct timeval time; __u16 type; __u16 code; __s32 value;}
+INPUT_EVENT_FORMAT = "llHHi"
+INPUT_EVENT_SIZE = struct.calcsize(INPUT_EVENT_FORMAT)
+# struct input_absinfo {__s32 value; __s32 minimum; __s32 maximum; __s32 fuzz; __s32 flat; __s32 resolution;}
+INPUT_ABSINFO_FORMAT = "iiiiii"
+# struct input_id {__u16 bustype; __u16 vendor; __u16 product; __u16 version;}
+INPUT_ID_FORMAT = "HHHH"
+
+# constants from linux/input-event-codes.h
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+KEY_MAX = 0x2FF
+ABS_MAX = 0x3F
+BTN_JOYSTICK = 0x120
+BTN_GAMEPAD = 0x130
+ABS_HAT0X = 0x10
+ABS_HAT0Y = 0x11
+
+
+def _ioc_read(nr: int, size: int) -> int:
+    # _IOC(_IOC_READ, 'E', nr, size) from linux/input.h
+    return (2 << 30) | (size << 16) | (ord("E") << 8) | nr
+
+
+def EVIOCGID() -> int:
+    return _ioc_read(0x02, struct.calcsize(INPUT_ID_FORMAT))
+
+
+def EVIOCGNAME(length: int) -> int:
+    return _ioc_read(0x06, length)
+
+
+def EVIOCGBIT(event_type: int, length: int) -> int:
+    return _ioc_read(0x20 + event_type, length)
+
+
+def EVIOCGABS(axis: int) -> int:
+    return _ioc_read(0x40 + axis, struct.calcsize(INPUT_ABSINFO_FORMAT))
+
+
+# linux key code -> button number of the layout
+EVDEV_BUTTONS: Dict[ControllerType, Dict[int, int]] = {
+    # xpad driver
+    ControllerType.XBOX: {
+        0x130: 0,  # BTN_A -> A
+        0x131: 1,  # BTN_B -> B
+        0x133: 2,  # BTN_X -> X
+        0x134: 3,  # BTN_Y -> Y
+        0x136: 4,  # BTN_TL -> LB
+        0x137: 5,  # BTN_TR -> RB
+        0x13A: 6,  # BTN_SELECT -> Back
+        0x13B: 7,  # BTN_START -> Start
+        0x13D: 8,  # BTN_THUMBL -> L-Stick
+        0x13E: 9,  # BTN_THUMBR -> R-Stick
+        0x13C: 10,  # BTN_MODE -> X-Box
+        0xA7: 11,  # KEY_RECORD -> Share
+    },
+    # hid-playstation/ hid-sony driver
+    ControllerType.PLAYSTATION: {
+        0x130: 0,  # BTN_SOUTH -> Cross
+        0x131: 1,  # BTN_EAST -> Circle
+        0x134: 2,  # BTN_WEST -> Square
+        0x133: 3,  # BTN_NORTH -> Triangle
+        0x13A: 4,  # BTN_SELECT -> Share
+        0x13C: 5,  # BTN_MODE -> PS
+        0x13B: 6,  # BTN_START -> Options
+        0x13D: 7,  # BTN_THUMBL -> L-Stick
+        0x13E: 8,  # BTN_THUMBR -> R-Stick
+        0x136: 9,  # BTN_TL -> L1
+        0x137: 10,  # BTN_TR -> R1
+        0x110: 15,  # BTN_LEFT (touch pad click) -> Touch Pad
+    },
+}
+
+# linux absolute axis code -> axis number of the layout (see `ControllerLayout.AXIS_LAYOUT`).
+# this is the order of XInput and SDL's HIDAPI drivers (sticks, then triggers), not the order of
+# SDL's own evdev driver, which numbers the axes by their code (ABS_Z would be axis 2).
+EVDEV_AXES = {
+    0x00: 0,  # ABS_X -> left stick x
+    0x01: 1,  # ABS_Y -> left stick y
+    0x03: 2,  # ABS_RX -> right stick x
+    0x04: 3,  # ABS_RY -> right stick y
+    0x02: 4,  # ABS_Z -> left trigger
+    0x05: 5,  # ABS_RZ -> right trigger
+}
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    """CRC-16 (ARC), as used by SDL for the controller guids."""
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def create_sdl_guid(bustype: int, vendor: int, product: int, version: int, name: str):
+    """Creates the guid of a controller the same way SDL's Linux (evdev) joystick driver does.
+
+    Controllers that SDL opens through its HIDAPI drivers get a different guid, so the guids only
+    match the ones reported by pygame for controllers that are handled by the evdev driver.
+    """
+    return struct.pack(
+        "<8H", bustype, crc16(name.encode()), vendor, 0, product, 0, version, 0
+    ).hex()
+
+
+class _EvdevDevice:
+    def __init__(
+        self,
+        fd: int,
+        path: str,
+        instance_id: int,
+        controller: Controller,
+        buttons: Dict[int, int],
+        axis_ranges: Dict[int, Tuple[int, int]],
+        hat_buttons: Optional[Dict[Tuple[int, int], int]],
+    ):
+        self.fd = fd
+        self.path = path
+        self.instance_id = instance_id
+        self.controller = controller
+        # key code -> button number
+        self.buttons = buttons
+        # axis code -> (min, max)
+        self.axis_ranges = axis_ranges
+        # d-pad direction -> button number, for layouts that treat the d-pad as buttons
+        self.hat_buttons = hat_buttons
+        self.hat = [0, 0]
+
+
+class EvdevInputBackend(InputBackend):
+    """Reads the controller events directly from the Linux input devices (/dev/input/event*).
+
+    The devices are read without blocking and waited on with epoll. New devices are found by
+    rescanning the input directory every `rescan_interval_s` seconds. Reading the devices requires
+    read permissions (usually membership in the "input" group).
+    """
+
+    def __init__(self, input_dir: Path = INPUT_DIR, rescan_interval_s: float = 2.0):
+        """
+        Args:
+            input_dir (Path, optional): Directory of the input devices. Defaults to INPUT_DIR.
+            rescan_interval_s (float, optional): Interval in which new devices are searched. Defaults to 2.0.
+        """
+        self.input_dir = input_dir
+        self.rescan_interval_s = rescan_interval_s
+        self.__epoll: Optional[select.epoll] = None
+        # pipe that wakes up `wait`, only exists while the backend is open
+        self.__wake_up_r: Optional[int] = None
+        self.__wake_up_w: Optional[int] = None
+        self.__devices: Dict[int, _EvdevDevice] = {}
+        # devices that are not controllers
+        self.__ignored_paths: Set[str] = set()
+        self.__pending: List[InputEvent] = []
+        self.__next_instance_id = 0
+        self.__last_scan = None
+        self.__axes_enabled = False
+
+    def open(self):
+        import fcntl
+
+        self.__ioctl = fcntl.ioctl
+        self.__wake_up_r, self.__wake_up_w = os.pipe()
+        os.set_blocking(self.__wake_up_r, False)
+        os.set_blocking(self.__wake_up_w, False)
+        self.__epoll = select.epoll()
+        self.__epoll.register(self.__wake_up_r, select.EPOLLIN)
+        # the devices are kept open if the backend is reopened (e.g. after an exception)
+        for fd in self.__devices:
+            self.__epoll.register(fd, select.EPOLLIN)
+        self.__scan()
+
+    def is_open(self) -> bool:
+        return self.__epoll is not None
+
+    def wait(self, timeout_ms: int) -> List[InputEvent]:
+        if time.monotonic() - self.__last_scan >= self.rescan_interval_s:
+            self.__scan()
+
+        timeout = min(
+            timeout_ms / 1000,
+            max(0, self.__last_scan + self.rescan_interval_s - time.monotonic()),
+        )
+        ready = self.__epoll.poll(0 if self.__pending else timeout)
+
+        events, self.__pending = self.__pending, []
+        for fd, mask in ready:
+            if fd == self.__wake_up_r:
+                try:
+                    while os.read(fd, 1024):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+
+            device = self.__devices.get(fd, None)
+            if device is None:
+                continue
+            try:
+                self.__read(device, events)
+            except OSError:
+                # the device was disconnected (ENODEV)
+                self.__remove(device, events)
+        return events
+
+    def wake_up(self):
+        fd = self.__wake_up_w
+        if fd is None:
+            # the backend is not open (yet), so nobody is waiting for events
+            return
+        try:
+            os.write(fd, b"\0")
+        except BlockingIOError:
+            # there is already a pending wake up
+            pass
+        except OSError:
+            # the backend was closed in the meantime
+            pass
+
+    def set_axes_enabled(self, enabled: bool):
+        self.__axes_enabled = enabled
+
+    def fileno(self) -> Optional[int]:
+        # the epoll instance is readable while one of the devices (or the wake up pipe) is
+        return self.__epoll.fileno() if self.__epoll is not None else None
+
+    def close(self):
+        for device in list(self.__devices.values()):
+            os.close(device.fd)
+        self.__devices.clear()
+        if self.__epoll is not None:
+            self.__epoll.close()
+            self.__epoll = None
+        for fd in (self.__wake_up_r, self.__wake_up_w):
+            if fd is not None:
+                os.close(fd)
+        self.__wake_up_r = self.__wake_up_w = None
+
+    def __scan(self):
+        self.__last_scan = time.monotonic()
+        try:
+            paths = {str(p) for p in self.input_dir.glob("event*")}
+        except OSError:
+            paths = set()
+
+        opened = {device.path: device for device in self.__devices.values()}
+        for path, device in opened.items():
+            if path not in paths:
+                self.__remove(device, self.__pending)
+        self.__ignored_paths &= paths
+
+        for path in sorted(paths - opened.keys() - self.__ignored_paths):
+            try:
+                device = self.__open_device(path)
+            except OSError as e:
+                # e.g. missing permissions, retried with the next scan
+                logger.debug(f"Failed to open the input device {path}: {e}")
+                continue
+            if device is None:
+                self.__ignored_paths.add(path)
+                continue
+
+            self.__devices[device.fd] = device
+            self.__epoll.register(device.fd, select.EPOLLIN)
+            self.__pending.append(
+                InputEvent(
+                    InputEventType.DEVICE_ADDED,
+                    device.instance_id,
+                    controller=device.controller,
+                )
+            )
+
+    def __open_device(self, path: str) -> Optional[_EvdevDevice]:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            keys = self.__ioctl(
+                fd, EVIOCGBIT(EV_KEY, KEY_MAX // 8 + 1), bytes(KEY_MAX // 8 + 1)
+            )
+            has_key = lambda code: keys[code // 8] >> (code % 8) & 1
+            if not (has_key(BTN_GAMEPAD) or has_key(BTN_JOYSTICK)):
+                # not a controller (e.g. a keyboard or mouse)
+                os.close(fd)
+                return None
+
+            name = self.__ioctl(fd, EVIOCGNAME(256), bytes(256))
+            name = name.split(b"\0", 1)[0].decode(errors="replace")
+            bustype, vendor, product, version = struct.unpack(
+                INPUT_ID_FORMAT,
+                self.__ioctl(fd, EVIOCGID(), bytes(struct.calcsize(INPUT_ID_FORMAT))),
+            )
+
+            abs_bits = self.__ioctl(
+                fd, EVIOCGBIT(EV_ABS, ABS_MAX // 8 + 1), bytes(ABS_MAX // 8 + 1)
+            )
+            axis_ranges = {}
+            for code in EVDEV_AXES:
+                if abs_bits[code // 8] >> (code % 8) & 1:
+                    _, minimum, maximum, _, _, _ = struct.unpack(
+                        INPUT_ABSINFO_FORMAT,
+                        self.__ioctl(
+                            fd,
+                            EVIOCGABS(code),
+                            bytes(struct.calcsize(INPUT_ABSINFO_FORMAT)),
+                        ),
+                    )
+                    if maximum > minimum:
+                        axis_ranges[code] = (minimum, maximum)
+        except OSError:
+            os.close(fd)
+            raise
+
+        controller_type = Controller.detect_controller_type(name)
+        controller = Controller(
+            name,
+            guid=create_sdl_guid(bustype, vendor, product, version, name),
+            power_level="unknown",
+            initialized=True,
+            controller_type=controller_type,
+        )
+
+        # the d-pad is reported as hat, but some layouts define its directions as buttons
+        layout = get_layout(controller_type)
+        button_layout = layout.get_button_layout()
+        hat_buttons = None
+        if len(layout.get_d_pad_layout()) == 0 and all(
+            d in button_layout for d in ["Up", "Down", "Left", "Right"]
+        ):
+            hat_buttons = {
+                (0, 1): button_layout["Up"],
+                (0, -1): button_layout["Down"],
+                (-1, 0): button_layout["Left"],
+                (1, 0): button_layout["Right"],
+            }
+
+        instance_id = self.__next_instance_id
+        self.__next_instance_id += 1
+        logger.debug(f"Opened input device {path}: {name}")
+        return _EvdevDevice(
+            fd,
+            path,
+            instance_id,
+            controller,
+            buttons=EVDEV_BUTTONS[controller_type],
+            axis_ranges=axis_ranges,
+            hat_buttons=hat_buttons,
+        )
+
+    def __remove(self, device: _EvdevDevice, events: List[InputEvent]):
+        del self.__devices[device.fd]
+        try:
+            self.__epoll.unregister(device.fd)
+        except (OSError, ValueError):
+            pass
+        os.close(device.fd)
+        events.append(InputEvent(InputEventType.DEVICE_REMOVED, device.instance_id))
+
+    def __read(self, device: _EvdevDevice, events: List[InputEvent]):
+        instance_id = device.instance_id
+        while True:
+            try:
+                data = os.read(device.fd, INPUT_EVENT_SIZE * 64)
+            except BlockingIOError:
+                return
+            if not data:
+                raise OSError("The input device was closed.")
+
+            for _, _, event_type, code, value in struct.iter_unpack(
+                INPUT_EVENT_FORMAT, data
+            ):
+                if event_type == EV_KEY:
+                    button = device.buttons.get(code, None)
+                    # value 2 is an autorepeat of a held key
+                    if button is not None and value != 2:
+                        events.append(
+                            InputEvent(
+                                (
+                                    InputEventType.BUTTON_DOWN
+                                    if value
+                                    else InputEventType.BUTTON_UP
+                                ),
+                                instance_id,
+                                button=button,
+                            )
+                        )
+                elif event_type == EV_ABS:
+                    if code == ABS_HAT0X or code == ABS_HAT0Y:
+                        self.__update_hat(device, code, value, events)
+                    elif self.__axes_enabled and code in device.axis_ranges:
+                        minimum, maximum = device.axis_ranges[code]
+                        events.append(
+                            InputEvent(
+                                InputEventType.AXIS,
+                                instance_id,
+                                axis=EVDEV_AXES[code],
+                                value=2 * (value - minimum) / (maximum - minimum) - 1,
+                            )
+                        )
+
+    def __update_hat(
+        self, device: _EvdevDevice, code: int, value: int, events: List[InputEvent]
+    ):
+        previous = tuple(device.hat)
+        if code == ABS_HAT0X:
+            device.hat[0] = value
+        else:
+            # the y axis of the hat points down on linux, but up for SDL
+            device.hat[1] = -value
+        current = tuple(device.hat)
+        if current == previous:
+            return
+
+        if device.hat_buttons is None:
+            events.append(
+                InputEvent(InputEventType.HAT, device.instance_id, value=current)
+            )
+            return
+
+        # release and press the directions of the d-pad as buttons
+        for direction, button in device.hat_buttons.items():
+            was_active = any(p == d != 0 for p, d in zip(previous, direction))
+            is_active = any(c == d != 0 for c, d in zip(current, direction))
+            if was_active != is_active:
+                events.append(
+                    InputEvent(
+                        (
+                            InputEventType.BUTTON_DOWN
+                            if is_active
+                            else InputEventType.BUTTON_UP
+                        ),
+                        device.instance_id,
+                        button=button,
+                    )
+                )
+
+
+# ----------------------------------- fake ----------------------------------- #
+class FakeInputBackend(InputBackend):
+    """Backend whose events are created by calling its methods (e.g. `press`)."""
+
+    def __init__(self):
+        self.__events: "queue.Queue[Optional[InputEvent]]" = queue.Queue()
+        self.__open = False
+        self.__axes_enabled = False
+        self.__next_instance_id = 0
+
+    def open(self):
+        self.__open = True
+
+    def is_open(self) -> bool:
+        return self.__open
+
+    def wait(self, timeout_ms: int) -> List[InputEvent]:
+        try:
+            events = [self.__events.get(timeout=timeout_ms / 1000)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self.__events.get_nowait())
+            except queue.Empty:
+                break
+        return [
+            e
+            for e in events
+            if e is not None and (e.type != InputEventType.AXIS or self.__axes_enabled)
+        ]
+
+    def wake_up(self):
+        self.__events.put(None)
+
+    def set_axes_enabled(self, enabled: bool):
+        self.__axes_enabled = enabled
+
+    def close(self):
+        self.__open = False
+
+    def push(self, event: InputEvent):
+        self.__events.put(event)
+
+    def connect(self, controller: Controller) -> int:
+        """Connects a controller and returns its instance id."""
+        instance_id = self.__next_instance_id
+        self.__next_instance_id += 1
+        self.push(
+            InputEvent(InputEventType.DEVICE_ADDED, instance_id, controller=controller)
+        )
+        return instance_id
+
+    def disconnect(self, instance_id: int):
+        self.push(InputEvent(InputEventType.DEVICE_REMOVED, instance_id))
+
+    def press(self, instance_id: int, button: int):
+        self.push(InputEvent(InputEventType.BUTTON_DOWN, instance_id, button=button))
+
+    def release(self, instance_id: int, button: int):
+        self.push(InputEvent(InputEventType.BUTTON_UP, instance_id, button=button))
+
+    def set_hat(self, instance_id: int, value: Tuple[int, int]):
+        self.push(InputEvent(InputEventType.HAT, instance_id, value=value))
+
+    def move_axis(self, instance_id: int, axis: int, value: float):
+        self.push(InputEvent(InputEventType.AXIS, instance_id, axis=axis, value=value))
+
+
+# ---------------------------------------------------------------------------- #
+
+BACKENDS = {
+    "pygame": PygameInputBackend,
+    "evdev": EvdevInputBackend,
+    "fake": FakeInputBackend,
+}
+
+
+def create_backend(name: str = "pygame") -> InputBackend:
+    """Creates an input backend by its name (see `BACKENDS`).
+
+    Raises:
+        ValueError: If the backend does not exist or is not supported on this platform.
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f'Unknown input backend "{name}"! Valid options are {list(BACKENDS.keys())}'
+        )
+    if name == "evdev" and get_os() != OperatingSystem.LINUX:
+        raise ValueError(
+            f"The evdev input backend is not supported on {get_os().value}."
+        )
+    return BACKENDS[name]()
@@ -0,0 +1,383 @@
+"""Injection of keyboard shortcuts.
+
+Shortcuts are parsed and validated once (`parse_shortcut`) and compiled into a plan by the
+keyboard backend, so executing a shortcut only needs to send the precomputed key events.
+
+Backends:
+- `PyAutoGuiBackend`: uses pyautogui (all platforms, default).
+- `UInputBackend`: Linux only, sends the key events through a virtual uinput keyboard. It sends
+  the key codes of the US layout, so on other keyboard layouts (e.g. QWERTZ or AZERTY) shortcuts
+  would send different keys than configured. It is therefore only used if enabled by setting the
+  environment variable `CONTROLLER_COMPANION_KEYBOARD_BACKEND=uinput`.
+- `FakeKeyboardBackend`: records the shortcuts instead of sending them.
+"""
+
+from abc import ABC, abstractmethod
+import os
+import struct
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from controller_companion.app.utils import OperatingSystem, get_os
+from controller_companion.logs import logger
+
+# names of the valid keys (the key names of pyautogui), kept here so that mappings can be
+# validated without importing pyautogui (which fails without a display)
+KEYBOARD_KEYS: List[str] = (
+    list(
+        "\t\n\r !\"#$%&'()*+,-./0123456789:;<=>?@[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~"
+    )
+    + """accept add alt altleft altright apps backspace browserback browserfavorites
+    browserforward browserhome browserrefresh browsersearch browserstop capslock clear convert
+    ctrl ctrlleft ctrlright decimal del delete divide down end enter esc escape execute""".split()
+    + [f"f{i}" for i in range(1, 25)]
+    + """final fn hanguel hangul hanja help home insert junja kana kanji launchapp1 launchapp2
+    launchmail launchmediaselect left modechange multiply nexttrack nonconvert""".split()
+    + [f"num{i}" for i in range(10)]
+    + """numlock pagedown pageup pause pgdn pgup playpause prevtrack print printscreen prntscrn
+    prtsc prtscr return right scrolllock select separator shift shiftleft shiftright sleep space
+    stop subtract tab up volumedown volumemute volumeup win winleft winright yen command option
+    optionleft optionright""".split()
+)
+# pyautogui also accepts single uppercase letters on all platforms (typed using shift)
+_VALID_KEYS = frozenset(KEYBOARD_KEYS + list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+
+
+def get_valid_keys() -> List[str]:
+    """Get the names of all valid keys (as defined by pyautogui)."""
+    return KEYBOARD_KEYS
+
+
+def parse_shortcut(shortcut: str) -> Tuple[str, ...]:
+    """Parses a keyboard shortcut where the keys are separated by "+" (e.g. "alt+f4").
+
+    Raises:
+        ValueError: If the shortcut contains invalid keys.
+
+    Returns:
+        Tuple[str, ...]: The keys of the shortcut.
+    """
+    keys = tuple(shortcut.split("+"))
+    invalid_keys = [k for k in keys if k not in _VALID_KEYS]
+    if invalid_keys:
+        raise ValueError(
+            f'Invalid keyboard shortcut "{shortcut}"! The following keys are invalid: {invalid_keys}'
+        )
+    return keys
+
+
+class KeyboardBackend(ABC):
+
+    def compile(self, keys: Tuple[str, ...]) -> Any:
+        """Compiles the keys of a shortcut into a plan that can be executed by this backend.
+
+        Args:
+            keys (Tuple[str, ...]): Validated keys of the shortcut.
+        """
+        return keys
+
+    @abstractmethod
+    def execute(self, plan: Any, interval: float = 0.0):
+        """Presses the keys of a compiled shortcut in order and releases them in reverse order.
+
+        Args:
+            plan (Any): The compiled shortcut (see `compile`).
+            interval (float, optional): Delay in seconds between the individual key events. Defaults to 0.0.
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(KeyboardBackend):
+
+    def __init__(self):
+        import pyautogui
+
+        self.__pyautogui = pyautogui
+
+    def execute(self, plan: Tuple[str, ...], interval: float = 0.0):
+        # _pause=False skips the default pause of pyautogui after every key event
+        for key in plan:
+            self.__pyautogui.keyDown(key, _pause=False)
+            if interval:
+                time.sleep(interval)
+        for key in reversed(plan):
+            self.__pyautogui.keyUp(key, _pause=False)
+            if interval:
+                time.sleep(interval)
+
+
+class FakeKeyboardBackend(KeyboardBackend):
+
+    def __init__(self):
+        self.executed: List[Tuple[str, ...]] = []
+
+    def execute(self, plan: Tuple[str, ...], interval: float = 0.0):
+        self.executed.append(plan)
+
+
+# ----------------------------------- uinput ---------------------------------- #
+UINPUT_PATH = "/dev/uinput"
+# ioctl request codes from linux/uinput.h
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+BUS_VIRTUAL = 0x06
+# struct input_event {struct timeval time; __u16 type; __u16 code; __s32 value;}
+INPUT_EVENT_FORMAT = "llHHi"
+# struct uinput_user_dev {char name[80]; struct input_id id; __u32 ff_effects_max;
+# __s32 absmax[64]; __s32 absmin[64]; __s32 absfuzz[64]; __s32 absflat[64];}
+UINPUT_USER_DEV_FORMAT = "80sHHHHI" + "64i" * 4
+# time it takes until a new input device is picked up by the system
+UINPUT_SETTLE_TIME = 0.2
+
+KEY_LEFTSHIFT = 42
+
+# pyautogui key name -> linux key code (linux/input-event-codes.h)
+UINPUT_KEY_CODES = {
+    **{c: code for c, code in zip("1234567890", range(2, 12))},
+    **{c: code for c, code in zip("qwertyuiop", range(16, 26))},
+    **{c: code for c, code in zip("asdfghjkl", range(30, 39))},
+    **{c: code for c, code in zip("zxcvbnm", range(44, 51))},
+    **{f"f{i}": code for i, code in zip(range(1, 11), range(59, 69))},
+    **{f"f{i}": code for i, code in zip(range(13, 25), range(183, 195))},
+    "f11": 87,
+    "f12": 88,
+    "-": 12,
+    "=": 13,
+    "[": 26,
+    "]": 27,
+    ";": 39,
+    "'": 40,
+    "`": 41,
+    "\\": 43,
+    ",": 51,
+    ".": 52,
+    "/": 53,
+    " ": 57,
+    "space": 57,
+    "esc": 1,
+    "escape": 1,
+    "backspace": 14,
+    "\b": 14,
+    "tab": 15,
+    "\t": 15,
+    "enter": 28,
+    "return": 28,
+    "\n": 28,
+    "\r": 28,
+    "ctrl": 29,
+    "ctrlleft": 29,
+    "ctrlright": 97,
+    "shift": KEY_LEFTSHIFT,
+    "shiftleft": KEY_LEFTSHIFT,
+    "shiftright": 54,
+    "alt": 56,
+    "altleft": 56,
+    "altright": 100,
+    "win": 125,
+    "winleft": 125,
+    "winright": 126,
+    "apps": 127,
+    "capslock": 58,
+    "numlock": 69,
+    "scrolllock": 70,
+    "printscreen": 99,
+    "prntscrn": 99,
+    "prtsc": 99,
+    "prtscr": 99,
+    "print": 99,
+    "pause": 119,
+    "insert": 110,
+    "delete": 111,
+    "del": 111,
+    "home": 102,
+    "end": 107,
+    "pageup": 104,
+    "pgup": 104,
+    "pagedown": 109,
+    "pgdn": 109,
+    "up": 103,
+    "down": 108,
+    "left": 105,
+    "right": 106,
+    "num7": 71,
+    "num8": 72,
+    "num9": 73,
+    "subtract": 74,
+    "num4": 75,
+    "num5": 76,
+    "num6": 77,
+    "add": 78,
+    "num1": 79,
+    "num2": 80,
+    "num3": 81,
+    "num0": 82,
+    "decimal": 83,
+    "multiply": 55,
+    "divide": 98,
+    "volumemute": 113,
+    "volumedown": 114,
+    "volumeup": 115,
+    "nexttrack": 163,
+    "playpause": 164,
+    "prevtrack": 165,
+    "stop": 166,
+    "browserback": 158,
+    "browserforward": 159,
+    "browserrefresh": 173,
+    "browserhome": 172,
+    "browsersearch": 217,
+    "sleep": 142,
+}
+# characters that are typed using shift (US layout)
+UINPUT_SHIFTED_KEYS = {
+    **{c.upper(): c for c in "abcdefghijklmnopqrstuvwxyz"},
+    **{s: c for s, c in zip('!@#$%^&*()_+{}:"~|<>?', "1234567890-=[];'`\\,./")},
+}
+
+
+# environment variable that selects the keyboard backend ("pyautogui" or "uinput")
+BACKEND_ENV_VAR = "CONTROLLER_COMPANION_KEYBOARD_BACKEND"
+
+
+def uinput_supported() -> bool:
+    return get_os() == OperatingSystem.LINUX and os.access(UINPUT_PATH, os.W_OK)
+
+
+class UInputBackend(KeyboardBackend):
+    """Sends the key events through a virtual keyboard device (Linux only).
+
+    Shortcuts containing keys that are not supported by the virtual keyboard are executed by
+    pyautogui instead.
+    """
+
+    def __init__(self):
+        import fcntl
+
+        self.__ioctl = fcntl.ioctl
+        self.__lock = threading.Lock()
+        self.__fallback: Optional[KeyboardBackend] = None
+        self.__fd = os.open(UINPUT_PATH, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            self.__ioctl(self.__fd, UI_SET_EVBIT, EV_KEY)
+            self.__ioctl(self.__fd, UI_SET_EVBIT, EV_SYN)
+            for code in set(UINPUT_KEY_CODES.values()):
+                self.__ioctl(self.__fd, UI_SET_KEYBIT, code)
+            os.write(
+                self.__fd,
+                struct.pack(
+                    UINPUT_USER_DEV_FORMAT,
+                    b"Controller Companion Keyboard",
+                    BUS_VIRTUAL,
+                    0,
+                    0,
+                    1,
+                    0,
+                    *([0] * 64 * 4),
+                ),
+            )
+            self.__ioctl(self.__fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(self.__fd)
+            raise
+        self.__created_at = time.monotonic()
+
+    def compile(self, keys: Tuple[str, ...]) -> Any:
+        codes = []
+        for key in keys:
+            if key in UINPUT_SHIFTED_KEYS:
+                codes.extend(
+                    [KEY_LEFTSHIFT, UINPUT_KEY_CODES[UINPUT_SHIFTED_KEYS[key]]]
+                )
+            elif key.lower() in UINPUT_KEY_CODES:
+                codes.append(UINPUT_KEY_CODES[key.lower()])
+            else:
+                # not supported by the virtual keyboard, let pyautogui handle the shortcut
+                return keys
+
+        syn = struct.pack(INPUT_EVENT_FORMAT, 0, 0, EV_SYN, SYN_REPORT, 0)
+        down = [
+            struct.pack(INPUT_EVENT_FORMAT, 0, 0, EV_KEY, c, 1) + syn for c in codes
+        ]
+        up = [
+            struct.pack(INPUT_EVENT_FORMAT, 0, 0, EV_KEY, c, 0) + syn
+            for c in reversed(codes)
+        ]
+        return down + up
+
+    def execute(self, plan: Any, interval: float = 0.0):
+        if isinstance(plan, tuple):
+            self.__get_fallback().execute(plan, interval=interval)
+            return
+
+        with self.__lock:
+            # the first events are lost if the device was not yet picked up by the system
+            remaining = UINPUT_SETTLE_TIME - (time.monotonic() - self.__created_at)
+            if remaining > 0:
+                time.sleep(remaining)
+
+            if interval:
+                for event in plan:
+                    os.write(self.__fd, event)
+                    time.sleep(interval)
+            else:
+                os.write(self.__fd, b"".join(plan))
+
+    def close(self):
+        with self.__lock:
+            try:
+                self.__ioctl(self.__fd, UI_DEV_DESTROY)
+            finally:
+                os.close(self.__fd)
+
+    def __get_fallback(self) -> KeyboardBackend:
+        if self.__fallback is None:
+            self.__fallback = PyAutoGuiBackend()
+        return self.__fallback
+
+
+# ---------------------------------------------------------------------------- #
+
+_backend: Optional[KeyboardBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> KeyboardBackend:
+    """Get the keyboard backend used to execute shortcuts.
+
+    pyautogui is used unless the uinput backend is enabled by the environment variable
+    `CONTROLLER_COMPANION_KEYBOARD_BACKEND=uinput` (and /dev/uinput is writable).
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if os.environ.get(BACKEND_ENV_VAR, "").lower() == "uinput":
+                if uinput_supported():
+                    try:
+                        _backend = UInputBackend()
+                    except OSError as e:
+                        logger.warning("Failed to create the virtual keyboard: %s", e)
+                else:
+                    logger.warning(
+                        "The uinput keyboard backend is not supported, %s is not writable.",
+                        UINPUT_PATH,
+                    )
+            if _backend is None:
+                _backend = PyAutoGuiBackend()
+            logger.debug("Using keyboard backend %s", type(_backend).__name__)
+        return _backend
+
+
+def set_backend(backend: Optional[KeyboardBackend]):
+    """Sets the keyboard backend used to execute shortcuts (None resets to the default)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
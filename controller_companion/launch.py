@@ -1,14 +1,13 @@
 import argparse
-import json
 from pathlib import Path
 
 
 import controller_companion
-from controller_companion.app.app import launch_app
-from controller_companion.app.controller_layouts import XboxControllerLayout
-from controller_companion.controller_observer import ControllerObserver
-from controller_companion.mapping import Mapping, ActionType
-from controller_companion.controller import ControllerType
+from controller_companion import logs
+from controller_companion.input_backend import BACKENDS
+
+# the other modules are imported by the modes that need them (e.g. the ui is not loaded for
+# headless runs), so the cli starts fast.
 
 
 def cli():
@@ -84,6 +83,30 @@ def cli():
         type=str,
         default=None,
     )
+    parser.add_argument(
+        "--no-reload",
+        help="Do not reload the mappings when the config file (--config, --custom-config) changes.",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--backend",
+        help="Source of the controller inputs. evdev reads the Linux input devices directly (requires read access to /dev/input).",
+        choices=[b for b in BACKENDS.keys() if b != "fake"],
+        default="pygame",
+    )
+    parser.add_argument(
+        "--log-console",
+        help="Format of the log messages on the console. plain is cheaper than rich, none disables them.",
+        choices=logs.CONSOLE_FORMATS,
+        default="rich",
+    )
+    parser.add_argument(
+        "--log-file",
+        help="Also write the log messages as JSON lines to this file (rotated at 5 MiB).",
+        type=str,
+        default=None,
+    )
     parser.add_argument(
         "--ui",
         help="Launch the app version of controller companion. Setting this flag will ignore all other arguments (except --minimized).",
@@ -106,14 +129,26 @@ def cli():
         print("Installed version:", controller_companion.VERSION)
         return
     elif args.valid_keys:
+        from controller_companion.mapping import Mapping
+
         print(
             f"The following keys are valid inputs that can be used with the --shortcut argument:\n{Mapping.get_valid_keyboard_keys()}"
         )
         return
 
     if args.ui:
+        from controller_companion.app.app import launch_app
+
         launch_app(minimized=args.minimized)
     else:
+        from controller_companion.app.controller_layouts import (
+            ControllerType,
+            get_layout,
+        )
+        from controller_companion.controller_observer import ControllerObserver
+        from controller_companion.input_backend import create_backend
+        from controller_companion.mapping import ActionType, Mapping, load_mappings
+
         if args.input is not None:
             if len(args.input) != (
                 len(args.task_kill) + len(args.console) + len(args.shortcut)
@@ -124,15 +159,20 @@ def cli():
 
             active_buttons_list = []
             controller_type = ControllerType.XBOX
-            layout = XboxControllerLayout()
+            layout = get_layout(controller_type)
             button_mapper = layout.get_button_layout()
             d_pad_mapper = layout.get_d_pad_layout()
+            axis_mapper = layout.get_axis_layout()
             for button_combination in args.input:
                 button_names = button_combination.split(",")
                 for name in button_names:
-                    if name not in button_mapper and name not in d_pad_mapper:
+                    if (
+                        name not in button_mapper
+                        and name not in d_pad_mapper
+                        and name not in axis_mapper
+                    ):
                         raise Exception(
-                            f"key {name} is not a valid input. Valid options are {Mapping.get_valid_controller_inputs()}"
+                            f"key {name} is not a valid input. Valid options are {layout.get_valid_input_names()}"
                         )
                 active_buttons_list.append(button_names)
 
@@ -173,18 +213,25 @@ def cli():
                 )
                 state_counter += 1
 
+        # the log messages are formatted and written by a background thread, so logging does not
+        # delay the observer thread.
+        logs.setup_queue_logging(
+            console=args.log_console,
+            log_file=Path(args.log_file) if args.log_file else None,
+        )
+
         # ------------------------------ config support ------------------------------ #
+        observer = ControllerObserver(backend=create_backend(args.backend))
         custom_config = args.custom_config
         use_config = args.config
         if custom_config is not None or use_config:
             path = custom_config if custom_config else controller_companion.CONFIG_PATH
-            settings = json.loads(Path(path).read_text())
-            defined_actions = [
-                Mapping.from_dict(d) for d in settings.get("actions", [])
-            ]
+            defined_actions = load_mappings(Path(path))
+            if not args.no_reload:
+                observer.watch_config(Path(path))
         # ---------------------------------------------------------------------------- #
 
-        ControllerObserver().start(
+        observer.start(
             defined_actions=defined_actions,
             debug=debug,
             disabled_controllers=args.disable,
@@ -1,15 +1,167 @@
+"""Logging of controller companion.
+
+By default, the records are printed by rich on the logging thread. For headless/ production runs
+`setup_queue_logging` moves all formatting and I/O to a background listener thread: the logging
+thread only puts the record into a queue (which never blocks). Log calls in hot paths use lazy
+`%`-style arguments, so they cost nothing if their level is disabled.
+"""
+
+import atexit
+import json
 import logging
-from rich.logging import RichHandler
+from pathlib import Path
+import queue
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import logging.handlers
 
 DEBUG = logging.DEBUG
 INFO = logging.INFO
 WARNING = logging.WARNING
 ERROR = logging.ERROR
 
+CONSOLE_FORMATS = ["rich", "plain", "none"]
+
+
+class _LazyRichHandler(logging.Handler):
+    """Forwards the records to a `rich.logging.RichHandler`, which is created on the first record.
+
+    This way rich is only imported if something is logged (e.g. not for `--version`).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__handler = None
+
+    def emit(self, record: logging.LogRecord):
+        if self.__handler is None:
+            from rich.logging import RichHandler
+
+            self.__handler = RichHandler()
+            self.__handler.setFormatter(self.formatter)
+        self.__handler.emit(record)
+
+
+class _QueueHandler(logging.Handler):
+    """Puts the records into a queue (never blocks).
+
+    Unlike `logging.handlers.QueueHandler`, only the arguments are merged into the message here (as
+    they might be modified by the logging thread afterwards), all formatting is left to the
+    listener thread.
+    """
+
+    def __init__(self, records: "queue.SimpleQueue[logging.LogRecord]"):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            self.records.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
 FORMAT = "%(message)s"
-logging.basicConfig(format=FORMAT, datefmt="[%X]", handlers=[RichHandler()])
+logging.basicConfig(format=FORMAT, datefmt="[%X]", handlers=[_LazyRichHandler()])
 logger = logging.getLogger(__name__)
 
+_listener: "Optional[logging.handlers.QueueListener]" = None
+
 
 def set_log_level(level):
     logger.setLevel(level)
+
+
+def setup_queue_logging(
+    console: str = "rich",
+    log_file: Optional[Path] = None,
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 3,
+):
+    """Replaces the handlers of the root logger with a non-blocking queue handler.
+
+    The records are formatted and written by a listener thread, which is stopped (after writing all
+    queued records) when the interpreter exits.
+
+    Args:
+        console (str, optional): Format of the console output: "rich", "plain" (no colors/ layout, cheaper) or "none". Defaults to "rich".
+        log_file (Optional[Path], optional): Also write the records as JSON lines to this (rotating) file. Defaults to None.
+        max_bytes (int, optional): Size at which the log file is rotated. Defaults to 5 MiB.
+        backup_count (int, optional): Number of kept rotated log files. Defaults to 3.
+
+    Raises:
+        ValueError: If the console format is unknown.
+    """
+    import logging.handlers
+
+    global _listener
+    if console not in CONSOLE_FORMATS:
+        raise ValueError(
+            f"Unknown console format {console}! Valid options are {CONSOLE_FORMATS}"
+        )
+
+    handlers = []
+    if console == "rich":
+        handler = _LazyRichHandler()
+        handler.setFormatter(logging.Formatter(FORMAT, datefmt="[%X]"))
+        handlers.append(handler)
+    elif console == "plain":
+        handler = logging.StreamHandler()
+        handler.setFormatter(
+            logging.Formatter("[%(asctime)s] %(levelname)-8s %(message)s", "%X")
+        )
+        handlers.append(handler)
+    if log_file is not None:
+        log_file = Path(log_file)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(JsonLinesFormatter())
+        handlers.append(handler)
+
+    stop_queue_logging()
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def stop_queue_logging():
+    """Writes the queued records and stops the listener thread of `setup_queue_logging`."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_queue_logging)
@@ -1,11 +1,20 @@
 from enum import Enum
+import json
+from pathlib import Path
 import subprocess
-from typing import Dict, List
-import pyautogui
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from controller_companion.app.controller_layouts import (
     ControllerType,
+    get_layout,
 )
+from controller_companion import keyboard, task_kill
 from controller_companion.app.utils import OperatingSystem, get_os
+from controller_companion.logs import logger
+from controller_companion.process_supervisor import (
+    ExecutionMode,
+    ProcessSupervisor,
+    split_command,
+)
 from controller_companion.controller_state import (
     button_mapper,
     d_pad_mapper,
@@ -18,6 +27,17 @@ class ActionType(Enum):
     KEYBOARD_SHORTCUT = "Keyboard Shortcut"
 
 
+class ConcurrencyPolicy(Enum):
+    """What happens if a mapping is triggered while its action is still running."""
+
+    # ignore the trigger
+    DROP = "Drop"
+    # run the action again once the running one finished
+    QUEUE = "Queue"
+    # like QUEUE, but only the latest pending trigger is kept
+    REPLACE = "Replace"
+
+
 class Mapping:
 
     def __init__(
@@ -27,36 +47,158 @@ class Mapping:
         active_controller_buttons: List[str],
         name: str,
         controller_type: ControllerType = ControllerType.XBOX,
+        concurrency: ConcurrencyPolicy = ConcurrencyPolicy.QUEUE,
+        timeout: Optional[float] = None,
+        debounce_ms: int = 0,
+        repeat_ms: int = 0,
+        cooldown_ms: int = 0,
+        execution_mode: ExecutionMode = ExecutionMode.SPAWN,
+        key_interval_ms: int = 0,
     ):
+        """
+        Raises:
+            ValueError: If the target of a keyboard shortcut contains invalid keys.
+        """
         self.name = name
         self.action_type = action_type
         self.target = target
         self.active_controller_buttons = active_controller_buttons
         self.controller_type = controller_type
+        self.concurrency = concurrency
+        self.timeout = timeout
+        # see ComboDetector for a description of these options
+        self.debounce_ms = debounce_ms
+        self.repeat_ms = repeat_ms
+        self.cooldown_ms = cooldown_ms
+        self.execution_mode = execution_mode
+        # delay between the individual key events of keyboard shortcuts
+        self.key_interval_ms = key_interval_ms
+
+        # keyboard shortcuts are parsed and validated once. they are compiled into a plan of
+        # the keyboard backend on the first execution.
+        self.shortcut_keys: Tuple[str, ...] = ()
+        if action_type == ActionType.KEYBOARD_SHORTCUT:
+            self.shortcut_keys = keyboard.parse_shortcut(target)
+        self._shortcut_plan: Optional[Tuple[keyboard.KeyboardBackend, Any]] = None
+        # cached result of get_key
+        self._key: Optional[Tuple[FrozenSet[str], str]] = None
+
+    def execute(
+        self,
+        timeout: Optional[float] = None,
+        supervisor: Optional[ProcessSupervisor] = None,
+    ) -> Optional[int]:
+        """Executes the action of this mapping (blocking).
+
+        Args:
+            timeout (Optional[float], optional): Timeout in seconds for actions that run a process. Defaults to None.
+            supervisor (Optional[ProcessSupervisor], optional): Launches and tracks the processes. Defaults to None (processes are spawned directly).
+
+        Raises:
+            subprocess.TimeoutExpired: If the process did not finish in time (the process is killed).
 
-    def execute(self):
+        Returns:
+            Optional[int]: The exit code of the process if the action runs one.
+        """
         if self.action_type == ActionType.TASK_KILL_BY_NAME:
             os = get_os()
             if os == OperatingSystem.WINDOWS:
-                subprocess.run(["taskkill", "/im", self.target])
+                args = ["taskkill", "/im", self.target]
             elif os == OperatingSystem.LINUX:
-                subprocess.run(["pkill", self.target])
+                if task_kill.is_supported():
+                    # signal the processes directly instead of spawning pkill
+                    result = task_kill.kill_by_name(self.target, timeout=timeout)
+                    logger.info(
+                        'Kill by name "%s": terminated %s, killed %s, failed %s',
+                        self.target,
+                        result.terminated,
+                        result.killed,
+                        result.failed,
+                    )
+                    return result.exit_code
+                args = ["pkill", self.target]
             else:
-                subprocess.run(["killall", self.target])
+                args = ["killall", self.target]
+            if supervisor is not None:
+                return supervisor.run(self.get_key(), args, timeout=timeout)
+            return subprocess.run(args, timeout=timeout).returncode
 
         elif self.action_type == ActionType.KEYBOARD_SHORTCUT:
-            keys = self.target.split("+")
-
-            invalid_keys = [k for k in keys if not pyautogui.isValidKey(k)]
-            if invalid_keys:
-                print(
-                    f"Invalid keys provided as keyboard shortcuts! The following keys are invalid: {invalid_keys}"
+            backend = keyboard.get_backend()
+            if self._shortcut_plan is None or self._shortcut_plan[0] is not backend:
+                self._shortcut_plan = (backend, backend.compile(self.shortcut_keys))
+            backend.execute(
+                self._shortcut_plan[1], interval=self.key_interval_ms / 1000
+            )
+        else:
+            if self.execution_mode == ExecutionMode.SHELL:
+                args = self.target
+            else:
+                args = split_command(self.target)
+            if supervisor is not None:
+                # keyed by the mapping key, so a reloaded mapping reuses its worker shell
+                return supervisor.run(
+                    self.get_key(), args, mode=self.execution_mode, timeout=timeout
                 )
-                return
+            if self.execution_mode == ExecutionMode.SHELL:
+                return subprocess.run(args, shell=True, timeout=timeout).returncode
+            if timeout is None:
+                # like ProcessSupervisor.run, spawned processes without timeout are not waited for
+                subprocess.Popen(args)
+                return None
+            return subprocess.run(args, timeout=timeout).returncode
+
+    async def execute_async(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Executes the action of this mapping without blocking the running event loop.
+
+        Console commands are launched as asyncio subprocesses (also in ExecutionMode.SHELL, where a
+        new shell is started for every execution), the command line of ExecutionMode.SPAWN is split
+        the same way as by `execute` (see `split_command`). On Windows, where asyncio can only
+        launch a list of arguments but the command line is parsed by the started program, for
+        spawned processes without timeout, which are not waited for (see `ProcessSupervisor.run`),
+        and for the other actions, `execute` is called by the default executor of the event loop.
+        If the task is cancelled, a launched process is killed.
+
+        Args:
+            timeout (Optional[float], optional): Timeout in seconds for actions that run a process. Defaults to None.
+
+        Raises:
+            subprocess.TimeoutExpired: If the process did not finish in time (the process is killed).
+
+        Returns:
+            Optional[int]: The exit code of the process if the action runs one.
+        """
+        import asyncio
 
-            pyautogui.hotkey(keys)
+        if self.action_type != ActionType.CONSOLE_COMMAND or (
+            self.execution_mode == ExecutionMode.SPAWN
+            and (timeout is None or get_os() == OperatingSystem.WINDOWS)
+        ):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.execute, timeout)
+
+        if self.execution_mode == ExecutionMode.SHELL:
+            process = await asyncio.create_subprocess_shell(self.target)
         else:
-            subprocess.run(self.target)
+            process = await asyncio.create_subprocess_exec(*split_command(self.target))
+        try:
+            return await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.__kill(process)
+            await process.wait()
+            raise subprocess.TimeoutExpired(self.target, timeout)
+        except asyncio.CancelledError:
+            self.__kill(process)
+            await process.wait()
+            raise
+
+    @staticmethod
+    def __kill(process):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            # the process finished in the meantime
+            pass
 
     def to_dict(self):
         return {
@@ -65,6 +207,13 @@ class Mapping:
             "target": self.target,
             "active_controller_buttons": self.active_controller_buttons,
             "controller_type": self.controller_type.name,
+            "concurrency": self.concurrency.name,
+            "timeout": self.timeout,
+            "debounce_ms": self.debounce_ms,
+            "repeat_ms": self.repeat_ms,
+            "cooldown_ms": self.cooldown_ms,
+            "execution_mode": self.execution_mode.name,
+            "key_interval_ms": self.key_interval_ms,
         }
 
     @classmethod
@@ -76,17 +225,87 @@ class Mapping:
             action_type=ActionType[dict["action_type"]],
             active_controller_buttons=dict["active_controller_buttons"],
             controller_type=ControllerType[dict["controller_type"]],
+            concurrency=ConcurrencyPolicy[
+                dict.get("concurrency", ConcurrencyPolicy.QUEUE.name)
+            ],
+            timeout=dict.get("timeout", None),
+            debounce_ms=dict.get("debounce_ms", 0),
+            repeat_ms=dict.get("repeat_ms", 0),
+            cooldown_ms=dict.get("cooldown_ms", 0),
+            execution_mode=ExecutionMode[
+                dict.get("execution_mode", ExecutionMode.SPAWN.name)
+            ],
+            key_interval_ms=dict.get("key_interval_ms", 0),
         )
 
     def get_valid_keyboard_keys() -> List[str]:
-        return pyautogui.KEYBOARD_KEYS
+        return keyboard.get_valid_keys()
 
     def get_valid_controller_inputs() -> List[str]:
         return list(button_mapper.keys()) + list(d_pad_mapper.keys())
 
+    def get_xbox_combo(self) -> FrozenSet[str]:
+        """Get the controller inputs of this mapping using the Xbox button names.
+
+        Returns:
+            FrozenSet[str]: The Xbox-normalized controller input combination.
+        """
+        return frozenset(
+            get_layout(self.controller_type).convert_button_names_to_xbox(
+                self.active_controller_buttons, sort=False
+            )
+        )
+
+    def get_key(self) -> Tuple[FrozenSet[str], str]:
+        """Get a key that identifies this mapping across reloads of the config, where new mapping
+        objects are created for the same mappings.
+
+        Returns:
+            Tuple[FrozenSet[str], str]: The Xbox-normalized input combination and the name.
+        """
+        if self._key is None:
+            self._key = (self.get_xbox_combo(), self.name)
+        return self._key
+
     def get_shortcut_string(self) -> str:
         return "+".join(self.active_controller_buttons)
 
     def __repr__(self):
-        content = ", ".join(f'{key}: "{value}"' for key, value in self.__dict__.items())
+        content = ", ".join(
+            f'{key}: "{value}"'
+            for key, value in self.__dict__.items()
+            if not key.startswith("_")
+        )
         return f"Controller({content})"
+
+
+def mappings_from_dicts(dicts: List[Dict]) -> List[Mapping]:
+    """Creates the mappings of a config. Invalid mappings (e.g. a keyboard shortcut with an unknown
+    key) are logged and skipped, so they don't invalidate the whole config.
+
+    Returns:
+        List[Mapping]: The valid mappings.
+    """
+    mappings = []
+    for d in dicts:
+        try:
+            mappings.append(Mapping.from_dict(d))
+        except (KeyError, TypeError, ValueError) as e:
+            name = d.get("name", None) if isinstance(d, dict) else None
+            logger.warning('Skipping the invalid mapping "%s": %s', name, e)
+    return mappings
+
+
+def load_mappings(path: Path) -> List[Mapping]:
+    """Loads the mappings of a config file (using the format of the app config).
+
+    Invalid mappings are skipped (see `mappings_from_dicts`).
+
+    Raises:
+        Exception: If the config file can not be read.
+
+    Returns:
+        List[Mapping]: The valid mappings defined in the config file.
+    """
+    settings = json.loads(Path(path).read_text())
+    return mappings_from_dicts(settings.get("actions", []))
@@ -0,0 +1,44 @@
+from typing import Dict, FrozenSet, List
+
+from controller_companion.app.controller_layouts import get_layout
+from controller_companion.mapping import Mapping
+
+
+class MappingIndex:
+    """Index of the defined mappings, keyed by their Xbox-normalized controller input combination.
+
+    The index is compiled once, so looking up the mappings that match the current state of a
+    controller is a single dict access, no matter how many mappings are defined.
+    """
+
+    def __init__(self, mappings: List[Mapping]):
+        self.__mappings: Dict[FrozenSet[str], List[Mapping]] = {}
+        # True if any mapping uses an analog axis input (e.g. a trigger)
+        self.uses_axes = False
+
+        for mapping in mappings:
+            combo = mapping.get_xbox_combo()
+            if len(combo) == 0:
+                # mappings without any controller inputs can never be triggered
+                continue
+            self.__mappings.setdefault(combo, []).append(mapping)
+            axis_layout = get_layout(mapping.controller_type).get_axis_layout()
+            if any(b in axis_layout for b in mapping.active_controller_buttons):
+                self.uses_axes = True
+
+    def lookup(self, xbox_combo: FrozenSet[str]) -> List[Mapping]:
+        """Get all mappings that are triggered by the given controller input combination.
+
+        Args:
+            xbox_combo (FrozenSet[str]): The active controller inputs using the Xbox button names.
+
+        Returns:
+            List[Mapping]: The matching mappings (empty if there are none).
+        """
+        return self.__mappings.get(xbox_combo, [])
+
+    def __len__(self):
+        return sum(len(mappings) for mappings in self.__mappings.values())
+
+    def __contains__(self, xbox_combo: FrozenSet[str]) -> bool:
+        return xbox_combo in self.__mappings
@@ -0,0 +1,273 @@
+from enum import Enum
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import Dict, Hashable, List, Optional, Sequence, Union
+
+from controller_companion.app.utils import OperatingSystem, get_os
+from controller_companion.logs import logger
+
+
+class ExecutionMode(Enum):
+    """How the processes of console command actions are launched."""
+
+    # start a new process for every execution (the target is the executable and its arguments,
+    # see `split_command`)
+    SPAWN = "Spawn"
+    # run the target as command line in a persistent worker shell, which skips the
+    # process creation and interpreter startup of the shell for repeated executions.
+    SHELL = "Shell"
+
+
+def split_command(command: str) -> Union[str, List[str]]:
+    """Splits the target of a console command into the arguments of `subprocess.Popen` (SPAWN mode).
+
+    On Windows the command line is passed on as it is, the started program parses it. On other
+    platforms it is split like a POSIX shell would do it (`shlex.split`, without expanding
+    variables or globs), unless the whole command is the path of an existing file, so executables
+    with spaces in their path keep working without quotes.
+
+    Args:
+        command (str): The command line.
+
+    Returns:
+        Union[str, List[str]]: The arguments of `subprocess.Popen`.
+    """
+    if get_os() == OperatingSystem.WINDOWS:
+        return command
+    if os.path.isfile(command):
+        return [command]
+    return shlex.split(command)
+
+
+class _WorkerShell:
+    """Long-lived POSIX shell that executes commands written to its stdin."""
+
+    def __init__(self):
+        self.__marker = f"__controller_companion_{uuid.uuid4().hex}__"
+        self.__lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.__lock = threading.Lock()
+        self.process = subprocess.Popen(
+            ["/bin/sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            # own process group, so the shell can be killed together with its commands
+            start_new_session=True,
+        )
+        threading.Thread(target=self.__read_output, daemon=True).start()
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, command: str, timeout: Optional[float] = None) -> int:
+        with self.__lock:
+            return self.__run(command, timeout=timeout)
+
+    def __run(self, command: str, timeout: Optional[float] = None) -> int:
+        # the command runs in a forked subshell (no exec and startup of a new shell), so
+        # e.g. "exit" or "cd" don't affect the worker shell. stdin of the command is
+        # redirected, so it can't consume the following commands.
+        self.process.stdin.write(
+            f"( {command}\n) < /dev/null\necho {self.__marker} $?\n"
+        )
+        self.process.stdin.flush()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty()
+                line = self.__lines.get(timeout=remaining)
+            except queue.Empty:
+                self.kill()
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            if line is None:
+                raise Exception(f"The worker shell exited while running: {command}")
+            output, marker, exit_code = line.partition(self.__marker)
+            if output.strip():
+                logger.debug("[%s] %s", command, output.rstrip())
+            if marker:
+                return int(exit_code)
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        self.process.wait()
+
+    def __read_output(self):
+        for line in self.process.stdout:
+            self.__lines.put(line)
+        self.__lines.put(None)
+
+
+class ProcessSupervisor:
+    """Launches the processes of actions and keeps track of them.
+
+    Every launched process is tracked until it finished and was reaped, so no zombie processes
+    are left behind. Spawned processes without timeout are not waited for (they are usually
+    applications that keep running, e.g. a game), they are reaped by `reap`, which needs to be
+    called regularly. Commands using `ExecutionMode.SHELL` are executed by a persistent worker
+    shell per key (e.g. per mapping), which is reused for subsequent executions.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # processes that are waited for by the thread that launched them
+        self.__children: Dict[int, subprocess.Popen] = {}
+        # processes that are not waited for, they are reaped by `reap`
+        self.__detached: Dict[int, subprocess.Popen] = {}
+        self.__shells: Dict[Hashable, _WorkerShell] = {}
+        self.__shell_supported = get_os() != OperatingSystem.WINDOWS
+        self.__closed = False
+
+    def run(
+        self,
+        key: Hashable,
+        args: Union[str, Sequence[str]],
+        mode: ExecutionMode = ExecutionMode.SPAWN,
+        timeout: Optional[float] = None,
+    ) -> Optional[int]:
+        """Runs a process and waits for it to finish (or for the supervisor to be closed).
+
+        Spawned processes (`ExecutionMode.SPAWN`) are only waited for if a timeout is given,
+        otherwise the call returns once the process was started, so a long running application
+        does not block the calling worker thread. Their exit code is logged by `reap`.
+
+        Args:
+            key (Hashable): Key of the caller (e.g. the mapping), each key has its own worker shell.
+            args (Union[str, Sequence[str]]): The program and its arguments or command line (SHELL mode).
+            mode (ExecutionMode, optional): How the process is launched. Defaults to ExecutionMode.SPAWN.
+            timeout (Optional[float], optional): Timeout in seconds. Defaults to None.
+
+        Raises:
+            subprocess.TimeoutExpired: If the process did not finish in time (the process is killed).
+
+        Returns:
+            Optional[int]: The exit code of the process, None if it was not waited for or the supervisor was closed while it was still running.
+        """
+        if mode == ExecutionMode.SHELL:
+            if self.__shell_supported:
+                return self.__get_shell(key).run(args, timeout=timeout)
+            logger.warning(
+                f"{mode} is not supported on {get_os().value}, the process is spawned instead."
+            )
+
+        process = subprocess.Popen(args)
+        if timeout is None:
+            with self.__lock:
+                self.__detached[process.pid] = process
+            logger.debug("Started process %s: %s", process.pid, args)
+            return None
+
+        with self.__lock:
+            self.__children[process.pid] = process
+        try:
+            return self.__wait(process, timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            with self.__lock:
+                self.__children.pop(process.pid, None)
+
+    def get_children(self) -> List[subprocess.Popen]:
+        """Get the currently running processes (not including worker shells)."""
+        with self.__lock:
+            return list(self.__children.values()) + list(self.__detached.values())
+
+    def reap(self) -> int:
+        """Reaps the finished processes that are not waited for and logs their exit codes.
+
+        Returns:
+            int: Number of reaped processes.
+        """
+        with self.__lock:
+            finished = [p for p in self.__detached.values() if p.poll() is not None]
+            for process in finished:
+                del self.__detached[process.pid]
+
+        for process in finished:
+            if process.returncode == 0:
+                logger.debug(
+                    "Process %s exited with code %s: %s",
+                    process.pid,
+                    process.returncode,
+                    process.args,
+                )
+            else:
+                logger.warning(
+                    "Process %s exited with code %s: %s",
+                    process.pid,
+                    process.returncode,
+                    process.args,
+                )
+        return len(finished)
+
+    def close_shell(self, key: Hashable):
+        """Stops the worker shell of a key (if it was started)."""
+        with self.__lock:
+            shell = self.__shells.pop(key, None)
+        if shell is not None:
+            shell.kill()
+
+    def close(self):
+        """Stops all worker shells and the commands running in them.
+
+        Spawned processes (`ExecutionMode.SPAWN`) are intentionally left running, as they are
+        usually applications that were launched through a mapping (e.g. a game or a browser), which
+        should not be closed together with this app. `run` stops waiting for the ones with a
+        timeout, so they don't keep the threads of the executor (and the exit of the interpreter)
+        waiting. If they finish while this process is still alive, they are reaped by the
+        subprocess module with the next launched process (once the supervisor was garbage
+        collected), otherwise they are re-parented to init (on POSIX). They share the process group
+        of this app, so e.g. Ctrl+C in its terminal also reaches them.
+        """
+        self.reap()
+        with self.__lock:
+            self.__closed = True
+            shells = list(self.__shells.values())
+            self.__shells.clear()
+        for shell in shells:
+            shell.kill()
+
+    def __wait(
+        self, process: subprocess.Popen, timeout: Optional[float]
+    ) -> Optional[int]:
+        # waits in slices to notice when the supervisor is closed
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                return process.wait(
+                    timeout=0.5 if remaining is None else max(0, min(remaining, 0.5))
+                )
+            except subprocess.TimeoutExpired:
+                if remaining is not None and remaining <= 0.5:
+                    raise subprocess.TimeoutExpired(process.args, timeout)
+                if self.__closed:
+                    logger.debug(
+                        "Stopped waiting for the process %s as the supervisor was closed.",
+                        process.pid,
+                    )
+                    return None
+
+    def __get_shell(self, key: Hashable) -> _WorkerShell:
+        with self.__lock:
+            shell = self.__shells.get(key, None)
+            if shell is None or not shell.is_alive():
+                shell = _WorkerShell()
+                self.__shells[key] = shell
+            return shell
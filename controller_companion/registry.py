@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+import threading
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from controller_companion.mapping import Mapping
+from controller_companion.mapping_index import MappingIndex
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable version of the defined mappings and disabled controllers."""
+
+    mappings: Tuple[Mapping, ...]
+    mapping_index: MappingIndex
+    # guids of the disabled controllers
+    disabled_controllers: FrozenSet[str]
+    version: int
+
+    def is_disabled(self, guid: str) -> bool:
+        return guid in self.disabled_controllers
+
+
+class MappingRegistry:
+    """Holds the defined mappings and disabled controllers shared between the ui and the observer.
+
+    Writers publish a new snapshot instead of modifying the current one. Readers take a reference
+    to the current snapshot (without locking) and keep using it, so they never see a partially
+    updated state.
+    """
+
+    def __init__(
+        self,
+        mappings: Iterable[Mapping] = (),
+        disabled_controllers: Iterable[str] = (),
+    ):
+        self.__lock = threading.Lock()
+        mappings = tuple(mappings)
+        self.__snapshot = RegistrySnapshot(
+            mappings=mappings,
+            mapping_index=MappingIndex(mappings),
+            disabled_controllers=frozenset(disabled_controllers),
+            version=0,
+        )
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """The current snapshot. Reading it does not lock."""
+        return self.__snapshot
+
+    def publish(
+        self,
+        mappings: Optional[Iterable[Mapping]] = None,
+        disabled_controllers: Optional[Iterable[str]] = None,
+    ) -> RegistrySnapshot:
+        """Publishes a new snapshot. Values that are not given are taken from the current snapshot.
+
+        Args:
+            mappings (Optional[Iterable[Mapping]], optional): The new mappings. Defaults to None.
+            disabled_controllers (Optional[Iterable[str]], optional): The new guids of the disabled controllers. Defaults to None.
+
+        Returns:
+            RegistrySnapshot: The published snapshot.
+        """
+        with self.__lock:
+            current = self.__snapshot
+            if mappings is None:
+                mappings, mapping_index = current.mappings, current.mapping_index
+            else:
+                mappings = tuple(mappings)
+                mapping_index = MappingIndex(mappings)
+            if disabled_controllers is None:
+                disabled_controllers = current.disabled_controllers
+
+            self.__snapshot = RegistrySnapshot(
+                mappings=mappings,
+                mapping_index=mapping_index,
+                disabled_controllers=frozenset(disabled_controllers),
+                version=current.version + 1,
+            )
+            return self.__snapshot
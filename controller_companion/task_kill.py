@@ -0,0 +1,237 @@
+"""Kill processes by their name without spawning pkill/killall (Linux only).
+
+The processes are found by scanning /proc. The names of the processes are cached in a
+`ProcessIndex`, which only reads the names of processes that were started since the last scan.
+Like pkill, the name is a regular expression that is searched in the process names.
+"""
+
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import re
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+PROC_DIR = Path("/proc")
+# the kernel truncates the process name (comm) to 15 characters
+COMM_MAX_LENGTH = 15
+# time the processes have to exit after SIGTERM if no timeout is given
+DEFAULT_TIMEOUT = 2.0
+
+
+def is_supported() -> bool:
+    return PROC_DIR.is_dir() and Path(PROC_DIR, "self", "comm").is_file()
+
+
+@dataclass
+class KillResult:
+    name: str
+    # processes that exited after SIGTERM
+    terminated: List[int] = field(default_factory=list)
+    # processes that had to be killed with SIGKILL
+    killed: List[int] = field(default_factory=list)
+    # processes that could not be signaled (e.g. missing permissions)
+    failed: List[int] = field(default_factory=list)
+
+    @property
+    def exit_code(self) -> int:
+        """Exit code using the same convention as pkill."""
+        if self.failed:
+            return 3
+        if not self.terminated and not self.killed:
+            return 1
+        return 0
+
+
+class ProcessIndex:
+    """Cached index of the names of the running processes."""
+
+    def __init__(self, proc_dir: Path = PROC_DIR, max_age_s: float = 0.5):
+        """
+        Args:
+            proc_dir (Path, optional): The proc filesystem. Defaults to PROC_DIR.
+            max_age_s (float, optional): The index is rescanned if it is older than this. Defaults to 0.5.
+        """
+        self.proc_dir = proc_dir
+        self.max_age_s = max_age_s
+        self.__lock = threading.Lock()
+        self.__names: Dict[int, Tuple[str, ...]] = {}
+        self.__refreshed_at = None
+
+    def refresh(self):
+        """Rescans the processes. Only the names of new processes are read."""
+        with self.__lock:
+            pids = set()
+            for entry in os.scandir(self.proc_dir):
+                if entry.name.isdigit():
+                    pids.add(int(entry.name))
+
+            for pid in self.__names.keys() - pids:
+                del self.__names[pid]
+            for pid in pids - self.__names.keys():
+                names = self.read_names(pid)
+                if names:
+                    self.__names[pid] = names
+
+            self.__refreshed_at = time.monotonic()
+
+    def find(self, name: str) -> List[int]:
+        """Get the ids of all processes matching the given name (see `matches`).
+
+        Args:
+            name (str): Pattern of the process name or the name of the executable.
+
+        Returns:
+            List[int]: The matching process ids (the own process is excluded).
+        """
+        refreshed = False
+        if (
+            self.__refreshed_at is None
+            or time.monotonic() - self.__refreshed_at > self.max_age_s
+        ):
+            self.refresh()
+            refreshed = True
+
+        pids = self.__find(name)
+        if not pids and not refreshed:
+            # the process might have been started since the last scan
+            self.refresh()
+            pids = self.__find(name)
+        return pids
+
+    def __find(self, name: str) -> List[int]:
+        pattern = compile_pattern(name)
+        own_pid = os.getpid()
+        with self.__lock:
+            return [
+                pid
+                for pid, names in self.__names.items()
+                if pid != own_pid and self.matches(names, name, pattern)
+            ]
+
+    def read_names(self, pid: int) -> Tuple[str, ...]:
+        """Reads the process name and executable name of a process.
+
+        Returns:
+            Tuple[str, ...]: The names or an empty tuple if the process does not exist (anymore).
+        """
+        try:
+            comm = Path(self.proc_dir, str(pid), "comm").read_text().rstrip("\n")
+        except OSError:
+            return ()
+
+        try:
+            cmdline = Path(self.proc_dir, str(pid), "cmdline").read_bytes()
+        except OSError:
+            cmdline = b""
+        executable = cmdline.split(b"\0", 1)[0].decode(errors="replace")
+        executable = os.path.basename(executable)
+
+        return (comm, executable) if executable else (comm,)
+
+    @staticmethod
+    def matches(
+        names: Tuple[str, ...], name: str, pattern: Optional[re.Pattern] = None
+    ) -> bool:
+        """Checks if a process matches a name.
+
+        Like pkill, the name is a regular expression that is searched in the process name (comm),
+        e.g. "fire" matches "firefox". The exact name of the executable matches as well (also if it
+        is longer than the truncated process name).
+
+        Args:
+            names (Tuple[str, ...]): The process name and executable name (see `read_names`).
+            name (str): The name to match.
+            pattern (Optional[re.Pattern], optional): The compiled name (see `compile_pattern`). Defaults to None.
+        """
+        if pattern is None:
+            pattern = compile_pattern(name)
+        if pattern.search(names[0]) or name in names:
+            return True
+        # the process name is truncated for long names
+        return len(name) > COMM_MAX_LENGTH and names[0] == name[:COMM_MAX_LENGTH]
+
+
+def compile_pattern(name: str) -> re.Pattern:
+    """Compiles a name into a regular expression (invalid expressions match the literal name)."""
+    try:
+        return re.compile(name)
+    except re.error:
+        return re.compile(re.escape(name))
+
+
+# shared index, so repeated kills only need to scan for new processes
+_index = ProcessIndex()
+
+
+def kill_by_name(
+    name: str,
+    timeout: Optional[float] = None,
+    index: Optional[ProcessIndex] = None,
+) -> KillResult:
+    """Terminates all processes with the given name.
+
+    The processes receive SIGTERM first. Processes that are still running after the timeout are
+    killed with SIGKILL.
+
+    Args:
+        name (str): Pattern of the process name or the name of the executable (see `ProcessIndex.matches`).
+        timeout (Optional[float], optional): Time in seconds the processes have to exit after SIGTERM. Defaults to None (DEFAULT_TIMEOUT).
+        index (Optional[ProcessIndex], optional): The process index to use. Defaults to a shared index.
+
+    Returns:
+        KillResult: Which processes were terminated, killed or could not be signaled.
+    """
+    if index is None:
+        index = _index
+    result = KillResult(name=name)
+
+    pattern = compile_pattern(name)
+    pending = []
+    for pid in index.find(name):
+        # make sure the pid was not reused by another process since the last scan
+        names = index.read_names(pid)
+        if not names or not index.matches(names, name, pattern):
+            continue
+        if _send_signal(pid, signal.SIGTERM, result):
+            pending.append(pid)
+
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+        for pid in [pid for pid in pending if not _is_running(index, pid)]:
+            pending.remove(pid)
+            result.terminated.append(pid)
+
+    for pid in pending:
+        if _send_signal(pid, signal.SIGKILL, result):
+            result.killed.append(pid)
+        elif pid not in result.failed:
+            # the process exited in the meantime
+            result.terminated.append(pid)
+
+    return result
+
+
+def _send_signal(pid: int, sig: signal.Signals, result: KillResult) -> bool:
+    try:
+        os.kill(pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        result.failed.append(pid)
+        return False
+
+
+def _is_running(index: ProcessIndex, pid: int) -> bool:
+    try:
+        stat = Path(index.proc_dir, str(pid), "stat").read_text()
+    except OSError:
+        return False
+    # zombie processes have exited but were not yet reaped by their parent
+    return stat.rsplit(")", 1)[-1].split()[0] != "Z"
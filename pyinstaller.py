@@ -3,9 +3,16 @@ import shutil
 import subprocess
 
 from controller_companion import VERSION
+from controller_companion.app.resource_bundle import build_bundle
+
+# included in the executable by controller-companion.spec
+RESOURCE_BUNDLE = "build/resources.bundle"
 
 
 def install():
+    # pre-render the images, so the executable does not need to decode and resize them on launch
+    print("Building resource bundle")
+    build_bundle(RESOURCE_BUNDLE)
 
     subprocess.run(args=["pyinstaller", "./controller-companion.spec", "--noconfirm"])
 
@@ -0,0 +1,102 @@
+from controller_companion.combo_detector import ComboDetector
+from controller_companion.mapping import ActionType, Mapping
+
+
+def create_mapping(**kwargs) -> Mapping:
+    return Mapping(
+        ActionType.CONSOLE_COMMAND,
+        target="true",
+        active_controller_buttons=["A", "B"],
+        name="mapping",
+        **kwargs,
+    )
+
+
+def test_fires_on_rising_edge_only():
+    detector = ComboDetector()
+    mapping = create_mapping()
+
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+    assert detector.update(0, [mapping], now=1.0) == []
+    assert detector.is_holding(0)
+    assert detector.update(0, [], now=2.0) == []
+    assert not detector.is_holding(0)
+    assert detector.update(0, [mapping], now=3.0) == [mapping]
+
+
+def test_controllers_are_independent():
+    detector = ComboDetector()
+    mapping = create_mapping()
+
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+    assert detector.update(1, [mapping], now=0.0) == [mapping]
+    detector.remove(0)
+    assert detector.update(0, [mapping], now=0.1) == [mapping]
+
+
+def test_debounce():
+    detector = ComboDetector()
+    mapping = create_mapping(debounce_ms=100)
+
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+    detector.update(0, [], now=1.0)
+    # re-entered within the debounce window
+    assert detector.update(0, [mapping], now=1.05) == []
+    detector.update(0, [], now=2.0)
+    assert detector.update(0, [mapping], now=2.2) == [mapping]
+
+
+def test_repeat():
+    detector = ComboDetector()
+    mapping = create_mapping(repeat_ms=100)
+
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+    assert detector.next_deadline() == 0.1
+    assert detector.poll(now=0.05) == []
+    assert detector.poll(now=0.1) == [(0, mapping)]
+    assert detector.next_deadline() == 0.2
+
+    detector.update(0, [], now=0.15)
+    assert detector.next_deadline() is None
+    assert detector.poll(now=1.0) == []
+
+
+def test_cooldown():
+    detector = ComboDetector()
+    mapping = create_mapping(cooldown_ms=1000)
+
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+    detector.update(0, [], now=0.1)
+    assert detector.update(0, [mapping], now=0.5) == []
+    detector.update(0, [], now=0.6)
+    assert detector.update(0, [mapping], now=1.5) == [mapping]
+
+
+def test_state_is_kept_across_reloads():
+    detector = ComboDetector()
+    mapping = create_mapping(cooldown_ms=1000, repeat_ms=100)
+    assert detector.update(0, [mapping], now=0.0) == [mapping]
+
+    # the reloaded config creates new objects for the same mappings
+    reloaded = create_mapping(cooldown_ms=1000, repeat_ms=100)
+    detector.set_mappings([reloaded])
+
+    # the held combination does not fire again and the cooldown is kept
+    assert detector.update(0, [reloaded], now=0.05) == []
+    assert detector.poll(now=0.5) == []
+    detector.update(0, [], now=0.6)
+    assert detector.update(0, [reloaded], now=0.7) == []
+    detector.update(0, [], now=0.8)
+    assert detector.update(0, [reloaded], now=1.2) == [reloaded]
+
+
+def test_removed_mappings_are_forgotten():
+    detector = ComboDetector()
+    mapping = create_mapping(repeat_ms=100)
+    detector.update(0, [mapping], now=0.0)
+
+    detector.set_mappings([])
+
+    assert not detector.is_holding(0)
+    assert detector.next_deadline() is None
+    assert detector.poll(now=1.0) == []
@@ -0,0 +1,77 @@
+import queue
+from typing import List
+
+from controller_companion.app.controller_layouts import ControllerType
+from controller_companion.controller import Controller
+from controller_companion.controller_observer import ControllerObserver
+from controller_companion.input_backend import FakeInputBackend
+from controller_companion.mapping import ActionType, Mapping
+
+TIMEOUT_S = 5
+BUTTON_A = 0
+BUTTON_B = 1
+
+
+class RecordingExecutor:
+    """Replaces the ActionExecutor of the observer and records the submitted mappings."""
+
+    def __init__(self):
+        self.submitted: queue.Queue = queue.Queue()
+
+    def submit(self, mapping: Mapping) -> bool:
+        self.submitted.put(mapping)
+        return True
+
+    def shutdown(self, wait: bool = False):
+        pass
+
+
+def create_controller() -> Controller:
+    return Controller(
+        "Xbox Controller",
+        guid="0300000000000000000000000000000",
+        power_level="unknown",
+        initialized=True,
+        controller_type=ControllerType.XBOX,
+    )
+
+
+def test_connect_press_disconnect():
+    mapping = Mapping(
+        ActionType.CONSOLE_COMMAND,
+        target="true",
+        active_controller_buttons=["A", "B"],
+        name="A+B",
+    )
+    backend = FakeInputBackend()
+    executor = RecordingExecutor()
+    observer = ControllerObserver(backend=backend)
+    observer.executor = executor
+    changes: "queue.Queue[List[Controller]]" = queue.Queue()
+
+    observer.start_detached(
+        [mapping], controller_callback=changes.put, wait_timeout_ms=50
+    )
+    try:
+        controller = create_controller()
+        instance_id = backend.connect(controller)
+        assert [c.guid for c in changes.get(timeout=TIMEOUT_S)] == [controller.guid]
+
+        backend.press(instance_id, BUTTON_A)
+        backend.press(instance_id, BUTTON_B)
+        assert executor.submitted.get(timeout=TIMEOUT_S) is mapping
+
+        # the combination is entered again (rising edge)
+        backend.release(instance_id, BUTTON_B)
+        backend.press(instance_id, BUTTON_B)
+        assert executor.submitted.get(timeout=TIMEOUT_S) is mapping
+        backend.release(instance_id, BUTTON_A)
+        backend.release(instance_id, BUTTON_B)
+
+        backend.disconnect(instance_id)
+        assert changes.get(timeout=TIMEOUT_S) == []
+        assert executor.submitted.empty()
+    finally:
+        observer.stop()
+
+    assert not observer.thread.is_alive()
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import ENTRY_POINTS, check, parse_importtime
+
+# multiplies the budgets, e.g. for slow ci machines
+BUDGET_SCALE = float(os.environ.get("IMPORT_TIME_BUDGET_SCALE", "1.0"))
+
+
+def test_parse_importtime():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:       300 |        850 | controller_companion.launch",
+            "some other output",
+        ]
+    )
+    assert parse_importtime(output) == {
+        "_io": 120,
+        "controller_companion.launch": 850,
+    }
+
+
+@pytest.mark.parametrize("name", ENTRY_POINTS.keys())
+def test_entry_point_defers_heavy_modules(name):
+    assert {"PIL", "tkinter", "rich", "pygame"} <= set(ENTRY_POINTS[name].deferred)
+
+
+@pytest.mark.parametrize("name", ENTRY_POINTS.keys())
+def test_entry_point_import_time(name):
+    result = check(ENTRY_POINTS[name], runs=3, scale=BUDGET_SCALE)
+
+    assert result["deferred_imports"] == []
+    assert result["median_ms"] <= result["budget_ms"]
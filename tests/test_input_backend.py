@@ -0,0 +1,38 @@
+from controller_companion.input_backend import parse_sdl_axis_mapping
+
+
+def test_parse_sdl_axis_mapping():
+    mapping = {
+        "a": "b0",
+        "leftx": "a0",
+        "lefty": "a1",
+        "rightx": "a3",
+        "righty": "a4",
+        "lefttrigger": "a2",
+        "righttrigger": "a5",
+        "dpup": "h0.1",
+    }
+
+    assert parse_sdl_axis_mapping(mapping) == {
+        0: (0, 1),
+        1: (1, 1),
+        3: (2, 1),
+        4: (3, 1),
+        2: (4, 1),
+        5: (5, 1),
+    }
+
+
+def test_parse_sdl_axis_mapping_inverted_axes():
+    assert parse_sdl_axis_mapping({"lefty": "a1~"}) == {1: (1, -1)}
+
+
+def test_parse_sdl_axis_mapping_skips_unsupported_sources():
+    mapping = {
+        "lefttrigger": "b6",
+        "righttrigger": "+a5",
+        "leftx": "h0.2",
+        "rightx": "",
+    }
+
+    assert parse_sdl_axis_mapping(mapping) == {}
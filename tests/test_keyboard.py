@@ -0,0 +1,26 @@
+import pytest
+
+from controller_companion import keyboard
+
+
+def test_parse_shortcut():
+    assert keyboard.parse_shortcut("alt+f4") == ("alt", "f4")
+    assert keyboard.parse_shortcut("ctrl+shift+esc") == ("ctrl", "shift", "esc")
+    assert keyboard.parse_shortcut("a") == ("a",)
+
+
+def test_parse_shortcut_accepts_uppercase_letters():
+    assert keyboard.parse_shortcut("ctrl+C") == ("ctrl", "C")
+
+
+@pytest.mark.parametrize("shortcut", ["ctrl+foo", "CTRL+c", "alt+", ""])
+def test_parse_shortcut_rejects_invalid_keys(shortcut):
+    with pytest.raises(ValueError):
+        keyboard.parse_shortcut(shortcut)
+
+
+def test_fake_backend_records_the_shortcuts():
+    backend = keyboard.FakeKeyboardBackend()
+    backend.execute(backend.compile(keyboard.parse_shortcut("alt+f4")))
+
+    assert backend.executed == [("alt", "f4")]
@@ -0,0 +1,48 @@
+from controller_companion.app.controller_layouts import ControllerType
+from controller_companion.mapping import ActionType, Mapping
+from controller_companion.mapping_index import MappingIndex
+
+
+def create_mapping(
+    inputs, controller_type: ControllerType = ControllerType.XBOX
+) -> Mapping:
+    return Mapping(
+        ActionType.CONSOLE_COMMAND,
+        target="true",
+        active_controller_buttons=inputs,
+        name="+".join(inputs),
+        controller_type=controller_type,
+    )
+
+
+def test_lookup():
+    a_b = create_mapping(["A", "B"])
+    b_a = create_mapping(["B", "A"])
+    start = create_mapping(["Start"])
+    index = MappingIndex([a_b, b_a, start])
+
+    assert index.lookup(frozenset(["A", "B"])) == [a_b, b_a]
+    assert index.lookup(frozenset(["Start"])) == [start]
+    assert index.lookup(frozenset(["A"])) == []
+    assert frozenset(["Start"]) in index
+    assert frozenset(["X"]) not in index
+    assert len(index) == 3
+
+
+def test_playstation_inputs_are_looked_up_by_their_xbox_names():
+    mapping = create_mapping(["Cross", "Circle"], ControllerType.PLAYSTATION)
+    index = MappingIndex([mapping])
+
+    assert index.lookup(frozenset(["A", "B"])) == [mapping]
+    assert index.lookup(frozenset(["Cross", "Circle"])) == []
+
+
+def test_mappings_without_inputs_are_skipped():
+    index = MappingIndex([create_mapping([])])
+
+    assert len(index) == 0
+
+
+def test_uses_axes():
+    assert not MappingIndex([create_mapping(["A"])]).uses_axes
+    assert MappingIndex([create_mapping(["A"]), create_mapping(["LT"])]).uses_axes
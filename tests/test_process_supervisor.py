@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from controller_companion import process_supervisor
+from controller_companion.app.utils import OperatingSystem
+from controller_companion.process_supervisor import split_command
+
+
+def test_split_command():
+    assert split_command("notify-send 'Hello World'") == ["notify-send", "Hello World"]
+    assert split_command('echo "$HOME" *.txt') == ["echo", "$HOME", "*.txt"]
+
+
+def test_split_command_keeps_paths_of_existing_files(tmp_path: Path):
+    executable = tmp_path / "my game" / "start game.sh"
+    executable.parent.mkdir()
+    executable.touch()
+
+    assert split_command(str(executable)) == [str(executable)]
+
+
+def test_split_command_on_windows(monkeypatch):
+    monkeypatch.setattr(process_supervisor, "get_os", lambda: OperatingSystem.WINDOWS)
+    command = '"C:\\Program Files\\Steam\\steam.exe" -bigpicture'
+
+    assert split_command(command) == command
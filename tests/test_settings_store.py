@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from controller_companion.app.settings_store import SettingsStore
+
+
+def parse(settings: dict) -> dict:
+    if "version" not in settings:
+        raise ValueError("version is missing")
+    return settings
+
+
+def test_save_and_load(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, delay_s=0)
+    store.save({"version": 1})
+    store.close()
+
+    assert SettingsStore(path).load(parse) == {"version": 1}
+    assert not path.with_name("settings.json.tmp").exists()
+
+
+def test_load_without_settings_file(tmp_path: Path):
+    assert SettingsStore(tmp_path / "settings.json").load(parse) is None
+
+
+def test_saves_are_debounced(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, delay_s=60)
+    for version in range(5):
+        store.save({"version": version})
+
+    assert not path.exists()
+    assert store.has_unsaved_changes()
+    store.flush()
+    assert json.loads(path.read_text()) == {"version": 4}
+    assert not store.has_unsaved_changes()
+    # the previous versions were never written, so there is nothing to back up
+    assert not any(p.exists() for p in store.get_backup_paths())
+    store.close()
+
+
+def test_backup_rotation(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, delay_s=0, backup_count=2)
+    for version in range(4):
+        store.save({"version": version})
+        store.flush()
+    store.close()
+
+    backups = [json.loads(p.read_text()) for p in store.get_backup_paths()]
+    assert json.loads(path.read_text()) == {"version": 3}
+    assert backups == [{"version": 2}, {"version": 1}]
+
+
+def test_identical_backups_are_not_kept_twice(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, delay_s=0, backup_count=2)
+    for version in [1, 2, 2, 2]:
+        store.save({"version": version})
+        store.flush()
+    store.close()
+
+    backups = [json.loads(p.read_text()) for p in store.get_backup_paths()]
+    assert backups == [{"version": 2}, {"version": 1}]
+
+
+def test_corrupt_settings_file_is_not_backed_up(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    path.write_text("{")
+    store = SettingsStore(path, delay_s=0)
+    store.save({"version": 1})
+    store.close()
+
+    assert not any(p.exists() for p in store.get_backup_paths())
+
+
+@pytest.mark.parametrize("content", ["{", '{"language": "en"}'])
+def test_load_falls_back_to_the_backups(tmp_path: Path, content: str):
+    path = tmp_path / "settings.json"
+    store = SettingsStore(path, delay_s=0)
+    store.save({"version": 1})
+    store.flush()
+    store.save({"version": 2})
+    store.close()
+    path.write_text(content)
+
+    store = SettingsStore(path)
+    assert store.load(parse) == {"version": 1}
+    assert store.loaded_from == store.get_backup_paths()[0]
+
+
+def test_load_raises_the_error_of_the_settings_file(tmp_path: Path):
+    path = tmp_path / "settings.json"
+    path.write_text("{")
+    path.with_name("settings.json.bak1").write_text("{}")
+
+    with pytest.raises(json.JSONDecodeError):
+        SettingsStore(path).load(parse)
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+from controller_companion.task_kill import ProcessIndex, compile_pattern
+
+
+def create_process(proc_dir: Path, pid: int, comm: str, cmdline: str = ""):
+    process_dir = proc_dir / str(pid)
+    process_dir.mkdir()
+    (process_dir / "comm").write_text(f"{comm}\n")
+    (process_dir / "cmdline").write_bytes(cmdline.replace(" ", "\0").encode())
+
+
+def test_read_names(tmp_path: Path):
+    create_process(tmp_path, 10, "firefox", "/usr/lib/firefox/firefox --new-window")
+    create_process(tmp_path, 11, "kworker/0:1")
+    index = ProcessIndex(proc_dir=tmp_path)
+
+    assert index.read_names(10) == ("firefox", "firefox")
+    assert index.read_names(11) == ("kworker/0:1",)
+    assert index.read_names(12) == ()
+
+
+def test_matches():
+    names = ("firefox", "firefox-bin")
+
+    assert ProcessIndex.matches(names, "firefox")
+    assert ProcessIndex.matches(names, "fire")
+    assert ProcessIndex.matches(names, "^fire.*x$")
+    assert ProcessIndex.matches(names, "firefox-bin")
+    assert not ProcessIndex.matches(names, "chrome")
+
+
+def test_matches_truncated_process_names():
+    # the process name (comm) is truncated to 15 characters
+    names = ("very-long-execu", "very-long-executable")
+
+    assert ProcessIndex.matches(names, "very-long-executable")
+    assert ProcessIndex.matches(("very-long-execu",), "very-long-executable")
+    assert not ProcessIndex.matches(("very-long-execu",), "very-long-exec-other")
+
+
+def test_invalid_patterns_match_the_literal_name():
+    assert compile_pattern("game (x86").search("game (x86")
+    assert ProcessIndex.matches(("game (x86",), "game (x86")
+
+
+def test_find(tmp_path: Path):
+    create_process(tmp_path, 10, "firefox", "/usr/lib/firefox/firefox")
+    create_process(tmp_path, 11, "Web Content", "/usr/lib/firefox/firefox -contentproc")
+    create_process(tmp_path, 12, "steam", "/usr/bin/steam")
+    # the own process is never matched
+    create_process(tmp_path, os.getpid(), "firefox", "python")
+    (tmp_path / "self").mkdir()
+    index = ProcessIndex(proc_dir=tmp_path)
+
+    assert sorted(index.find("firefox")) == [10, 11]
+    assert index.find("steam") == [12]
+    assert index.find("chrome") == []
+
+
+def test_find_rescans_for_new_processes(tmp_path: Path):
+    create_process(tmp_path, 10, "steam")
+    index = ProcessIndex(proc_dir=tmp_path, max_age_s=60)
+    assert index.find("game") == []
+
+    create_process(tmp_path, 11, "game")
+    assert index.find("game") == [11]
+
+    (tmp_path / "11" / "comm").unlink()
+    (tmp_path / "11" / "cmdline").unlink()
+    (tmp_path / "11").rmdir()
+    index.refresh()
+    assert index.find("game") == []